@@ -0,0 +1,105 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Microbenchmarks of the per-chunk cost of `StreamConverter`, which filters
+while resampling, against a pure-Python downmix and linear resample, for
+common input formats.
+Usage: python benchmarks/bench_conversion.py [--repeat N]
+"""
+
+import argparse
+import os
+import struct
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.audio import AudioFormat, \
+    SAMPLE_FORMATS, StreamConverter
+
+FORMATS = (AudioFormat(48000, 2, "int16"), AudioFormat(44100, 1, "int16"),
+           AudioFormat(48000, 1, "float32"), AudioFormat(16000, 2, "int32"))
+
+
+def python_convert(data: bytes, input_format: AudioFormat,
+                   sample_rate: int = 16000) -> bytes:
+    """
+    Reference conversion of one chunk with per-sample Python loops
+    """
+    dtype, scale = SAMPLE_FORMATS[input_format.sample_format]
+    code = {"int16": "h", "int32": "i", "float32": "f"}[
+        input_format.sample_format]
+    values = struct.unpack(f"<{len(data) // dtype.itemsize}{code}", data)
+    channels = input_format.channels
+    mono = [sum(values[i:i + channels]) / channels * scale
+            for i in range(0, len(values), channels)]
+    step = input_format.sample_rate / sample_rate
+    out = []
+    position = 0.0
+    while position <= len(mono) - 1:
+        index = int(position)
+        frac = position - index
+        following = mono[min(index + 1, len(mono) - 1)]
+        out.append(int(round(mono[index] + (following - mono[index]) * frac)))
+        position += step
+    return struct.pack(f"<{len(out)}h", *out)
+
+
+def run(repeat: int = 100):
+    rng = np.random.default_rng(0)
+    results = []
+    for input_format in FORMATS:
+        dtype, scale = SAMPLE_FORMATS[input_format.sample_format]
+        for chunk_ms in (20, 100):
+            frames = input_format.sample_rate * chunk_ms // 1000
+            samples = rng.normal(0, 3000, frames * input_format.channels)
+            data = (samples / scale).astype(dtype).tobytes()
+            converter = StreamConverter(input_format, 16000)
+            python = min(timeit.repeat(
+                lambda: python_convert(data, input_format),
+                number=repeat, repeat=3)) / repeat
+            vectorized = min(timeit.repeat(lambda: converter.process(data),
+                                           number=repeat, repeat=3)) / repeat
+            label = f"{input_format.sample_rate}/{input_format.channels}ch/" \
+                    f"{input_format.sample_format}"
+            results.append((label, chunk_ms, python, vectorized))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+    print(f"{'input':>20} {'chunk':>6} {'python (us)':>12} "
+          f"{'vectorized (us)':>16} {'speedup':>8}")
+    for label, chunk_ms, old, new in run(args.repeat):
+        print(f"{label:>20} {chunk_ms:>4}ms {old * 1e6:>12.1f} "
+              f"{new * 1e6:>16.1f} {old / new:>7.1f}x")
@@ -0,0 +1,85 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Microbenchmarks comparing `analyze_frame` against the per-sample RMS closure
+previously used in `DeepSpeechLocalStreamThread.handle_audio_stream`.
+Usage: python benchmarks/bench_frame_analysis.py [--repeat N]
+"""
+
+import argparse
+import math
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.audio import analyze_frame
+
+
+def legacy_rms(frame):
+    short_normalize = (1.0 / 32768.0)
+    swidth = 2
+    count = len(frame) / swidth
+    sum_squares = 0.0
+    for sample in frame:
+        n = sample * short_normalize
+        sum_squares += n * n
+    rms_value = math.pow(sum_squares / count, 0.5)
+    return rms_value * 1000
+
+
+def legacy_analysis(frame):
+    has_data = frame.max() != frame.min()
+    return legacy_rms(frame), has_data
+
+
+def run(repeat: int = 200):
+    rng = np.random.default_rng(0)
+    results = []
+    for chunk_bytes in (1024, 4096, 16384):
+        frame = rng.integers(-3000, 3000, chunk_bytes // 2, dtype=np.int16)
+        legacy = min(timeit.repeat(lambda: legacy_analysis(frame),
+                                   number=repeat, repeat=3)) / repeat
+        vectorized = min(timeit.repeat(lambda: analyze_frame(frame),
+                                       number=repeat, repeat=3)) / repeat
+        results.append((chunk_bytes, legacy, vectorized))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(f"{'chunk':>8} {'legacy (us)':>12} {'vectorized (us)':>16} "
+          f"{'speedup':>8}")
+    for size, old, new in run(args.repeat):
+        print(f"{size:>8} {old * 1e6:>12.1f} {new * 1e6:>16.1f} "
+              f"{old / new:>7.1f}x")
@@ -0,0 +1,268 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Replays test audio and synthetic signals through the streaming plugin at
+different chunk sizes, concurrency levels and decode policies and reports
+real-time factor, latency percentiles, CPU time and peak RSS as JSON.
+Usage:
+  python benchmarks/run_benchmarks.py --output results.json
+  python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+  python benchmarks/run_benchmarks.py --clips /tmp/deepspeech_profiles
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+
+from threading import Thread
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local import DeepSpeechLocalStreamingSTT
+from neon_stt_plugin_deepspeech_stream_local.batch import read_audio
+from neon_stt_plugin_deepspeech_stream_local.metrics import \
+    InMemoryMetricsSink
+from neon_stt_plugin_deepspeech_stream_local.sessions import SessionEngine
+
+TEST_AUDIO = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.realpath(__file__))), "tests", "test_audio")
+
+# Measurements where an increase from the baseline is a regression
+LOWER_IS_BETTER = ("rtf_mean", "latency_p50", "latency_p95", "latency_p99",
+                   "cpu_seconds", "peak_rss_mb")
+
+
+def load_clips(sample_rate: int, clip_dir: str = TEST_AUDIO) -> \
+        Dict[str, bytes]:
+    """
+    Load WAV clips plus synthetic silence and noise as PCM bytes
+    :param sample_rate: sample rate expected by the model
+    :param clip_dir: directory of clips, i.e. test audio or dumped profiles
+    """
+    clips = dict()
+    for file in sorted(os.listdir(clip_dir)):
+        if not file.endswith(".wav"):
+            continue
+        clips[os.path.splitext(file)[0]] = \
+            read_audio(os.path.join(clip_dir, file), sample_rate).tobytes()
+    rng = np.random.default_rng(0)
+    clips["synthetic_silence"] = np.zeros(sample_rate * 2,
+                                          dtype=np.int16).tobytes()
+    clips["synthetic_noise"] = rng.normal(0, 300, sample_rate * 2).astype(
+        np.int16).tobytes()
+    return clips
+
+
+def _reset_peak_rss() -> bool:
+    """
+    Reset the kernel's peak RSS (VmHWM) for this process so the next reading
+    covers only the following scenario.
+    :returns: False if unsupported, i.e. not on Linux
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb(scenario_scope: bool) -> float:
+    """
+    :param scenario_scope: True if `_reset_peak_rss` succeeded before the
+        scenario; otherwise the peak of the whole process is reported
+    """
+    if scenario_scope:
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) / 1024
+        except (OSError, ValueError):
+            pass
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    return float(np.percentile(values, percent)) if values else None
+
+
+def run_scenario(stt: DeepSpeechLocalStreamingSTT, clips: Dict[str, bytes],
+                 chunk_size: int, concurrency: int, policy: str,
+                 sample_rate: int, realtime: bool = False) -> dict:
+    """
+    Stream every clip through `concurrency` parallel sessions.
+    :returns: dict of scenario parameters and measurements
+    """
+    stt.config["decode_policy"] = policy
+    sink = InMemoryMetricsSink()
+    stt.metrics_sink = sink
+    engine = SessionEngine(stt, max_workers=concurrency)
+    latencies = []
+    work = [clip for _ in range(concurrency) for clip in clips.values()]
+
+    def _stream(audio: bytes):
+        session = engine.open_session()
+        chunk_seconds = chunk_size / 2 / sample_rate
+        for idx in range(0, len(audio), chunk_size):
+            session.feed(audio[idx:idx + chunk_size])
+            if realtime:
+                time.sleep(chunk_seconds)
+        start = time.perf_counter()
+        session.finish()
+        session.result()
+        latencies.append(time.perf_counter() - start)
+
+    rss_reset = _reset_peak_rss()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for batch_start in range(0, len(work), concurrency):
+        threads = [Thread(target=_stream, args=(audio,)) for audio in
+                   work[batch_start:batch_start + concurrency]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall_seconds = time.perf_counter() - wall_start
+    cpu_seconds = time.process_time() - cpu_start
+    engine.shutdown()
+    summary = sink.summary()
+    peak_rss_mb = _peak_rss_mb(rss_reset)
+    return {"chunk_size": chunk_size,
+            "concurrency": concurrency,
+            "decode_policy": policy,
+            "utterances": len(work),
+            "audio_seconds": summary["audio_seconds"]["sum"],
+            "wall_seconds": wall_seconds,
+            "cpu_seconds": cpu_seconds,
+            "rtf_mean": summary["real_time_factor"]["mean"],
+            "rtf_p95": summary["real_time_factor"]["p95"],
+            "latency_p50": _percentile(latencies, 50),
+            "latency_p95": _percentile(latencies, 95),
+            "latency_p99": _percentile(latencies, 99),
+            "intermediate_decodes": summary["decode_count"]["sum"],
+            "peak_rss_mb": peak_rss_mb,
+            "peak_rss_scope": "scenario" if rss_reset else "process"}
+
+
+def scenario_key(result: dict) -> str:
+    return f"{result['decode_policy']}/chunk={result['chunk_size']}/" \
+           f"concurrency={result['concurrency']}"
+
+
+def compare(results: List[dict], baseline: List[dict],
+            tolerance: float) -> List[str]:
+    """
+    Compare results to a baseline.
+    :param tolerance: allowed fractional increase before a regression
+    :returns: list of regression descriptions
+    """
+    baseline = {scenario_key(b): b for b in baseline}
+    regressions = []
+    for result in results:
+        base = baseline.get(scenario_key(result))
+        if not base:
+            continue
+        for metric in LOWER_IS_BETTER:
+            if metric == "peak_rss_mb" and base.get("peak_rss_scope") != \
+                    result.get("peak_rss_scope"):
+                # Per-scenario and process-wide peaks are not comparable
+                continue
+            old, new = base.get(metric), result.get(metric)
+            if old and new is not None and new > old * (1 + tolerance):
+                regressions.append(f"{scenario_key(result)} {metric}: "
+                                   f"{old:.4f} -> {new:.4f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--chunk-sizes", type=int, nargs="+",
+                        default=[1024, 4096])
+    parser.add_argument("--concurrency", type=int, nargs="+",
+                        default=[1, 4])
+    parser.add_argument("--policies", nargs="+",
+                        default=["always", "interval", "adaptive"])
+    parser.add_argument("--lang", default="en-us")
+    parser.add_argument("--model", help="path to a model file")
+    parser.add_argument("--scorer", help="path to a scorer file")
+    parser.add_argument("--clips", default=TEST_AUDIO,
+                        help="directory of WAV clips to replay, i.e. "
+                             "profiles dumped with `profiling_audio`")
+    parser.add_argument("--realtime", action="store_true",
+                        help="feed audio at real-time speed")
+    parser.add_argument("--output", help="file to write JSON results to")
+    parser.add_argument("--baseline", help="baseline JSON to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed fractional regression from baseline")
+    args = parser.parse_args()
+
+    config = {"lang": args.lang}
+    if args.model:
+        config["model_file"] = args.model
+        config["scorer_file"] = args.scorer
+    stt = DeepSpeechLocalStreamingSTT(config)
+    sample_rate = stt.init_language_model(args.lang).sampleRate()
+    clips = load_clips(sample_rate, args.clips)
+    results = []
+    for policy in args.policies:
+        for chunk_size in args.chunk_sizes:
+            for concurrency in args.concurrency:
+                result = run_scenario(stt, clips, chunk_size, concurrency,
+                                      policy, sample_rate, args.realtime)
+                print(json.dumps(result), file=sys.stderr)
+                results.append(result)
+    stt.shutdown()
+    report = {"platform": platform.platform(),
+              "python": platform.python_version(),
+              "machine": platform.machine(),
+              "results": results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -27,20 +27,43 @@
 # SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 import os
-import shutil
-import deepspeech
-import numpy as np
 import time
-import math
 
-from threading import Event
-from platform import machine
-from queue import Queue
-from huggingface_hub import hf_hub_download
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from threading import Event, Lock, RLock
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, \
+    List, Optional, Union
 from ovos_plugin_manager.templates.stt import StreamingSTT, StreamThread
 from ovos_utils.log import LOG
 
+# Modules depending on numpy or the DeepSpeech runtime are imported where
+# they are first used, so plugin discovery and `languages` stay lightweight
+from neon_stt_plugin_deepspeech_stream_local.decoder_settings import \
+    DecoderSettings
 from neon_stt_plugin_deepspeech_stream_local.languages import languages
+from neon_stt_plugin_deepspeech_stream_local.metrics import \
+    InMemoryMetricsSink, MetricsSink, UtteranceMetrics
+from neon_stt_plugin_deepspeech_stream_local.model_pool import ModelPool
+from neon_stt_plugin_deepspeech_stream_local.model_store import ModelStore
+from neon_stt_plugin_deepspeech_stream_local.profiling import ProfileDumper
+from neon_stt_plugin_deepspeech_stream_local.result_cache import \
+    ResultCache, model_identity
+from neon_stt_plugin_deepspeech_stream_local.results import EMPTY_RESULT, \
+    PartialResult, TranscriptionResult
+from neon_stt_plugin_deepspeech_stream_local.sessions import \
+    AsyncStreamSession, SessionEngine, StreamSession
+from neon_stt_plugin_deepspeech_stream_local.shared_models import \
+    MappedMemory, get_shared_model, load_model, mapped_memory, \
+    shared_model_lock, use_tflite
+from neon_stt_plugin_deepspeech_stream_local.stream_pool import StreamPool
+
+if TYPE_CHECKING:
+    from neon_stt_plugin_deepspeech_stream_local.decode_scheduler import \
+        DecodeScheduler
+    from neon_stt_plugin_deepspeech_stream_local.longform import Segment
+    from neon_stt_plugin_deepspeech_stream_local.stream_decoder import \
+        StreamDecoder
 
 
 class DeepSpeechLocalStreamingSTT(StreamingSTT):
@@ -51,25 +74,77 @@ class DeepSpeechLocalStreamingSTT(StreamingSTT):
     def __init__(self, config=None, **kwargs):
         super(DeepSpeechLocalStreamingSTT, self).__init__(config=config)
         self.results_event = kwargs.get("results_event")
+        # Called with a PartialResult when the hypothesis of the current
+        # `stream_start` stream changes
+        self.on_partial: Optional[Callable[[PartialResult], None]] = \
+            kwargs.get("on_partial")
         # override language with module specific language selection
         self.language = self.config.get('lang') or self.lang
         self.queue = None
-        self._clients = dict()
+        self._decode_stats = {"performed": 0, "skipped": 0}
+        self._decode_stats_lock = Lock()
+        self.metrics_sink: Optional[MetricsSink] = \
+            InMemoryMetricsSink() if self.config.get("metrics") else None
+        self.profile_dumper: Optional[ProfileDumper] = \
+            ProfileDumper.from_config(self.config)
+        self.model_store = ModelStore(self.config.get("model_cache_dir"),
+                                      self.config.get("offline", False))
+        # Held while changing decoder settings and creating streams, so
+        # streams are never created from a partially updated model. Shared
+        # models are used by other instances, so their lock is process-wide
+        self._model_lock = shared_model_lock if \
+            self.config.get("shared_models") else RLock()
+        self._decoder_settings: Dict[str, DecoderSettings] = dict()
+        self.stream_pool = StreamPool(self.config.get("stream_pool_size", 2),
+                                      self._create_stream)
+        self.model_pool = ModelPool(self.config.get("max_models"),
+                                    self.config.get("max_model_bytes"),
+                                    self.stream_pool.release_language)
+        self._loader = ThreadPoolExecutor(
+            max_workers=self.config.get("preload_workers", 2),
+            thread_name_prefix="DeepSpeechModelLoader")
+        self._loading: Dict[str, Future] = dict()
+        self._load_errors: Dict[str, Exception] = dict()
+        self._load_times: Dict[str, float] = dict()
+        self._loading_lock = RLock()
+        self._model_files: Dict[str, tuple] = dict()
+        self._model_ids: Dict[str, str] = dict()
+        self.result_cache: Optional[ResultCache] = \
+            ResultCache.from_config(self.config)
+        self.sessions = SessionEngine(
+            self, max_workers=self.config.get("session_workers", 4),
+            max_queued_chunks=self.config.get("session_queue_chunks", 64))
+        default_lang = self.language.split('-')[0]
         if self.config.get("model_file") and \
                 os.path.isfile(self.config['model_file']):
             try:
-                model = deepspeech.Model(self.config.get('model_file'))
-                if self.config.get('scorer_file') and \
-                        os.path.isfile(self.config['scorer_file']):
-                    model.enableExternalScorer(self.config.get('scorer_file'))
-                self._clients[self.language.split('-')[0]] = model
+                model, size = self._load_model(default_lang,
+                                               self.config['model_file'],
+                                               self.config.get('scorer_file'))
+                self._on_model_loaded(default_lang, model,
+                                      self.config['model_file'],
+                                      self.config.get('scorer_file'))
+                self.model_pool.put(default_lang, model, size, pinned=True)
+                self.stream_pool.prefill(default_lang, model)
             except Exception as e:
                 LOG.exception(e)
-        self.init_language_model(self.language.split('-')[0], True)
+        self.init_language_model(default_lang, True)
+        self.model_pool.pin(default_lang)
+        self.prewarm(self.config.get("preload_langs") or [])
         LOG.debug("Deepspeech STT Ready")
 
     def create_streaming_thread(self):
-        self.queue = Queue()
+        from neon_stt_plugin_deepspeech_stream_local.audio import AudioFormat
+        from neon_stt_plugin_deepspeech_stream_local.ring_buffer import \
+            AudioRingBuffer
+        # Input is buffered unconverted, so size the buffer in 16-bit units
+        # of the input format
+        input_format = AudioFormat.from_config(self.config)
+        units_per_second = (input_format.sample_rate or 16000) * \
+            input_format.frame_bytes // 2
+        self.queue = AudioRingBuffer(
+            int(units_per_second * self.config.get("buffer_seconds", 30)),
+            int(units_per_second * self.config.get("frame_ms", 100) / 1000))
         return DeepSpeechLocalStreamThread(
             self.queue,
             self.language,
@@ -77,127 +152,475 @@ class DeepSpeechLocalStreamingSTT(StreamingSTT):
             self.results_event
         )
 
+    def open_session(self, lang: str = None, **options) -> StreamSession:
+        """
+        Start a new concurrent stream session. Sessions are independent of
+        `stream_start`/`stream_data` and of each other.
+        :param lang: language of the audio; defaults to the plugin language
+        :param options: per-session StreamDecoder options (`result_detail`,
+            `num_results`)
+        :returns: StreamSession to `feed` audio to
+        """
+        return self.sessions.open_session(lang, **options)
+
+    def open_async_session(self, lang: str = None,
+                           **options) -> AsyncStreamSession:
+        """
+        Start a new concurrent stream session for use with asyncio. Must be
+        called from a running event loop; decoding runs on the same bounded
+        worker pool as `open_session`.
+        :param lang: language of the audio; defaults to the plugin language
+        :param options: per-session StreamDecoder options
+        :returns: AsyncStreamSession to `await feed` audio to
+        """
+        return self.sessions.open_async_session(lang, **options)
+
     def init_language_model(self, lang: str, cache: bool = True):
+        """
+        Get a loaded model for a language, loading it if it is not resident
+        in the model pool.
+        :param lang: language to get a model for
+        :param cache: if False, a newly loaded model is returned without
+            being added to the model pool
+        :returns: deepspeech.Model for the requested language
+        """
         lang = (lang or self.lang).split('-')[0]
-        if lang not in self._clients:
-            tflite = machine() == 'aarch64'
-            model, scorer = self.download_model(lang, tflite)
-            LOG.info(f"Loading model for {lang}")
-            client = deepspeech.Model(model)
-            if scorer and os.path.isfile(scorer):
-                LOG.info(f"Enabling scorer for {lang}")
-                client.enableExternalScorer(scorer)
+        client = self.model_pool.get(lang)
+        if client is None:
             if cache:
-                self._clients[lang] = client
+                # Wait only on this language; other loads continue in parallel
+                client = self._load_async(lang).result()
             else:
-                return client
-        return self._clients.get(lang)
+                client, _ = self._load_language(lang)
+        return client
+
+    def prewarm(self, langs: Iterable[str]) -> Dict[str, Future]:
+        """
+        Start loading models for the requested languages in the background.
+        :param langs: languages to load
+        :returns: dict of language to Future resolving to the loaded model
+        """
+        futures = dict()
+        for lang in langs:
+            lang = lang.split('-')[0]
+            futures[lang] = self._load_async(lang)
+        return futures
+
+    def decoder_settings(self, lang: str) -> Optional[DecoderSettings]:
+        """
+        Get the current decoder settings for a language.
+        :param lang: language to get settings for
+        :returns: copy of the DecoderSettings, or None if never loaded
+        """
+        with self._model_lock:
+            settings = self._decoder_settings.get(lang.split('-')[0])
+            return replace(settings, hot_words=dict(settings.hot_words)) \
+                if settings else None
+
+    def set_scorer(self, lang: str, scorer_path: Optional[str]):
+        """
+        Replace the scorer used for a language without reloading its model.
+        :param lang: language to change
+        :param scorer_path: scorer file to enable, or None to disable
+        """
+        if scorer_path and not os.path.isfile(scorer_path):
+            raise FileNotFoundError(scorer_path)
+        self._update_decoder(lang, DecoderSettings.set_scorer, scorer_path)
+
+    def set_scorer_alpha_beta(self, lang: str, alpha: float, beta: float):
+        """
+        Set the language model weight and word insertion weight for a
+        language's scorer.
+        """
+        self._update_decoder(lang, DecoderSettings.set_alpha_beta,
+                             alpha, beta)
+
+    def set_beam_width(self, lang: str, beam_width: int):
+        """
+        Set the default beam width for a language. Wider beams are more
+        accurate and slower.
+        """
+        self._update_decoder(lang, DecoderSettings.set_beam_width,
+                             beam_width)
+
+    def add_hot_word(self, lang: str, word: str, boost: float):
+        """
+        Boost (or with a negative `boost`, suppress) a word for a language.
+        Replaces any existing boost for the word.
+        """
+        self._update_decoder(lang, DecoderSettings.add_hot_word, word, boost)
+
+    def erase_hot_word(self, lang: str, word: str):
+        self._update_decoder(lang, DecoderSettings.erase_hot_word, word)
+
+    def clear_hot_words(self, lang: str):
+        self._update_decoder(lang, DecoderSettings.clear_hot_words)
+
+    @property
+    def model_status(self) -> Dict[str, str]:
+        """
+        Dict of language to model state (`loading`, `ready`, or `failed`)
+        """
+        with self._loading_lock:
+            status = {lang: "failed" for lang in self._load_errors}
+            status.update({lang: "loading" for lang in self._loading})
+        status.update({lang: "ready" for lang in self.model_pool.resident})
+        return status
+
+    @property
+    def model_load_times(self) -> Dict[str, float]:
+        """
+        Dict of language to seconds spent resolving and loading its model
+        """
+        with self._loading_lock:
+            return dict(self._load_times)
+
+    @property
+    def model_memory(self) -> Dict[str, MappedMemory]:
+        """
+        Dict of loaded model and scorer files to their resident memory in
+        this process. `shared` bytes are pages also mapped by other
+        processes, which would otherwise be private to each process.
+        """
+        with self._loading_lock:
+            files = [path for lang in self.model_pool.resident
+                     for path in self._model_files.get(lang, ()) if path]
+        return mapped_memory(files)
+
+    def shutdown(self):
+        """
+        Stop background model loading and session workers and free pooled
+        streams
+        """
+        self._loader.shutdown(wait=False)
+        self.sessions.shutdown(wait=False)
+        self.stream_pool.shutdown()
+        if self.profile_dumper is not None:
+            self.profile_dumper.shutdown(wait=False)
+
+    def _load_async(self, lang: str) -> Future:
+        with self._loading_lock:
+            if lang in self._loading:
+                return self._loading[lang]
+            client = self.model_pool.peek(lang)
+            if client is not None:
+                future = Future()
+                future.set_result(client)
+                return future
+            self._load_errors.pop(lang, None)
+            future = self._loader.submit(self._load_and_cache, lang)
+            self._loading[lang] = future
+            future.add_done_callback(
+                lambda f, l=lang: self._on_load_complete(l, f))
+            return future
+
+    def _on_load_complete(self, lang: str, future: Future):
+        with self._loading_lock:
+            self._loading.pop(lang, None)
+            if future.exception():
+                LOG.error(f"Failed to load model for {lang}: "
+                          f"{future.exception()}")
+                self._load_errors[lang] = future.exception()
+
+    def _load_and_cache(self, lang: str):
+        client, size = self._load_language(lang)
+        self.model_pool.put(lang, client, size)
+        self.stream_pool.prefill(lang, client)
+        return client
+
+    def _load_language(self, lang: str):
+        start = time.monotonic()
+        model, scorer = self.download_model(lang, use_tflite(self.config))
+        LOG.info(f"Loading model for {lang}")
+        client, size = self._load_model(lang, model, scorer)
+        self._on_model_loaded(lang, client, model, scorer)
+        with self._loading_lock:
+            self._load_times[lang] = time.monotonic() - start
+        LOG.info(f"Loaded model for {lang} in {self._load_times[lang]:.2f}s")
+        return client, size
+
+    def _on_model_loaded(self, lang: str, client, model_path: str,
+                         scorer_path: Optional[str]):
+        scorer_path = _loaded_scorer(scorer_path)
+        settings = self._get_decoder_settings(lang, scorer_path)
+        if not self.config.get("shared_models"):
+            # Shared models are configured when first loaded
+            with self._model_lock:
+                settings.apply(client, scorer_path)
+        self._set_model_files(lang, model_path, settings.scorer_path)
+
+    def _get_decoder_settings(self, lang: str,
+                              scorer_path: Optional[str]) -> DecoderSettings:
+        """
+        Get the decoder settings for a language, creating them from config
+        for the scorer loaded with its model.
+        """
+        with self._model_lock:
+            settings = self._decoder_settings.get(lang)
+            if settings is None:
+                settings = DecoderSettings.from_config(self.config,
+                                                       scorer_path)
+                self._decoder_settings[lang] = settings
+            return settings
+
+    def _set_model_files(self, lang: str, model_path: str,
+                         scorer_path: Optional[str]):
+        with self._loading_lock:
+            self._model_files[lang] = (model_path, scorer_path)
+            self._model_ids[lang] = model_identity(model_path, scorer_path)
+
+    def _create_stream(self, client, beam_width: Optional[int] = None):
+        """
+        Create a stream, optionally with a beam width other than the model's.
+        :param client: deepspeech.Model to create a stream for
+        :param beam_width: beam width for this stream only
+        :returns: deepspeech Stream
+        """
+        with self._model_lock:
+            if not beam_width:
+                return client.createStream()
+            model_width = client.beamWidth()
+            client.setBeamWidth(beam_width)
+            try:
+                return client.createStream()
+            finally:
+                client.setBeamWidth(model_width)
+
+    def _update_decoder(self, lang: str, update: Callable, *args):
+        """
+        Change decoder settings of a loaded model and replace its pooled
+        streams. Streams already in use are not affected.
+        """
+        if self.config.get("shared_models"):
+            raise RuntimeError("Decoder settings of shared models cannot be "
+                               "changed at runtime; configure them instead")
+        lang = lang.split('-')[0]
+        client = self.init_language_model(lang)
+        with self._model_lock:
+            update(self._decoder_settings[lang], client, *args)
+            scorer_path = self._decoder_settings[lang].scorer_path
+        model_path = self._model_files.get(lang, (None,))[0]
+        self._set_model_files(lang, model_path, scorer_path)
+        self.stream_pool.release_language(lang)
+        self.stream_pool.prefill(lang, client)
+
+    def _load_model(self, lang: str, model_path: str,
+                    scorer_path: str = None):
+        """
+        Load a model and optional scorer, reusing models shared by this
+        process if `shared_models` is enabled.
+        :param lang: language of the model
+        :param model_path: path to the model file
+        :param scorer_path: path to the scorer file
+        :returns: deepspeech.Model, approximate size in bytes
+        """
+        if self.config.get("shared_models"):
+            settings = self._get_decoder_settings(
+                lang, _loaded_scorer(scorer_path))
+            return get_shared_model(model_path, scorer_path, settings)
+        return load_model(model_path, scorer_path)
 
     def download_model(self, lang: str = None, tflite: bool = False):
         """
-        Downloading model and scorer for the specific language
-        from Huggingface.
-        Creating a folder  'polyglot_models' in xdg_data_home
-        Creating a language folder in 'polyglot_models' folder
+        Get the model and scorer for the specific language, downloading
+        them from Huggingface only if they are not already in the local
+        model store.
+        :param lang: language to get a model for
+        :param tflite: if True, get the tflite model instead of pbmm
+        :returns: model path, scorer path
         """
         lang = (lang or self.lang).split('-')[0]
-        repo_id = languages.get(lang)['repo']
-        if not repo_id:
-            raise Exception(f'{lang} is not supported')
-        if tflite:
-            model_file = languages[lang]['tflite']
-            download_path = hf_hub_download(repo_id, filename=model_file)
-            model_path = f"{download_path}.tflite"
+        return self.model_store.resolve(lang, tflite)
+
+    def create_decoder(self, lang: str, profile: Union[str, dict] = None,
+                       **kwargs) -> 'StreamDecoder':
+        """
+        Get a StreamDecoder for a new utterance that takes its stream from
+        the stream pool, measuring model acquisition if metrics are enabled.
+        :param lang: language of the utterance
+        :param profile: name of a `decoder_profiles` entry, or a dict of
+            configuration overrides (including `beam_width`) for this
+            utterance
+        :param kwargs: additional StreamDecoder arguments
+        :returns: StreamDecoder for the utterance
+        """
+        pool_lang = (lang or self.lang).split('-')[0]
+        profile = self._resolve_profile(profile)
+        config = {**self.config, **profile} if profile else self.config
+        beam_width = profile.get("beam_width")
+        metrics = None
+        if self.metrics_sink is None:
+            client = self.init_language_model(lang)
         else:
-            model_file = languages[lang]['pbmm']
-            download_path = hf_hub_download(repo_id, filename=model_file)
-            model_path = f"{download_path}.pbmm"
-
-        scorer_file_path = hf_hub_download(repo_id,
-                                           filename=languages[lang]['scorer'])
-        # Model path must include the `pbmm` file extension
-        # TODO: Consider renaming files and moving to ~/.local/share/neon
-        if not os.path.isfile(model_path) or \
-                os.path.getmtime(model_path) != os.path.getmtime(download_path):
-            LOG.info("Getting new model from huggingface")
-            shutil.copy2(download_path, model_path)
-        return model_path, scorer_file_path
+            start = time.perf_counter()
+            client = self.init_language_model(lang)
+            metrics = UtteranceMetrics(
+                lang=lang, model_acquire_seconds=time.perf_counter() - start)
+        if self.result_cache is not None:
+            with self._loading_lock:
+                model_id = self._model_ids.get(pool_lang, '')
+            with self._model_lock:
+                settings = self._decoder_settings.get(pool_lang)
+                settings_id = settings.identity if settings else ''
+            kwargs.setdefault("cache", self.result_cache)
+            kwargs.setdefault("cache_key", f"{pool_lang}|{model_id}|"
+                                           f"{settings_id}|{beam_width}")
+        def stream_factory():
+            if beam_width:
+                # Pooled streams use the model's beam width
+                return self._create_stream(client, beam_width)
+            return self.stream_pool.acquire(pool_lang, client)
+
+        from neon_stt_plugin_deepspeech_stream_local.stream_decoder import \
+            StreamDecoder
+        profiler = None if self.profile_dumper is None else \
+            self.profile_dumper.create_profiler(pool_lang)
+        return StreamDecoder(client, config, metrics=metrics,
+                             stream_factory=stream_factory, profiler=profiler,
+                             **kwargs)
+
+    def _resolve_profile(self, profile: Union[str, dict, None]) -> dict:
+        if not profile:
+            return dict()
+        if isinstance(profile, str):
+            profiles = self.config.get("decoder_profiles") or dict()
+            if profile not in profiles:
+                raise ValueError(f"Unknown decoder profile: {profile}")
+            return profiles[profile]
+        return profile
+
+    def transcribe_long(self, audio: Iterable[bytes], lang: str = None,
+                        profile: Union[str, dict] = None) -> \
+            Iterator['Segment']:
+        """
+        Transcribe audio of any length, i.e. dictation or recordings, as a
+        sequence of segments split at pauses. Segments are yielded as soon as
+        they end, and memory use does not grow with the length of the audio.
+        :param audio: iterable of 16-bit mono PCM chunks
+        :param lang: language of the audio; defaults to the plugin language
+        :param profile: decoder profile for each segment
+        :returns: iterator of timestamped Segments
+        """
+        lang = lang or self.language
+        # Segments are ended by the transcriber; word timings must match
+        # the audio, so no audio is skipped
+        profile = {**self._resolve_profile(profile),
+                   "silence_gate": False, "endpointing": "none",
+                   "input_sample_rate": None, "input_channels": 1,
+                   "input_sample_format": "int16"}
+
+        def create_decoder():
+            return self.create_decoder(lang, profile, result_detail="words",
+                                       num_results=1, cache=None)
+
+        from neon_stt_plugin_deepspeech_stream_local.longform import \
+            LongFormTranscriber
+        sample_rate = self.init_language_model(lang).sampleRate()
+        transcriber = LongFormTranscriber.from_config(
+            self.config, create_decoder, sample_rate,
+            on_finish=self.report_utterance)
+        return transcriber.transcribe(audio)
+
+    def report_utterance(self, decoder: 'StreamDecoder'):
+        """
+        Record statistics for a finished utterance.
+        :param decoder: StreamDecoder that handled the utterance
+        """
+        self.report_decode_stats(decoder.scheduler)
+        if decoder.metrics is not None and self.metrics_sink is not None:
+            try:
+                self.metrics_sink.record(decoder.metrics)
+            except Exception as e:
+                LOG.exception(e)
+        if decoder.profiler is not None and self.profile_dumper is not None:
+            self.profile_dumper.check(decoder.profiler, decoder.sample_rate,
+                                      decoder.text)
+
+    def report_decode_stats(self, scheduler: 'DecodeScheduler'):
+        """
+        Add the intermediate decodes performed and skipped by a finished
+        stream to the plugin totals.
+        :param scheduler: DecodeScheduler used by the finished stream
+        """
+        with self._decode_stats_lock:
+            self._decode_stats["performed"] += scheduler.performed
+            self._decode_stats["skipped"] += scheduler.skipped
+
+    @property
+    def decode_stats(self) -> dict:
+        """
+        Total intermediate decodes performed and skipped (saved) by the
+        configured decode policy across all streams.
+        """
+        with self._decode_stats_lock:
+            return dict(self._decode_stats)
 
     @property
     def available_languages(self) -> set:
         return set(languages.keys())
 
 
+def _loaded_scorer(scorer_path: Optional[str]) -> Optional[str]:
+    """
+    Get the scorer enabled by `load_model` for `scorer_path`
+    """
+    return scorer_path if scorer_path and os.path.isfile(scorer_path) \
+        else None
+
+
 class DeepSpeechLocalStreamThread(StreamThread):
     def __init__(self, queue, lang, stt_class, results_event=None):
         super().__init__(queue, lang)
         self.name = "StreamThread"
         self.get_client = stt_class.init_language_model
+        self.create_decoder = stt_class.create_decoder
+        self.config = stt_class.config
+        self.report_utterance = stt_class.report_utterance
+        self.on_partial = stt_class.on_partial
+        self.decode_scheduler = None
         self.results_event = results_event or Event()
-        self.transcriptions = []
+        self.result: TranscriptionResult = EMPTY_RESULT
 
         self._invalid_first_transcriptions = ["he"]  # Known bad transcriptions that should be of lower confidence
 
     def handle_audio_stream(self, audio, language):
-        short_normalize = (1.0 / 32768.0)
-        swidth = 2
-        threshold = 10
-        timeout_length = 5
-
-        def rms(frame):
-            count = len(frame) / swidth
-            sum_squares = 0.0
-            for sample in frame:
-                n = sample * short_normalize
-                sum_squares += n * n
-            rms_value = math.pow(sum_squares / count, 0.5)
-            return rms_value * 1000
-
         LOG.info(f"Getting client stream for: {language}")
-        stream = self.get_client(language).createStream()
-        current_time = time.time()
-        end_time = current_time + timeout_length
-        previous_intermediate_result, current_intermediate_result = '', ''
-        has_data = False
-        for data in audio:
-            data16 = np.frombuffer(data, dtype=np.int16)
-            if data16.max() != data16.min():
-                has_data = True
-            current_time = time.time()
-            stream.feedAudioContent(data16)
-            current_intermediate_result = stream.intermediateDecode()
-            if rms(data16) > threshold and current_intermediate_result != previous_intermediate_result:
-                end_time = current_time + timeout_length
-            previous_intermediate_result = current_intermediate_result
-            if current_time > end_time or not data:
-                LOG.info("Stream Stopped")
-                break
-        responses = stream.finishStreamWithMetadata(num_results=5)
-        self.transcriptions = []
-        # LOG.debug(f"The responses are {responses}")
-        for transcript in responses.transcripts:
-            letters = [token.text for token in transcript.tokens]
-            self.transcriptions.append("".join(letters).strip())
-        # self.transcriptions = responses
-        LOG.debug(self.transcriptions)
-        if not self.transcriptions[0]:
-            LOG.info("First transcription is empty")
-            self.text = None
-            self.transcriptions = []
-        elif has_data:  # Model sometimes returns transcripts for absolute silence
-            if self.transcriptions[0] in self._invalid_first_transcriptions:
-                LOG.info(f"Pushing {self.transcriptions[0]} to end of list")
-                self.transcriptions.append(self.transcriptions.pop(0))
-            LOG.debug("Audio had data")
-            self.text = self.transcriptions[0]
+        decoder = self.create_decoder(
+            language,
+            invalid_first_transcriptions=self._invalid_first_transcriptions,
+            on_partial=self.on_partial)
+        self.decode_scheduler = decoder.scheduler
+        profiler = decoder.profiler
+        if profiler is None:
+            for data in audio:
+                if not decoder.feed(data):
+                    break
         else:
-            LOG.warning("Audio was empty")
-            self.text = None
-            self.transcriptions = []
+            audio = iter(audio)
+            while True:
+                start = time.perf_counter()
+                data = next(audio, None)
+                if data is None:
+                    break
+                profiler.queue_wait += time.perf_counter() - start
+                if not decoder.feed(data):
+                    break
+        if getattr(self.queue, "overruns", 0):
+            LOG.warning(f"Audio buffer overruns: {self.queue.stats}")
+        self.result = decoder.finish()
+        self.text = self.result.text
         self.results_event.set()
+        self.report_utterance(decoder)
         LOG.debug(f"self.text={self.text}")
         return self.transcriptions
 
+    @property
+    def transcriptions(self) -> List[str]:
+        """
+        Candidate transcriptions of the last utterance, best first
+        """
+        return self.result.transcriptions
+
     def finalize(self):
         self.results_event.wait()
         return super().finalize()
@@ -0,0 +1,382 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+
+from bisect import bisect_right
+from collections import deque
+from math import gcd
+from typing import List, NamedTuple, Optional, Union
+
+SHORT_NORMALIZE = 1.0 / 32768.0
+SAMPLE_WIDTH = 2
+
+# Little-endian input sample formats and the scale to 16-bit values
+SAMPLE_FORMATS = {"int16": (np.dtype('<i2'), 1.0),
+                  "int32": (np.dtype('<i4'), 1.0 / 65536),
+                  "float32": (np.dtype('<f4'), 32768.0)}
+
+
+class FrameStats(NamedTuple):
+    """
+    Energy and level statistics for one frame of 16-bit PCM audio
+    """
+    rms: float
+    peak: int
+    dc_offset: float
+    silent: bool
+
+
+EMPTY_FRAME = FrameStats(rms=0.0, peak=0, dc_offset=0.0, silent=True)
+
+
+def analyze_frame(frame: np.ndarray) -> FrameStats:
+    """
+    Compute RMS, peak, DC offset and silence for a frame of int16 samples
+    with vectorized NumPy operations.
+    RMS is reported on the same scale as the energy threshold used by
+    `DeepSpeechLocalStreamThread` (normalized by sample width, x1000) so
+    existing thresholds remain valid.
+    :param frame: 1-D array of int16 samples
+    :returns: FrameStats for the frame; `silent` is True if every sample in
+        the frame has the same value (no signal at all)
+    """
+    if not len(frame):
+        return EMPTY_FRAME
+    high = int(frame.max())
+    low = int(frame.min())
+    samples = frame.astype(np.float64)
+    sum_squares = float(np.dot(samples, samples)) * \
+        SHORT_NORMALIZE * SHORT_NORMALIZE
+    rms = (sum_squares / (len(frame) / SAMPLE_WIDTH)) ** 0.5 * 1000
+    return FrameStats(rms=rms,
+                      peak=max(high, -low),
+                      dc_offset=float(samples.sum()) / len(frame),
+                      silent=high == low)
+
+
+class AudioFormat(NamedTuple):
+    """
+    Format of interleaved PCM input audio. A `sample_rate` of None is the
+    model's sample rate.
+    """
+    sample_rate: Optional[int] = None
+    channels: int = 1
+    sample_format: str = "int16"
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """
+        Read `input_sample_rate`, `input_channels` and `input_sample_format`
+        from plugin configuration
+        """
+        return cls(config.get("input_sample_rate"),
+                   config.get("input_channels", 1),
+                   config.get("input_sample_format", "int16"))
+
+    @property
+    def frame_bytes(self) -> int:
+        """
+        Bytes per frame (one sample of every channel)
+        """
+        return SAMPLE_FORMATS[self.sample_format][0].itemsize * self.channels
+
+    def is_native(self, sample_rate: int) -> bool:
+        """
+        :returns: True if audio in this format can be decoded without
+            conversion by a model with `sample_rate`
+        """
+        return self.channels == 1 and self.sample_format == "int16" and \
+            self.sample_rate in (None, sample_rate)
+
+
+class Resampler:
+    """
+    Band-limited sample rate conversion of a float32 stream. Input is
+    low-pass filtered below the lower of the two Nyquist frequencies with a
+    Kaiser-windowed sinc, applied as a polyphase filter bank at the output
+    positions, so frequencies the output rate cannot represent are removed
+    instead of folding into the speech band. Input history is carried across
+    chunks, so output does not depend on how the input is split; it lags the
+    input by half the filter length until `flush`.
+    """
+    zero_crossings = 16
+    rolloff = 0.9
+    kaiser_beta = 8.6
+    # Outputs computed at once, bounding the memory used by long inputs
+    block_size = 8192
+
+    def __init__(self, from_rate: int, to_rate: int):
+        """
+        :param from_rate: sample rate of the input
+        :param to_rate: sample rate of the output
+        """
+        divisor = gcd(from_rate, to_rate)
+        self._up = to_rate // divisor
+        self._down = from_rate // divisor
+        cutoff = min(1.0, self._up / self._down) * self.rolloff
+        # Half the filter length in input samples
+        self._half = int(np.ceil(self.zero_crossings / cutoff))
+        self._taps = np.arange(2 * self._half)
+        # Row p filters output at fractional input position p / up; column
+        # j weights input sample floor(position) - half + 1 + j
+        offsets = np.arange(self._up)[:, None] / self._up + \
+            self._half - 1 - self._taps[None, :]
+        window = np.i0(self.kaiser_beta * np.sqrt(np.clip(
+            1 - (offsets / self._half) ** 2, 0, None))) / \
+            np.i0(self.kaiser_beta)
+        bank = cutoff * np.sinc(cutoff * offsets) * window
+        # Unity gain at DC for every phase
+        self._bank = (bank / bank.sum(axis=1, keepdims=True)).astype(
+            np.float32)
+        self.reset()
+
+    def reset(self):
+        """
+        Clear the input history to start a new stream
+        """
+        # Samples before the start of the stream are zero
+        self._buffer = np.zeros(self._half, dtype=np.float32)
+        self._buffer_start = -self._half
+        self._in_count = 0
+        self._out_count = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Resample the next chunk of input.
+        :param samples: float32 samples at the input rate
+        :returns: float32 samples at the output rate that can be computed
+            from the input so far
+        """
+        if len(samples):
+            self._buffer = np.concatenate((self._buffer, samples))
+            self._in_count += len(samples)
+        return self._filter(self._in_count - 1 - self._half)
+
+    def flush(self) -> np.ndarray:
+        """
+        End the stream, returning output held back for input that will not
+        arrive, and reset for a new stream.
+        :returns: float32 samples at the output rate
+        """
+        self._buffer = np.concatenate((self._buffer, np.zeros(
+            self._half, dtype=np.float32)))
+        resampled = self._filter(self._in_count - 1)
+        self.reset()
+        return resampled
+
+    def _filter(self, last_index: int) -> np.ndarray:
+        """
+        Compute outputs whose filter is centered at or before `last_index`
+        """
+        end = max(((last_index + 1) * self._up - 1) // self._down + 1,
+                  self._out_count)
+        blocks = []
+        for block_start in range(self._out_count, end, self.block_size):
+            positions = np.arange(block_start,
+                                  min(block_start + self.block_size, end),
+                                  dtype=np.int64) * self._down
+            first = positions // self._up - self._half + 1 - \
+                self._buffer_start
+            inputs = self._buffer[first[:, None] + self._taps]
+            blocks.append(np.einsum("ij,ij->i", inputs,
+                                    self._bank[positions % self._up]))
+        self._out_count = end
+        # Drop history no longer needed by the next output
+        needed = (end * self._down) // self._up - self._half + 1
+        if needed > self._buffer_start:
+            self._buffer = self._buffer[needed - self._buffer_start:]
+            self._buffer_start = needed
+        if not blocks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+
+
+def resample(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """
+    Resample a complete int16 signal with the anti-aliasing `Resampler`.
+    :param samples: 1-D array of int16 samples
+    :param from_rate: sample rate of `samples`
+    :param to_rate: desired sample rate
+    :returns: int16 samples at `to_rate`
+    """
+    if from_rate == to_rate or not len(samples):
+        return samples
+    resampler = Resampler(from_rate, to_rate)
+    resampled = np.concatenate((resampler.process(
+        samples.astype(np.float32)), resampler.flush()))
+    return np.clip(np.round(resampled), -32768, 32767).astype(np.int16)
+
+
+class StreamConverter:
+    """
+    Converts a stream of PCM chunks in any `AudioFormat` to 16-bit mono at
+    the model's sample rate with vectorized NumPy operations. Partial frames
+    and resampler state are carried across chunks, so output does not
+    depend on how the input is split. An empty chunk ends the stream and
+    returns the audio held back by the `Resampler`.
+    """
+
+    def __init__(self, input_format: AudioFormat, sample_rate: int):
+        """
+        :param input_format: format of the input audio
+        :param sample_rate: model sample rate to convert to
+        """
+        if input_format.sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported sample format: "
+                             f"{input_format.sample_format}")
+        if input_format.channels < 1:
+            raise ValueError(f"Invalid channel count: "
+                             f"{input_format.channels}")
+        self.input_format = input_format
+        self.from_rate = input_format.sample_rate or sample_rate
+        self.to_rate = sample_rate
+        self._dtype, self._scale = SAMPLE_FORMATS[input_format.sample_format]
+        self._frame_bytes = input_format.frame_bytes
+        if self.from_rate == self.to_rate:
+            self._resampler = None
+        else:
+            self._resampler = Resampler(self.from_rate, self.to_rate)
+        self._remainder = np.zeros(0, dtype=np.uint8)
+
+    def process(self, data: Union[bytes, np.ndarray]) -> np.ndarray:
+        """
+        Convert the next chunk of input.
+        :param data: bytes of input audio, or an array holding them; empty
+            at the end of the stream
+        :returns: int16 mono samples at the model's sample rate
+        """
+        raw = data.view(np.uint8) if isinstance(data, np.ndarray) else \
+            np.frombuffer(data, dtype=np.uint8)
+        end_of_stream = not len(raw)
+        if len(self._remainder):
+            raw = np.concatenate((self._remainder, raw))
+        usable = len(raw) - len(raw) % self._frame_bytes
+        # Chunks may be views of a reused buffer
+        self._remainder = raw[usable:].copy()
+        samples = raw[:usable].view(self._dtype)
+        channels = self.input_format.channels
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1,
+                                                         dtype=np.float32)
+        else:
+            samples = samples.astype(np.float32)
+        if self._scale != 1.0:
+            samples *= self._scale
+        if self._resampler is not None:
+            samples = self._resampler.flush() if end_of_stream else \
+                self._resampler.process(samples)
+        return np.clip(np.round(samples), -32768, 32767).astype(np.int16)
+
+
+class SilenceGate:
+    """
+    Holds back audio before the decoder until speech energy is detected.
+    Leading audio is kept in a pre-roll buffer of `preroll_ms` that is
+    released with the first chunk containing speech, so the decoder has
+    context before the onset. After the onset, runs of constant-valued
+    (digitally silent) audio longer than `max_constant_ms` are skipped.
+    `input_time` maps times in the passed audio back to the input.
+    """
+
+    def __init__(self, sample_rate: int = 16000, threshold: float = 10,
+                 preroll_ms: int = 300, max_constant_ms: int = 200):
+        """
+        :param sample_rate: sample rate of processed audio
+        :param threshold: RMS threshold on the `analyze_frame` scale
+        :param preroll_ms: leading audio to pass with the first speech
+        :param max_constant_ms: constant audio to pass before skipping
+        """
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.open = False
+        self.skipped_samples = 0
+        self.passed_samples = 0
+        # Passed sample positions at which the skipped total changed
+        self._skip_positions: List[int] = []
+        self._skip_totals: List[int] = []
+        self._preroll = deque()
+        self._preroll_samples = 0
+        self._max_preroll = int(sample_rate * preroll_ms / 1000)
+        self._max_constant = int(sample_rate * max_constant_ms / 1000)
+        self._constant_run = 0
+
+    def process(self, samples: np.ndarray,
+                stats: Optional[FrameStats] = None) -> List[np.ndarray]:
+        """
+        Process a chunk of audio.
+        :param samples: int16 samples
+        :param stats: FrameStats for `samples`, if already computed
+        :returns: list of chunks to pass to the decoder (may be empty)
+        """
+        stats = stats or analyze_frame(samples)
+        if not self.open:
+            if stats.rms > self.threshold:
+                self.open = True
+                chunks = list(self._preroll) + [samples]
+                self._preroll.clear()
+                return self._pass(chunks)
+            if not self._max_preroll:
+                self.skipped_samples += len(samples)
+                return []
+            # Copy since `samples` may be a view into a reused buffer
+            self._preroll.append(samples.copy())
+            self._preroll_samples += len(samples)
+            while self._preroll_samples - len(self._preroll[0]) >= \
+                    self._max_preroll:
+                dropped = self._preroll.popleft()
+                self._preroll_samples -= len(dropped)
+                self.skipped_samples += len(dropped)
+            return []
+        if stats.silent:
+            self._constant_run += len(samples)
+            if self._constant_run > self._max_constant:
+                self.skipped_samples += len(samples)
+                return []
+        else:
+            self._constant_run = 0
+        return self._pass([samples])
+
+    def input_time(self, seconds: float) -> float:
+        """
+        Map a time in the audio passed by the gate to the input audio.
+        :param seconds: time from the start of the passed audio
+        :returns: time from the start of the input audio
+        """
+        idx = bisect_right(self._skip_positions,
+                           round(seconds * self.sample_rate)) - 1
+        skipped = self._skip_totals[idx] if idx >= 0 else 0
+        return seconds + skipped / self.sample_rate
+
+    def _pass(self, chunks: List[np.ndarray]) -> List[np.ndarray]:
+        skipped = self._skip_totals[-1] if self._skip_totals else 0
+        if self.skipped_samples != skipped:
+            self._skip_positions.append(self.passed_samples)
+            self._skip_totals.append(self.skipped_samples)
+        self.passed_samples += sum(len(chunk) for chunk in chunks)
+        return chunks
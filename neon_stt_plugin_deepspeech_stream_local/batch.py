@@ -0,0 +1,188 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Batch transcription of audio files with the non-streaming DeepSpeech API.
+Usage: python -m neon_stt_plugin_deepspeech_stream_local.batch <dir> [options]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from neon_stt_plugin_deepspeech_stream_local.audio import resample
+from neon_stt_plugin_deepspeech_stream_local.model_store import ModelStore
+from neon_stt_plugin_deepspeech_stream_local.shared_models import \
+    load_model, use_tflite
+
+# deepspeech.Model loaded by `_init_worker` in each worker process
+_worker_model = None
+
+
+class BatchResult(NamedTuple):
+    source: Union[str, int]
+    transcriptions: List[str]
+    audio_seconds: float
+    decode_seconds: float
+    error: Optional[str] = None
+
+    @property
+    def text(self) -> Optional[str]:
+        return self.transcriptions[0] if self.transcriptions else None
+
+
+def read_audio(audio: Union[str, bytes], sample_rate: int) -> np.ndarray:
+    """
+    Read audio from a WAV file path, WAV bytes, or raw 16-bit mono PCM bytes.
+    WAV audio is mixed down to mono and resampled to `sample_rate`; raw PCM
+    must already be at `sample_rate`.
+    :param audio: file path or bytes
+    :param sample_rate: sample rate expected by the model
+    :returns: int16 samples
+    """
+    if not isinstance(audio, str) and audio[:4] != b'RIFF':
+        return np.frombuffer(audio, dtype=np.int16)
+    with wave.open(audio if isinstance(audio, str) else
+                   io.BytesIO(audio), 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError("Audio must be 16-bit PCM")
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()),
+                                dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return resample(samples, rate, sample_rate)
+
+
+def _init_worker(model_path: str, scorer_path: Optional[str]):
+    global _worker_model
+    _worker_model, _ = load_model(model_path, scorer_path)
+
+
+def _transcribe(source: Union[str, int], audio: Union[str, bytes],
+                num_results: int) -> BatchResult:
+    start = time.monotonic()
+    audio_seconds = 0.0
+    try:
+        sample_rate = _worker_model.sampleRate()
+        samples = read_audio(audio, sample_rate)
+        audio_seconds = len(samples) / sample_rate
+        if num_results == 1:
+            transcriptions = [_worker_model.stt(samples).strip()]
+        else:
+            metadata = _worker_model.sttWithMetadata(samples, num_results)
+            transcriptions = ["".join(t.text for t in c.tokens).strip()
+                              for c in metadata.transcripts]
+        transcriptions = [t for t in transcriptions if t]
+        error = None
+    except Exception as e:
+        transcriptions = []
+        error = repr(e)
+    return BatchResult(source, transcriptions, audio_seconds,
+                       time.monotonic() - start, error)
+
+
+def transcribe_batch(inputs: Iterable[Union[str, bytes]], lang: str = "en",
+                     config: Optional[dict] = None,
+                     max_workers: Optional[int] = None,
+                     num_results: int = 1) -> Iterator[BatchResult]:
+    """
+    Transcribe audio files or buffers in parallel worker processes. Each
+    worker loads the model once. Results are yielded as they complete.
+    :param inputs: WAV file paths, WAV bytes, or raw 16-bit PCM bytes
+    :param lang: language of the audio
+    :param config: plugin configuration (`model_file`, `scorer_file`,
+        `model_cache_dir`, `offline`, `model_format`)
+    :param max_workers: number of worker processes (default CPU count)
+    :param num_results: number of candidate transcriptions per input
+    :returns: iterator of BatchResult; `source` is the file path for paths
+        or the input index for buffers
+    """
+    config = config or dict()
+    if config.get("model_file") and os.path.isfile(config["model_file"]):
+        model_path, scorer_path = config["model_file"], \
+            config.get("scorer_file")
+    else:
+        store = ModelStore(config.get("model_cache_dir"),
+                           config.get("offline", False))
+        model_path, scorer_path = store.resolve(lang, use_tflite(config))
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_init_worker,
+                             initargs=(model_path, scorer_path)) as executor:
+        futures = [executor.submit(_transcribe,
+                                   audio if isinstance(audio, str) else idx,
+                                   audio, num_results)
+                   for idx, audio in enumerate(inputs)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Transcribe a directory of WAV files")
+    parser.add_argument("directory", help="directory containing .wav files")
+    parser.add_argument("--lang", default="en", help="language of the audio")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes")
+    parser.add_argument("--results", type=int, default=1,
+                        help="number of candidate transcriptions per file")
+    parser.add_argument("--model", help="path to a model file")
+    parser.add_argument("--scorer", help="path to a scorer file")
+    parser.add_argument("--offline", action="store_true",
+                        help="only use models already downloaded")
+    parsed = parser.parse_args(args)
+    files = sorted(os.path.join(parsed.directory, f)
+                   for f in os.listdir(parsed.directory)
+                   if f.lower().endswith(".wav"))
+    config = {"model_file": parsed.model, "scorer_file": parsed.scorer,
+              "offline": parsed.offline}
+    start = time.monotonic()
+    audio_seconds = 0.0
+    for result in transcribe_batch(files, parsed.lang, config,
+                                   parsed.workers, parsed.results):
+        audio_seconds += result.audio_seconds
+        output = result._asdict()
+        output["text"] = result.text
+        print(json.dumps(output), flush=True)
+    elapsed = time.monotonic() - start
+    print(f"Transcribed {len(files)} files ({audio_seconds:.1f}s of audio) "
+          f"in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
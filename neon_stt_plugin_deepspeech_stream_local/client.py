@@ -0,0 +1,257 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import time
+
+from http.client import HTTPConnection
+from threading import Event
+from typing import Callable, List, Optional
+from urllib.parse import urlsplit
+
+from ovos_plugin_manager.templates.stt import StreamingSTT, StreamThread
+from ovos_utils.log import LOG
+
+from neon_stt_plugin_deepspeech_stream_local.languages import languages
+from neon_stt_plugin_deepspeech_stream_local.results import EMPTY_RESULT, \
+    PartialResult, TranscriptionResult
+
+DEFAULT_SERVER_URL = "http://127.0.0.1:8765"
+
+
+class ServerBusy(RuntimeError):
+    """
+    The server rejected a request with 503; it may be retried after
+    `retry_after` seconds
+    """
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RemoteSession:
+    """
+    One stream session on a `neon-deepspeech-server`, over a single
+    keep-alive connection.
+    """
+
+    def __init__(self, url: str = DEFAULT_SERVER_URL, lang: str = None,
+                 timeout: float = 30, max_retries: int = 5,
+                 max_backoff: float = 1.0, **options):
+        """
+        :param url: base URL of the server
+        :param lang: language of the audio; defaults to the server language
+        :param timeout: socket timeout in seconds
+        :param max_retries: times to retry audio the server rejects as busy
+        :param max_backoff: maximum seconds to wait between retries
+        :param options: session options (`profile`, `result_detail`,
+            `num_results`)
+        """
+        parts = urlsplit(url)
+        self._connection = HTTPConnection(parts.hostname, parts.port,
+                                          timeout=timeout)
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.partial: Optional[PartialResult] = None
+        self.done = False
+        self._closed = False
+        response = self._request("POST", "/v1/sessions",
+                                 json.dumps({"lang": lang, **options}))
+        self.session_id = response["session_id"]
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Send a chunk of 16-bit PCM audio.
+        :param chunk: audio to transcribe
+        :returns: False if the server has ended the utterance
+        """
+        backoff = 0.05
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._request(
+                    "POST", f"/v1/sessions/{self.session_id}/audio", chunk)
+                break
+            except ServerBusy as e:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(min(backoff, e.retry_after, self.max_backoff))
+                backoff *= 2
+        if response["partial"]:
+            self.partial = PartialResult(**response["partial"])
+        self.done = response["done"]
+        return not self.done
+
+    def finish(self) -> dict:
+        """
+        End the session and wait for its result.
+        :returns: dict with `text`, `transcriptions` and serialized `result`
+        """
+        # The server removes the session whether or not this succeeds
+        self._closed = True
+        try:
+            return self._request("POST",
+                                 f"/v1/sessions/{self.session_id}/finish")
+        finally:
+            self._connection.close()
+
+    def close(self):
+        """
+        Discard the session on the server if it was not finished, freeing
+        its slot immediately
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._request("DELETE", f"/v1/sessions/{self.session_id}")
+        except Exception as e:
+            LOG.debug(f"Failed to discard session {self.session_id}: {e}")
+        finally:
+            self._connection.close()
+
+    def _request(self, method: str, path: str, body=None) -> dict:
+        self._connection.request(method, path, body)
+        response = self._connection.getresponse()
+        payload = response.read()
+        data = json.loads(payload) if payload else dict()
+        if response.status == 503:
+            raise ServerBusy(f"{method} {path} failed (503): "
+                             f"{data.get('error')}",
+                             float(response.getheader("Retry-After") or 1))
+        if response.status >= 400:
+            raise RuntimeError(f"{method} {path} failed ({response.status}): "
+                               f"{data.get('error')}")
+        return data
+
+
+class DeepSpeechRemoteStreamingSTT(StreamingSTT):
+    """
+        Streaming STT interface for a shared `neon-deepspeech-server`
+    """
+
+    def __init__(self, config=None, **kwargs):
+        super(DeepSpeechRemoteStreamingSTT, self).__init__(config=config)
+        self.results_event = kwargs.get("results_event")
+        self.on_partial: Optional[Callable[[PartialResult], None]] = \
+            kwargs.get("on_partial")
+        self.language = self.config.get('lang') or self.lang
+        self.server_url = self.config.get("server_url", DEFAULT_SERVER_URL)
+        self.timeout = self.config.get("timeout", 30)
+        self.max_retries = self.config.get("max_retries", 5)
+        self._languages: Optional[set] = None
+
+    def create_streaming_thread(self):
+        return RemoteStreamThread(self.queue, self.language, self,
+                                  self.results_event)
+
+    def open_session(self, lang: str = None, **options) -> RemoteSession:
+        """
+        Start a new session on the server, independent of `stream_start`.
+        :param lang: language of the audio; defaults to the plugin language
+        :param options: session options (`profile`, `result_detail`,
+            `num_results`)
+        :returns: RemoteSession to `feed` audio to
+        """
+        return RemoteSession(self.server_url, lang or self.language,
+                             self.timeout, self.max_retries, **options)
+
+    def status(self) -> dict:
+        """
+        Get the server's languages, session counts and model status
+        """
+        parts = urlsplit(self.server_url)
+        connection = HTTPConnection(parts.hostname, parts.port,
+                                    timeout=self.timeout)
+        try:
+            connection.request("GET", "/v1/status")
+            return json.loads(connection.getresponse().read())
+        finally:
+            connection.close()
+
+    @property
+    def available_languages(self) -> set:
+        """
+        Languages served by the server, fetched once; the plugin's own
+        languages while the server is unreachable
+        """
+        if self._languages is None:
+            try:
+                self._languages = set(self.status()["languages"])
+            except Exception as e:
+                LOG.warning(f"Failed to get languages from server: {e}")
+                return set(languages.keys())
+        return self._languages
+
+
+class RemoteStreamThread(StreamThread):
+    def __init__(self, queue, lang, stt_class, results_event=None):
+        super().__init__(queue, lang)
+        self.name = "RemoteStreamThread"
+        self.open_session = stt_class.open_session
+        self.on_partial = stt_class.on_partial
+        self.results_event = results_event or Event()
+        self.result: TranscriptionResult = EMPTY_RESULT
+
+    def handle_audio_stream(self, audio, language):
+        session = None
+        try:
+            session = self.open_session(language)
+            partial = None
+            for data in audio:
+                running = session.feed(data)
+                if self.on_partial is not None and session.partial != partial:
+                    partial = session.partial
+                    try:
+                        self.on_partial(partial)
+                    except Exception as e:
+                        LOG.exception(e)
+                if not running:
+                    break
+            self.result = TranscriptionResult.from_dict(
+                session.finish()["result"])
+        except Exception as e:
+            LOG.error(f"Remote transcription failed: {e}")
+            self.result = EMPTY_RESULT
+        finally:
+            if session is not None:
+                session.close()
+        self.text = self.result.text
+        self.results_event.set()
+        LOG.debug(f"self.text={self.text}")
+        return self.transcriptions
+
+    @property
+    def transcriptions(self) -> List[str]:
+        """
+        Candidate transcriptions of the last utterance, best first
+        """
+        return self.result.transcriptions
+
+    def finalize(self):
+        self.results_event.wait()
+        return super().finalize()
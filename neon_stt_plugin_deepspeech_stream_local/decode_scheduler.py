@@ -0,0 +1,118 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from typing import Optional
+
+from neon_stt_plugin_deepspeech_stream_local.audio import FrameStats
+
+POLICIES = ("always", "interval", "energy", "adaptive")
+
+
+class DecodeScheduler:
+    """
+    Decides which fed chunks are followed by an `intermediateDecode` call.
+    Policies:
+      always: decode after every chunk (legacy behavior)
+      interval: decode once every `interval_ms` of audio
+      energy: decode once every `interval_ms` of audio, only if a chunk
+              since the last decode had energy above `energy_threshold`
+      adaptive: like `interval`, but the interval doubles (up to
+                `max_interval_ms`) each time the hypothesis is unchanged
+                and resets when it changes
+    """
+
+    def __init__(self, policy: str = "interval", sample_rate: int = 16000,
+                 interval_ms: int = 200, max_interval_ms: int = 1600,
+                 energy_threshold: float = 10):
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid decode policy: {policy}")
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self.energy_threshold = energy_threshold
+        self._min_interval = max(int(sample_rate * interval_ms / 1000), 1)
+        self._max_interval = max(int(sample_rate * max_interval_ms / 1000),
+                                 self._min_interval)
+        self._interval = self._min_interval
+        self._pending_samples = 0
+        self._energy_since_decode = False
+        self._last_hypothesis: Optional[str] = None
+        self.performed = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_config(cls, config: dict, sample_rate: int = 16000):
+        """
+        Build a scheduler from plugin configuration.
+        :param config: dict plugin config (`decode_policy`,
+            `decode_interval_ms`, `decode_max_interval_ms`)
+        :param sample_rate: sample rate of the audio being fed
+        """
+        config = config or dict()
+        return cls(policy=config.get("decode_policy", "interval"),
+                   sample_rate=sample_rate,
+                   interval_ms=config.get("decode_interval_ms", 200),
+                   max_interval_ms=config.get("decode_max_interval_ms", 1600))
+
+    def should_decode(self, num_samples: int, frame_stats: FrameStats) -> bool:
+        """
+        Account for a chunk that was just fed and determine if the stream
+        should be decoded now.
+        :param num_samples: number of samples in the fed chunk
+        :param frame_stats: FrameStats for the fed chunk
+        :returns: True if `intermediateDecode` should be called
+        """
+        self._pending_samples += num_samples
+        if frame_stats.rms > self.energy_threshold:
+            self._energy_since_decode = True
+        if self.policy == "always":
+            decode = True
+        elif self._pending_samples < self._interval:
+            decode = False
+        elif self.policy == "energy":
+            decode = self._energy_since_decode
+        else:
+            decode = True
+        if decode:
+            self.performed += 1
+            self._pending_samples = 0
+            self._energy_since_decode = False
+        else:
+            self.skipped += 1
+        return decode
+
+    def update(self, hypothesis: str):
+        """
+        Report the hypothesis returned by the last decode.
+        :param hypothesis: str intermediate transcript
+        """
+        if self.policy == "adaptive":
+            if hypothesis == self._last_hypothesis:
+                self._interval = min(self._interval * 2, self._max_interval)
+            else:
+                self._interval = self._min_interval
+        self._last_hypothesis = hypothesis
@@ -0,0 +1,131 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+import json
+
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Optional
+
+from ovos_utils.log import LOG
+
+
+@dataclass
+class DecoderSettings:
+    """
+    Decoder parameters for a language. Unset values keep the model and
+    scorer defaults. Changes apply to streams created afterwards; existing
+    streams keep the settings they were created with.
+    """
+    scorer_path: Optional[str] = None
+    alpha: Optional[float] = None
+    beta: Optional[float] = None
+    beam_width: Optional[int] = None
+    hot_words: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_config(cls, config: dict, scorer_path: Optional[str] = None):
+        """
+        Build settings from plugin configuration.
+        :param config: plugin configuration
+        :param scorer_path: scorer enabled when the model was loaded
+        """
+        return cls(scorer_path, config.get("scorer_alpha"),
+                   config.get("scorer_beta"), config.get("beam_width"),
+                   dict(config.get("hot_words") or dict()))
+
+    @property
+    def identity(self) -> str:
+        """
+        Identity of these settings, for keys of cached results
+        """
+        return hashlib.sha256(json.dumps(asdict(self), sort_keys=True)
+                              .encode()).hexdigest()[:16]
+
+    def apply(self, client, loaded_scorer: Optional[str] = None):
+        """
+        Apply all settings to a newly loaded model.
+        :param client: deepspeech.Model to configure
+        :param loaded_scorer: scorer enabled when the model was loaded
+        """
+        if self.scorer_path != loaded_scorer:
+            self.set_scorer(client, self.scorer_path)
+        elif self.scorer_path and self.alpha is not None and \
+                self.beta is not None:
+            client.setScorerAlphaBeta(self.alpha, self.beta)
+        if self.beam_width:
+            client.setBeamWidth(self.beam_width)
+        for word, boost in self.hot_words.items():
+            self._set_hot_word(client, word, boost)
+
+    def set_scorer(self, client, scorer_path: Optional[str]):
+        """
+        Enable a scorer, replacing the current one, or disable the scorer.
+        Alpha and beta are reapplied if set.
+        :param client: deepspeech.Model to configure
+        :param scorer_path: scorer file to enable, or None to disable
+        """
+        if scorer_path:
+            LOG.info(f"Enabling scorer {scorer_path}")
+            client.enableExternalScorer(scorer_path)
+            if self.alpha is not None and self.beta is not None:
+                client.setScorerAlphaBeta(self.alpha, self.beta)
+        else:
+            LOG.info("Disabling scorer")
+            client.disableExternalScorer()
+        self.scorer_path = scorer_path
+
+    def set_alpha_beta(self, client, alpha: float, beta: float):
+        client.setScorerAlphaBeta(alpha, beta)
+        self.alpha, self.beta = alpha, beta
+
+    def set_beam_width(self, client, beam_width: int):
+        client.setBeamWidth(beam_width)
+        self.beam_width = beam_width
+
+    def add_hot_word(self, client, word: str, boost: float):
+        self._set_hot_word(client, word, boost)
+        self.hot_words[word] = boost
+
+    def erase_hot_word(self, client, word: str):
+        if word in self.hot_words:
+            client.eraseHotWord(word)
+            del self.hot_words[word]
+
+    def clear_hot_words(self, client):
+        client.clearHotWords()
+        self.hot_words.clear()
+
+    @staticmethod
+    def _set_hot_word(client, word: str, boost: float):
+        try:
+            client.addHotWord(word, boost)
+        except RuntimeError:
+            # Word is already boosted; replace its boost
+            client.eraseHotWord(word)
+            client.addHotWord(word, boost)
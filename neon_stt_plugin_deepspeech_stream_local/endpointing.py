@@ -0,0 +1,184 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+
+from typing import Optional
+
+from ovos_utils.log import LOG
+
+from neon_stt_plugin_deepspeech_stream_local.audio import analyze_frame
+
+
+class EnergyVAD:
+    """
+    Classifies frames as speech when their RMS exceeds a threshold
+    """
+
+    def __init__(self, threshold: float = 10):
+        """
+        :param threshold: RMS threshold on the `analyze_frame` scale
+        """
+        self.threshold = threshold
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        return analyze_frame(frame).rms > self.threshold
+
+
+class WebRtcVAD:
+    """
+    Classifies frames with the WebRTC VAD (requires `webrtcvad`)
+    """
+
+    def __init__(self, sample_rate: int, aggressiveness: int = 2):
+        import webrtcvad
+        self._vad = webrtcvad.Vad(aggressiveness)
+        self._sample_rate = sample_rate
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        return self._vad.is_speech(frame.tobytes(), self._sample_rate)
+
+
+class Endpointer:
+    """
+    Detects the end of an utterance from audio time. Audio is split into
+    fixed-length VAD frames; the utterance ends after `trailing_silence_ms`
+    without speech following speech, after `leading_silence_ms` with no
+    speech at all, or after `max_utterance_ms` of audio.
+    """
+
+    def __init__(self, sample_rate: int = 16000, vad=None,
+                 frame_ms: int = 30, trailing_silence_ms: int = 1000,
+                 leading_silence_ms: int = 5000,
+                 max_utterance_ms: int = 20000, min_speech_ms: int = 60):
+        """
+        :param sample_rate: sample rate of audio passed to `process`
+        :param vad: object with an `is_speech(frame)` method; defaults to
+            EnergyVAD
+        :param frame_ms: VAD frame length (10, 20, or 30 for WebRTC VAD)
+        :param trailing_silence_ms: silence after speech that ends an
+            utterance
+        :param leading_silence_ms: audio with no speech that ends an
+            utterance
+        :param max_utterance_ms: maximum utterance length
+        :param min_speech_ms: consecutive speech needed to start an utterance
+        """
+        self.sample_rate = sample_rate
+        self.vad = vad or EnergyVAD()
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self._trailing = self._samples(trailing_silence_ms)
+        self._leading = self._samples(leading_silence_ms)
+        self._max = self._samples(max_utterance_ms)
+        self._min_speech = self._samples(min_speech_ms)
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self.samples_processed = 0
+        self.speech_started = False
+        self.last_speech_sample: Optional[int] = None
+        self._speech_run = 0
+        self.endpoint_sample: Optional[int] = None
+        self.reason: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, config: dict, sample_rate: int = 16000):
+        """
+        Build an endpointer from plugin configuration.
+        :param config: dict plugin config (`vad`, `vad_threshold`,
+            `vad_aggressiveness`, `trailing_silence_ms`, `leading_silence_ms`,
+            `max_utterance_ms`)
+        :param sample_rate: sample rate of the audio being processed
+        """
+        config = config or dict()
+        vad = None
+        if config.get("vad") == "webrtc":
+            try:
+                vad = WebRtcVAD(sample_rate,
+                                config.get("vad_aggressiveness", 2))
+            except ImportError:
+                LOG.warning("webrtcvad not installed; using energy VAD")
+        vad = vad or EnergyVAD(config.get("vad_threshold", 10))
+        return cls(sample_rate, vad,
+                   trailing_silence_ms=config.get("trailing_silence_ms", 1000),
+                   leading_silence_ms=config.get("leading_silence_ms", 5000),
+                   max_utterance_ms=config.get("max_utterance_ms", 20000))
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.samples_processed / self.sample_rate
+
+    @property
+    def done(self) -> bool:
+        return self.endpoint_sample is not None
+
+    def process(self, samples: np.ndarray) -> bool:
+        """
+        Process a chunk of audio of any length.
+        :param samples: int16 samples
+        :returns: True if the end of the utterance has been reached
+        """
+        if self.done:
+            return True
+        if len(self._remainder):
+            samples = np.concatenate((self._remainder, samples))
+        num_frames = len(samples) // self.frame_length
+        for idx in range(num_frames):
+            frame = samples[idx * self.frame_length:
+                            (idx + 1) * self.frame_length]
+            if self._process_frame(frame):
+                self._remainder = np.zeros(0, dtype=np.int16)
+                return True
+        self._remainder = samples[num_frames * self.frame_length:].copy()
+        return False
+
+    def _process_frame(self, frame: np.ndarray) -> bool:
+        self.samples_processed += len(frame)
+        if self.vad.is_speech(frame):
+            self._speech_run += len(frame)
+            if self._speech_run >= self._min_speech:
+                self.speech_started = True
+            if self.speech_started:
+                self.last_speech_sample = self.samples_processed
+        else:
+            self._speech_run = 0
+        if self.speech_started:
+            if self.samples_processed - self.last_speech_sample >= \
+                    self._trailing:
+                return self._endpoint("trailing_silence")
+        elif self.samples_processed >= self._leading:
+            return self._endpoint("no_speech")
+        if self.samples_processed >= self._max:
+            return self._endpoint("max_utterance")
+        return False
+
+    def _endpoint(self, reason: str) -> bool:
+        self.endpoint_sample = self.samples_processed
+        self.reason = reason
+        LOG.debug(f"Endpoint at {self.audio_seconds}s ({reason})")
+        return True
+
+    def _samples(self, milliseconds: int) -> int:
+        return int(self.sample_rate * milliseconds / 1000)
@@ -0,0 +1,239 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, NamedTuple, \
+    Optional, Union
+
+from neon_stt_plugin_deepspeech_stream_local.endpointing import EnergyVAD, \
+    Endpointer
+from neon_stt_plugin_deepspeech_stream_local.results import Word
+from neon_stt_plugin_deepspeech_stream_local.stream_decoder import \
+    StreamDecoder
+
+
+class Segment(NamedTuple):
+    """
+    Transcription of one segment of long-form audio. Times are seconds from
+    the start of the audio.
+    """
+    start: float
+    end: float
+    text: str
+    words: List[Word]
+    confidence: Optional[float]
+
+
+class LongFormTranscriber:
+    """
+    Transcribes audio of any length as a sequence of segments. A segment
+    starts at speech and ends after `min_silence_ms` of silence, or is cut
+    after `max_segment_ms`. Each segment is decoded with its own stream,
+    finalized as soon as it ends and freed, so memory does not grow with the
+    length of the input.
+
+    Segments start with up to `overlap_ms` of the preceding audio. Where a
+    segment was cut during speech, words are assigned to the segment on
+    whichever side of the middle of the overlap they start, so words at the
+    cut are neither lost nor repeated.
+    """
+
+    def __init__(self, create_decoder: Callable[[], StreamDecoder],
+                 sample_rate: int = 16000, vad=None, frame_ms: int = 30,
+                 min_silence_ms: int = 600, max_segment_ms: int = 15000,
+                 overlap_ms: int = 500,
+                 on_finish: Optional[Callable[[StreamDecoder], None]] = None):
+        """
+        :param create_decoder: callable returning a StreamDecoder for a new
+            segment; decoders must return word timings
+        :param sample_rate: sample rate of the audio
+        :param vad: object with an `is_speech(frame)` method; defaults to
+            EnergyVAD
+        :param frame_ms: VAD frame length
+        :param min_silence_ms: silence after speech that ends a segment
+        :param max_segment_ms: maximum segment length
+        :param overlap_ms: preceding audio included at the start of a segment
+        :param on_finish: optional callback with each finished decoder
+        """
+        self._create_decoder = create_decoder
+        self.sample_rate = sample_rate
+        self.vad = vad or EnergyVAD()
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self._min_silence = int(sample_rate * min_silence_ms / 1000)
+        self._max_segment = int(sample_rate * max_segment_ms / 1000)
+        self._overlap = int(sample_rate * overlap_ms / 1000)
+        self._on_finish = on_finish
+        self._history = deque(maxlen=max(self._overlap //
+                                         self.frame_length, 1))
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self._pending: List[np.ndarray] = []
+        self._decoder: Optional[StreamDecoder] = None
+        self._segment_start = 0
+        self._keep_from: Optional[int] = None
+        self._silence_run = 0
+        self.samples_processed = 0
+
+    @classmethod
+    def from_config(cls, config: dict,
+                    create_decoder: Callable[[], StreamDecoder],
+                    sample_rate: int = 16000, **kwargs):
+        """
+        Build a transcriber from plugin configuration (`vad`,
+        `vad_threshold`, `longform_silence_ms`, `longform_max_segment_ms`,
+        `longform_overlap_ms`).
+        :param sample_rate: sample rate of the audio, i.e. the model's
+        """
+        config = config or dict()
+        vad = Endpointer.from_config(config, sample_rate).vad
+        return cls(create_decoder, sample_rate, vad,
+                   min_silence_ms=config.get("longform_silence_ms", 600),
+                   max_segment_ms=config.get("longform_max_segment_ms",
+                                             15000),
+                   overlap_ms=config.get("longform_overlap_ms", 500),
+                   **kwargs)
+
+    def transcribe(self, audio: Iterable[Union[bytes, np.ndarray]]) -> \
+            Iterator[Segment]:
+        """
+        Transcribe audio as it is read.
+        :param audio: iterable of 16-bit mono PCM chunks
+        :returns: iterator of Segments as they are finalized
+        """
+        for chunk in audio:
+            yield from self.feed(chunk)
+        yield from self.finish()
+
+    def feed(self, data: Union[bytes, np.ndarray]) -> List[Segment]:
+        """
+        Process a chunk of audio of any length.
+        :param data: bytes or int16 array of 16-bit mono PCM audio
+        :returns: segments finalized by this chunk
+        """
+        samples = data if isinstance(data, np.ndarray) else \
+            np.frombuffer(data, dtype=np.int16)
+        if len(self._remainder):
+            samples = np.concatenate((self._remainder, samples))
+        segments = []
+        num_frames = len(samples) // self.frame_length
+        for idx in range(num_frames):
+            segment = self._process_frame(
+                samples[idx * self.frame_length:
+                        (idx + 1) * self.frame_length])
+            if segment:
+                segments.append(segment)
+        self._remainder = samples[num_frames * self.frame_length:].copy()
+        self._flush()
+        return segments
+
+    def finish(self) -> List[Segment]:
+        """
+        Finalize the current segment at the end of the audio.
+        :returns: the last segment, if it contains speech
+        """
+        if self._decoder is None:
+            return []
+        if len(self._remainder):
+            self._pending.append(self._remainder)
+            self.samples_processed += len(self._remainder)
+            self._remainder = np.zeros(0, dtype=np.int16)
+        self._flush()
+        segment = self._end_segment(self.samples_processed -
+                                    self._silence_run, None)
+        return [segment] if segment else []
+
+    def _process_frame(self, frame: np.ndarray) -> Optional[Segment]:
+        self.samples_processed += len(frame)
+        # Frames may be views of the caller's buffer
+        self._history.append(frame.copy())
+        speech = self.vad.is_speech(frame)
+        if self._decoder is None:
+            if not speech:
+                return None
+            self._start_segment()
+        else:
+            self._pending.append(self._history[-1])
+            self._silence_run = 0 if speech else \
+                self._silence_run + len(frame)
+        if self._silence_run >= self._min_silence:
+            self._flush()
+            return self._end_segment(
+                self.samples_processed - self._silence_run, None)
+        if self.samples_processed - self._segment_start >= \
+                self._max_segment:
+            self._flush()
+            boundary = self.samples_processed - self._overlap // 2
+            segment = self._end_segment(boundary, boundary)
+            self._start_segment()
+            self._keep_from = boundary
+            return segment
+        return None
+
+    def _start_segment(self):
+        """
+        Start a segment with the most recent audio, including the current
+        frame, as context
+        """
+        self._decoder = self._create_decoder()
+        self._silence_run = 0
+        self._pending = list(self._history)
+        self._segment_start = self.samples_processed - \
+            sum(len(frame) for frame in self._history)
+        self._keep_from = None
+
+    def _flush(self):
+        if self._decoder is not None and self._pending:
+            self._decoder.feed(np.concatenate(self._pending))
+        self._pending = []
+
+    def _end_segment(self, end: int, keep_until: Optional[int]) -> \
+            Optional[Segment]:
+        decoder, self._decoder = self._decoder, None
+        result = decoder.finish()
+        if self._on_finish:
+            self._on_finish(decoder)
+        if not result.candidates:
+            return None
+        candidate = result.candidates[0]
+        offset = self._segment_start / self.sample_rate
+        words = [word._replace(start_time=word.start_time + offset)
+                 for word in candidate.words]
+        if self._keep_from is not None:
+            words = [word for word in words if word.start_time >=
+                     self._keep_from / self.sample_rate]
+        if keep_until is not None:
+            words = [word for word in words if word.start_time <
+                     keep_until / self.sample_rate]
+        if not words:
+            return None
+        start = self._segment_start if self._keep_from is None \
+            else self._keep_from
+        return Segment(start / self.sample_rate, end / self.sample_rate,
+                       " ".join(word.text for word in words), words,
+                       candidate.confidence)
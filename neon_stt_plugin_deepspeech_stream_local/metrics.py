@@ -0,0 +1,180 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from abc import ABCMeta, abstractmethod
+from bisect import bisect_left
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Dict, Optional, Sequence
+
+
+@dataclass
+class UtteranceMetrics:
+    """
+    Timing and volume measurements for one utterance. Durations are seconds.
+    """
+    lang: str = ""
+    model_acquire_seconds: float = 0.0
+    stream_create_seconds: float = 0.0
+    audio_seconds: float = 0.0
+    feed_seconds: float = 0.0
+    decode_seconds: float = 0.0
+    decode_count: int = 0
+    finalize_seconds: float = 0.0
+    result_latency_seconds: Optional[float] = None
+
+    @property
+    def processing_seconds(self) -> float:
+        return self.feed_seconds + self.decode_seconds + self.finalize_seconds
+
+    @property
+    def real_time_factor(self) -> Optional[float]:
+        """
+        Processing time per second of audio, or None for empty audio
+        """
+        if not self.audio_seconds:
+            return None
+        return self.processing_seconds / self.audio_seconds
+
+    def as_dict(self) -> dict:
+        metrics = asdict(self)
+        metrics["processing_seconds"] = self.processing_seconds
+        metrics["real_time_factor"] = self.real_time_factor
+        return metrics
+
+
+def _default_buckets() -> Sequence[float]:
+    # 100us to ~105s in steps of 2^(1/4) (~19%)
+    return [0.0001 * 2 ** (i / 4) for i in range(81)]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with approximate percentiles
+    """
+
+    def __init__(self, buckets: Optional[Sequence[float]] = None):
+        """
+        :param buckets: sorted upper bounds of histogram buckets; values
+            above the last bound are counted in an overflow bucket
+        """
+        self.buckets = list(buckets or _default_buckets())
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Get the upper bound of the bucket containing a percentile
+        :param percent: percentile to get (0-100)
+        :returns: approximate value, or None if no values were added
+        """
+        if not self.count:
+            return None
+        target = max(percent / 100 * self.count, 1)
+        cumulative = 0
+        for idx, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                if idx == len(self.buckets):
+                    return self.max
+                return min(self.buckets[idx], self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {"count": self.count,
+                "sum": self.total,
+                "mean": self.total / self.count if self.count else None,
+                "min": self.min,
+                "max": self.max,
+                "p50": self.percentile(50),
+                "p95": self.percentile(95),
+                "p99": self.percentile(99)}
+
+
+class MetricsSink(metaclass=ABCMeta):
+    """
+    Base class for receivers of per-utterance metrics
+    """
+
+    @abstractmethod
+    def record(self, metrics: UtteranceMetrics):
+        """
+        Receive the metrics of one finished utterance
+        :param metrics: measurements of the utterance
+        """
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """
+    Aggregates utterance metrics into in-memory histograms per measurement
+    """
+
+    def __init__(self, buckets: Optional[Sequence[float]] = None):
+        self._buckets = buckets
+        self._histograms: Dict[str, Histogram] = dict()
+        self._lock = Lock()
+        self.last: Optional[UtteranceMetrics] = None
+
+    def record(self, metrics: UtteranceMetrics):
+        values = metrics.as_dict()
+        values.pop("lang")
+        with self._lock:
+            self.last = metrics
+            for name, value in values.items():
+                if value is None:
+                    continue
+                if name not in self._histograms:
+                    self._histograms[name] = Histogram(self._buckets)
+                self._histograms[name].add(value)
+
+    def histogram(self, name: str) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get(name)
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        Get aggregate statistics for each recorded measurement
+        """
+        with self._lock:
+            return {name: hist.summary()
+                    for name, hist in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self.last = None
@@ -0,0 +1,189 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Callable, Optional
+
+from ovos_utils.log import LOG
+
+
+class ModelPool:
+    """
+    Bounded LRU pool of loaded models keyed by language. Models are evicted
+    least recently used first when the pool exceeds `max_models` entries or
+    `max_bytes` of approximate model size; pinned models are never evicted.
+    """
+
+    def __init__(self, max_models: Optional[int] = None,
+                 max_bytes: Optional[int] = None,
+                 on_evict: Optional[Callable[[str, Any], None]] = None):
+        """
+        :param max_models: maximum number of resident models (None for no limit)
+        :param max_bytes: maximum total approximate size of resident models
+            in bytes (None for no limit)
+        :param on_evict: optional callback called with (lang, model) when a
+            model is evicted
+        """
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._models = OrderedDict()
+        self._sizes = dict()
+        self._pinned = set()
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, lang: str) -> bool:
+        with self._lock:
+            return lang in self._models
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._models)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    @property
+    def resident(self) -> dict:
+        """
+        Dict of resident language to approximate model size in bytes, in
+        least to most recently used order
+        """
+        with self._lock:
+            return {lang: self._sizes[lang] for lang in self._models}
+
+    @property
+    def stats(self) -> dict:
+        """
+        Pool usage statistics
+        """
+        with self._lock:
+            return {"resident": self.resident,
+                    "pinned": sorted(self._pinned),
+                    "total_bytes": self.total_bytes,
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions}
+
+    def get(self, lang: str) -> Optional[Any]:
+        """
+        Get a resident model and mark it most recently used.
+        :param lang: language of the model to get
+        :returns: model if resident, else None
+        """
+        with self._lock:
+            model = self._models.get(lang)
+            if model is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._models.move_to_end(lang)
+            return model
+
+    def peek(self, lang: str) -> Optional[Any]:
+        """
+        Get a resident model without updating usage order or statistics.
+        :param lang: language of the model to get
+        :returns: model if resident, else None
+        """
+        with self._lock:
+            return self._models.get(lang)
+
+    def put(self, lang: str, model: Any, size: int = 0,
+            pinned: bool = False):
+        """
+        Add a model to the pool, evicting other models if limits are exceeded.
+        :param lang: language of the model
+        :param model: loaded model object
+        :param size: approximate memory size of the model in bytes
+        :param pinned: if True, this model will never be evicted
+        """
+        with self._lock:
+            self._models[lang] = model
+            self._models.move_to_end(lang)
+            self._sizes[lang] = size
+            if pinned:
+                self._pinned.add(lang)
+            self._enforce_limits(keep=lang)
+
+    def pin(self, lang: str):
+        with self._lock:
+            self._pinned.add(lang)
+
+    def unpin(self, lang: str):
+        with self._lock:
+            self._pinned.discard(lang)
+            self._enforce_limits()
+
+    def evict(self, lang: str) -> bool:
+        """
+        Remove a model from the pool, even if it is pinned.
+        :param lang: language of the model to remove
+        :returns: True if a model was removed
+        """
+        with self._lock:
+            if lang not in self._models:
+                return False
+            self._pinned.discard(lang)
+            self._remove(lang)
+            return True
+
+    def _over_limit(self) -> bool:
+        if self.max_models is not None and \
+                len(self._models) > self.max_models:
+            return True
+        if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            return True
+        return False
+
+    def _enforce_limits(self, keep: Optional[str] = None):
+        while self._over_limit():
+            candidates = [lang for lang in self._models
+                          if lang not in self._pinned and lang != keep]
+            if not candidates:
+                LOG.warning(f"Model pool over limit with no evictable "
+                            f"models: {list(self._models)}")
+                return
+            self._remove(candidates[0])
+
+    def _remove(self, lang: str):
+        model = self._models.pop(lang)
+        self._sizes.pop(lang, None)
+        self.evictions += 1
+        LOG.info(f"Evicted model for {lang}")
+        if self.on_evict:
+            try:
+                self.on_evict(lang, model)
+            except Exception as e:
+                LOG.exception(e)
@@ -0,0 +1,251 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+import json
+import os
+import shutil
+
+from os.path import expanduser, isfile, join
+from threading import Lock, RLock
+from typing import Callable, Dict, Optional, Tuple
+
+from ovos_utils.log import LOG
+
+from neon_stt_plugin_deepspeech_stream_local.languages import languages
+
+
+def _default_cache_dir() -> str:
+    data_home = os.environ.get("XDG_DATA_HOME") or \
+        expanduser("~/.local/share")
+    return join(data_home, "neon", "deepspeech_stream_local")
+
+
+def file_checksum(path: str, block_size: int = 1 << 20) -> str:
+    """
+    Get the sha256 hex digest of a file
+    :param path: path to file to hash
+    :param block_size: bytes to read at a time
+    :returns: str hex digest
+    """
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def link_file(src: str, dst: str) -> str:
+    """
+    Make `src` available at `dst` without copying if possible. A hardlink is
+    preferred, then a symlink; a copy is only made if neither is supported.
+    :param src: existing file
+    :param dst: path to create
+    :returns: str method used ("hardlink", "symlink", or "copy")
+    """
+    src = os.path.realpath(src)
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        pass
+    try:
+        os.symlink(src, dst)
+        return "symlink"
+    except OSError:
+        pass
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+class ModelStore:
+    """
+    Local store of model and scorer files. Resolved files are linked into
+    `cache_dir` and recorded with their checksums in a manifest so that
+    later lookups are satisfied from disk without calling the hub client.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, offline: bool = False,
+                 downloader: Optional[Callable[..., str]] = None):
+        """
+        :param cache_dir: directory to store linked files and the manifest in
+        :param offline: if True, never call `downloader`
+        :param downloader: callable accepting `repo_id` and `filename` and
+            returning a local file path; defaults to `hf_hub_download`
+        """
+        self.cache_dir = expanduser(cache_dir or _default_cache_dir())
+        self.manifest_path = join(self.cache_dir, "manifest.json")
+        self.offline = offline
+        self._downloader = downloader
+        # Guards the manifest; downloads hold only a per-language lock so
+        # languages are fetched in parallel
+        self._lock = RLock()
+        self._fetch_locks: Dict[Tuple[str, str], Lock] = dict()
+        self._manifest = self._load_manifest()
+
+    @property
+    def manifest(self) -> dict:
+        """
+        Copy of the manifest of resolved files
+        """
+        with self._lock:
+            return json.loads(json.dumps(self._manifest))
+
+    def resolve(self, lang: str, tflite: bool = False) -> Tuple[str, str]:
+        """
+        Get local paths to the model and scorer for a language, downloading
+        them only if they are not already in the store.
+        :param lang: language to get files for
+        :param tflite: if True, get the tflite model instead of pbmm
+        :returns: model path, scorer path
+        """
+        lang = lang.split('-')[0]
+        if lang not in languages or not languages[lang].get('repo'):
+            raise Exception(f'{lang} is not supported')
+        model_type = "tflite" if tflite else "pbmm"
+        with self._lock:
+            cached = self._lookup(lang, model_type)
+            if cached:
+                return cached
+            if self.offline:
+                raise FileNotFoundError(f"No local {model_type} model for "
+                                        f"{lang} and offline mode is enabled")
+            fetch_lock = self._fetch_locks.setdefault((lang, model_type),
+                                                      Lock())
+        with fetch_lock:
+            with self._lock:
+                # Another thread may have fetched while this one waited
+                cached = self._lookup(lang, model_type)
+                if cached:
+                    return cached
+            entry = self._fetch(lang, model_type)
+            with self._lock:
+                self._manifest.setdefault(lang, dict())[model_type] = entry
+                self._save_manifest()
+        return entry["model"]["path"], entry["scorer"]["path"]
+
+    def invalidate(self, lang: str):
+        """
+        Forget stored files for a language so the next `resolve` call checks
+        the hub for updated files.
+        :param lang: language to invalidate
+        """
+        with self._lock:
+            if self._manifest.pop(lang.split('-')[0], None):
+                self._save_manifest()
+
+    def verify(self, lang: str, tflite: bool = False) -> bool:
+        """
+        Validate the stored files for a language against their checksums.
+        :param lang: language to check
+        :param tflite: if True, check the tflite model instead of pbmm
+        :returns: True if all files exist and match their checksums
+        """
+        lang = lang.split('-')[0]
+        model_type = "tflite" if tflite else "pbmm"
+        with self._lock:
+            entry = self._manifest.get(lang, {}).get(model_type)
+        if not entry:
+            return False
+        for key in ("model", "scorer"):
+            record = entry[key]
+            if not isfile(record["path"]) or \
+                    file_checksum(record["path"]) != record["sha256"]:
+                return False
+        return True
+
+    def _lookup(self, lang: str, model_type: str) -> Optional[Tuple[str, str]]:
+        entry = self._manifest.get(lang, {}).get(model_type)
+        if not entry:
+            return None
+        for key in ("model", "scorer"):
+            record = entry[key]
+            try:
+                stat = os.stat(record["path"])
+            except OSError:
+                LOG.info(f"Missing {key} file: {record['path']}")
+                return None
+            if (stat.st_size, stat.st_mtime_ns) != \
+                    (record["size"], record["mtime_ns"]):
+                # File changed since it was recorded; trust it only if the
+                # content still matches
+                if file_checksum(record["path"]) != record["sha256"]:
+                    LOG.warning(f"Checksum mismatch: {record['path']}")
+                    return None
+                record["size"] = stat.st_size
+                record["mtime_ns"] = stat.st_mtime_ns
+                self._save_manifest()
+        return entry["model"]["path"], entry["scorer"]["path"]
+
+    def _fetch(self, lang: str, model_type: str) -> dict:
+        repo_id = languages[lang]['repo']
+        LOG.info(f"Resolving {model_type} model for {lang} from {repo_id}")
+        download = self._downloader
+        if download is None:
+            # Deferred so the store can be used offline without importing
+            # huggingface_hub
+            from huggingface_hub import hf_hub_download as download
+        model_src = download(repo_id, filename=languages[lang][model_type])
+        scorer_src = download(repo_id, filename=languages[lang]['scorer'])
+        lang_dir = join(self.cache_dir, lang)
+        os.makedirs(lang_dir, exist_ok=True)
+        # Model path must include the `pbmm` or `tflite` file extension
+        model_path = join(lang_dir, f"model.{model_type}")
+        scorer_path = join(lang_dir, os.path.basename(
+            languages[lang]['scorer']))
+        entry = dict()
+        for key, src, dst in (("model", model_src, model_path),
+                              ("scorer", scorer_src, scorer_path)):
+            method = link_file(src, dst)
+            LOG.debug(f"Linked {dst} ({method})")
+            stat = os.stat(dst)
+            entry[key] = {"path": dst,
+                          "source": src,
+                          "sha256": file_checksum(dst),
+                          "size": stat.st_size,
+                          "mtime_ns": stat.st_mtime_ns}
+        return entry
+
+    def _load_manifest(self) -> dict:
+        if not isfile(self.manifest_path):
+            return dict()
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            LOG.error(f"Ignoring invalid manifest {self.manifest_path}: {e}")
+            return dict()
+
+    def _save_manifest(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,248 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import tempfile
+import time
+import wave
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from ovos_utils.log import LOG
+
+from neon_stt_plugin_deepspeech_stream_local.file_utils import prune_files
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class ChunkTiming(NamedTuple):
+    """
+    Timing of one chunk of an utterance. Durations are seconds; `offset` is
+    seconds since the first chunk was received.
+    """
+    offset: float
+    audio_seconds: float
+    queue_wait: float
+    analysis: float
+    feed: float
+    decode: float
+
+
+class UtteranceProfiler:
+    """
+    Records a per-chunk timeline for one utterance in a bounded ring buffer,
+    optionally with the audio passed to the decoder
+    """
+
+    def __init__(self, max_chunks: int = 2000, record_audio: bool = False,
+                 lang: str = ""):
+        """
+        :param max_chunks: number of most recent chunks to keep
+        :param record_audio: if True, keep the audio of recorded chunks
+        :param lang: language of the utterance
+        """
+        self.lang = lang
+        self.timeline = deque(maxlen=max_chunks)
+        self.audio = deque(maxlen=max_chunks) if record_audio else None
+        self.recorded_chunks = 0
+        self.audio_seconds = 0.0
+        self.finish_seconds = 0.0
+        # Time spent waiting for the next chunk, added by the reader
+        self.queue_wait = 0.0
+        self._origin: Optional[float] = None
+        self._first_received: Optional[float] = None
+        self._end: Optional[float] = None
+
+    @property
+    def dropped_chunks(self) -> int:
+        """
+        Number of chunks no longer in the timeline
+        """
+        return self.recorded_chunks - len(self.timeline)
+
+    @property
+    def latency_seconds(self) -> Optional[float]:
+        """
+        Seconds between the end of the audio, had it been received in real
+        time, and the final result. Includes any backlog of audio waiting to
+        be processed; None if no audio was recorded or the utterance has not
+        finished.
+        """
+        if self._origin is None or self._end is None:
+            return None
+        return self._end - self._origin - self.audio_seconds
+
+    def record(self, start: float, audio_seconds: float, analysis: float,
+               feed: float, decode: float,
+               audio: Optional['np.ndarray'] = None):
+        """
+        Add a chunk to the timeline.
+        :param start: `time.perf_counter` when processing of the chunk began
+        :param audio_seconds: duration of the chunk
+        :param analysis: seconds spent converting and analyzing the chunk
+        :param feed: seconds spent passing the chunk to the model
+        :param decode: seconds spent on an intermediate decode
+        :param audio: int16 samples of the chunk
+        """
+        if self._origin is None:
+            # The first chunk ends when it is received
+            self._first_received = start
+            self._origin = start - audio_seconds
+        self.timeline.append(ChunkTiming(start - self._first_received,
+                                         audio_seconds, self.queue_wait,
+                                         analysis, feed, decode))
+        if self.audio is not None and audio is not None:
+            self.audio.append(audio.copy())
+        self.queue_wait = 0.0
+        self.recorded_chunks += 1
+        self.audio_seconds += audio_seconds
+
+    def finish(self, finish_seconds: float):
+        """
+        Mark the utterance finished.
+        :param finish_seconds: seconds spent getting the final result
+        """
+        self.finish_seconds = finish_seconds
+        self._end = time.perf_counter()
+
+    def as_dict(self) -> dict:
+        return {"lang": self.lang,
+                "latency_seconds": self.latency_seconds,
+                "audio_seconds": self.audio_seconds,
+                "finish_seconds": self.finish_seconds,
+                "recorded_chunks": self.recorded_chunks,
+                "dropped_chunks": self.dropped_chunks,
+                "timeline": [t._asdict() for t in self.timeline]}
+
+
+class ProfileDumper:
+    """
+    Writes the timeline, and optionally the audio, of utterances slower than
+    a latency threshold to a directory. Audio is written as WAV so it can be
+    replayed with `benchmarks/run_benchmarks.py --clips`. Profiles are
+    written on a background thread so slow utterances are not delayed
+    further.
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 threshold_seconds: float = 1.0, max_chunks: int = 2000,
+                 record_audio: bool = False, max_dumps: int = 100):
+        """
+        :param directory: directory to write profiles to; defaults to
+            `deepspeech_profiles` in the system temporary directory
+        :param threshold_seconds: minimum `latency_seconds` to dump
+        :param max_chunks: timeline length kept per utterance
+        :param record_audio: if True, also dump the audio of slow utterances
+        :param max_dumps: maximum number of profiles kept in `directory`
+        """
+        self.directory = directory or os.path.join(tempfile.gettempdir(),
+                                                   "deepspeech_profiles")
+        self.threshold_seconds = threshold_seconds
+        self.max_chunks = max_chunks
+        self.record_audio = record_audio
+        self.max_dumps = max_dumps
+        self._lock = Lock()
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="DeepSpeechProfileWriter")
+        self.dumps = 0
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """
+        Build a ProfileDumper from plugin configuration, if enabled.
+        :param config: plugin configuration
+        :returns: ProfileDumper, or None if `profiling` is not enabled
+        """
+        if not config.get("profiling"):
+            return None
+        return cls(config.get("profiling_dir"),
+                   config.get("profiling_threshold_ms", 1000) / 1000,
+                   config.get("profiling_max_chunks", 2000),
+                   config.get("profiling_audio", False),
+                   config.get("profiling_max_dumps", 100))
+
+    def create_profiler(self, lang: str = "") -> UtteranceProfiler:
+        return UtteranceProfiler(self.max_chunks, self.record_audio, lang)
+
+    def check(self, profiler: UtteranceProfiler, sample_rate: int,
+              text: Optional[str] = None) -> Optional[Future]:
+        """
+        Dump a finished utterance's profile if it exceeded the threshold.
+        :param profiler: profiler of the finished utterance
+        :param sample_rate: sample rate of recorded audio
+        :param text: transcript of the utterance
+        :returns: Future resolving to the path of the written profile (None
+            if writing failed), or None if the utterance was not slow
+        """
+        latency = profiler.latency_seconds
+        if latency is None or latency < self.threshold_seconds:
+            return None
+        with self._lock:
+            self.dumps += 1
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}_" \
+                   f"{self.dumps}_{profiler.lang}"
+        LOG.warning(f"Utterance latency {latency:.3f}s exceeded threshold")
+        return self._writer.submit(self._write, name, profiler, sample_rate,
+                                   text)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop the writer thread, by default after pending profiles are written
+        """
+        self._writer.shutdown(wait=wait)
+
+    def _write(self, name: str, profiler: UtteranceProfiler,
+               sample_rate: int, text: Optional[str]) -> Optional[str]:
+        path = os.path.join(self.directory, f"{name}.json")
+        profile = {"text": text, "sample_rate": sample_rate,
+                   "audio_file": None, **profiler.as_dict()}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if profiler.audio:
+                profile["audio_file"] = f"{name}.wav"
+                with wave.open(os.path.join(self.directory,
+                                            profile["audio_file"]),
+                               'wb') as wav:
+                    wav.setnchannels(1)
+                    wav.setsampwidth(2)
+                    wav.setframerate(sample_rate)
+                    for chunk in profiler.audio:
+                        wav.writeframes(chunk.astype('<i2').tobytes())
+            with open(path, 'w') as f:
+                json.dump(profile, f)
+        except OSError as e:
+            LOG.warning(f"Failed to write profile: {e}")
+            return None
+        LOG.info(f"Profile written to {path}")
+        prune_files(self.directory, self.max_dumps, companions=(".wav",))
+        return path
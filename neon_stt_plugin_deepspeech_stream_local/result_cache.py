@@ -0,0 +1,217 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+import json
+import os
+import time
+
+from collections import OrderedDict
+from os.path import join
+from threading import Lock
+from typing import Optional
+
+from ovos_utils.log import LOG
+
+from neon_stt_plugin_deepspeech_stream_local.file_utils import prune_files
+from neon_stt_plugin_deepspeech_stream_local.results import \
+    TranscriptionResult
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of final results keyed by audio fingerprint and model
+    identity, with optional expiry and an optional on-disk backend shared
+    between processes and restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024,
+                 ttl_seconds: Optional[float] = None,
+                 cache_dir: Optional[str] = None,
+                 max_disk_entries: int = 10000):
+        """
+        :param max_entries: maximum number of results held in memory
+        :param ttl_seconds: seconds a result is valid for (None for no limit)
+        :param cache_dir: directory to persist results in (None for memory
+            only)
+        :param max_disk_entries: maximum number of results persisted
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._disk_writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """
+        Build a ResultCache from plugin configuration, if enabled.
+        :param config: plugin configuration
+        :returns: ResultCache, or None if `result_cache` is not enabled
+        """
+        if not config.get("result_cache"):
+            return None
+        return cls(config.get("result_cache_size", 1024),
+                   config.get("result_cache_ttl"),
+                   config.get("result_cache_dir"))
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "entries": len(self._entries)}
+
+    def get(self, key: str) -> Optional[TranscriptionResult]:
+        """
+        Get a cached result.
+        :param key: cache key
+        :returns: TranscriptionResult, or None if not cached or expired
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and self._expired(entry[0], now):
+                del self._entries[key]
+                entry = None
+            if entry:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        result = self._read(key, now)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, now, result)
+        return result
+
+    def put(self, key: str, result: TranscriptionResult):
+        """
+        Cache a result.
+        :param key: cache key
+        :param result: TranscriptionResult to cache
+        """
+        now = time.time()
+        with self._lock:
+            self._store(key, now, result)
+        if self.cache_dir:
+            self._write(key, now, result)
+
+    def clear(self):
+        """
+        Remove all cached results, including persisted results
+        """
+        with self._lock:
+            self._entries.clear()
+        if self.cache_dir:
+            for file in os.listdir(self.cache_dir):
+                if file.endswith(".json"):
+                    try:
+                        os.remove(join(self.cache_dir, file))
+                    except OSError:
+                        # Possibly removed by another process
+                        pass
+
+    def _expired(self, stored: float, now: float) -> bool:
+        return self.ttl_seconds is not None and \
+            now - stored > self.ttl_seconds
+
+    def _store(self, key: str, stored: float, result: TranscriptionResult):
+        self._entries[key] = (stored, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return join(self.cache_dir,
+                    f"{hashlib.sha256(key.encode()).hexdigest()}.json")
+
+    def _read(self, key: str, now: float) -> Optional[TranscriptionResult]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            LOG.warning(f"Ignoring invalid cache entry {path}: {e}")
+            return None
+        try:
+            if entry.get("key") != key or self._expired(entry["time"], now):
+                return None
+            return TranscriptionResult.from_dict(entry["result"])
+        except (AttributeError, KeyError, TypeError) as e:
+            LOG.warning(f"Ignoring invalid cache entry {path}: {e}")
+            return None
+
+    def _write(self, key: str, stored: float, result: TranscriptionResult):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump({"key": key, "time": stored,
+                           "result": result.as_dict("words")}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            LOG.warning(f"Failed to persist cache entry: {e}")
+            return
+        self._disk_writes += 1
+        if self._disk_writes % 64 == 0:
+            self._prune()
+
+    def _prune(self):
+        prune_files(self.cache_dir, self.max_disk_entries)
+
+
+def model_identity(*paths: Optional[str]) -> str:
+    """
+    Identify a model and scorer by their files, so results are not reused
+    after either file changes.
+    :param paths: model and scorer file paths
+    :returns: str identity
+    """
+    ids = []
+    for path in paths:
+        if path and os.path.isfile(path):
+            stat = os.stat(path)
+            ids.append(f"{os.path.realpath(path)}:{stat.st_size}:"
+                       f"{stat.st_mtime_ns}")
+        else:
+            ids.append("")
+    return hashlib.sha256("|".join(ids).encode()).hexdigest()[:16]
@@ -0,0 +1,274 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+DETAIL_LEVELS = ("text", "nbest", "words")
+
+# DeepSpeech emits tokens on a 20ms timestep
+TIMESTEP_SECONDS = 0.02
+
+
+class Word(NamedTuple):
+    text: str
+    start_time: float
+    duration: float
+    confidence: float
+
+
+class Candidate:
+    """
+    One candidate transcript. Token text and timings are copied from the
+    decoder's metadata, which is freed with the `Metadata` object; text and
+    words are built from them when first accessed.
+    """
+
+    def __init__(self, transcript=None, text: Optional[str] = None,
+                 confidence: Optional[float] = None,
+                 words: Optional[List[Word]] = None):
+        """
+        :param transcript: DeepSpeech CandidateTranscript metadata
+        :param text: transcript text, if no metadata is available
+        :param confidence: transcript confidence, if no metadata is available
+        :param words: word timings, if no metadata is available
+        """
+        self._tokens: Optional[List[Tuple[str, float]]] = None
+        if transcript is not None:
+            self._tokens = [(token.text, token.start_time)
+                            for token in transcript.tokens]
+            confidence = transcript.confidence
+        self._text = text
+        self._confidence = confidence
+        self._words = words
+
+    @property
+    def confidence(self) -> Optional[float]:
+        """
+        Decoder confidence for the whole transcript (DeepSpeech does not
+        provide per-word confidence), or None without metadata
+        """
+        return self._confidence
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(text for text, _ in self._tokens).strip()
+        return self._text
+
+    @property
+    def words(self) -> List[Word]:
+        """
+        Words with start time and duration in seconds
+        """
+        if self._words is None:
+            self._words = self._build_words()
+        return self._words
+
+    def as_dict(self, words: bool = False) -> dict:
+        candidate = {"text": self.text, "confidence": self.confidence}
+        if words:
+            candidate["words"] = [w._asdict() for w in self.words]
+        return candidate
+
+    def _build_words(self) -> List[Word]:
+        if self._tokens is None:
+            return []
+        words = []
+        letters = []
+        start = end = 0.0
+        for text, start_time in self._tokens:
+            if text == " ":
+                if letters:
+                    words.append(Word("".join(letters), start,
+                                      end - start, self.confidence))
+                letters = []
+                continue
+            if not letters:
+                start = start_time
+            letters.append(text)
+            end = start_time + TIMESTEP_SECONDS
+        if letters:
+            words.append(Word("".join(letters), start, end - start,
+                              self.confidence))
+        return words
+
+
+class TranscriptionResult:
+    """
+    Final result of an utterance. Candidates are ordered and converted to
+    text only when accessed.
+    """
+
+    def __init__(self, candidates: Optional[List[Candidate]] = None,
+                 has_data: bool = True,
+                 invalid_first_transcriptions: Optional[List[str]] = None):
+        """
+        :param candidates: candidate transcripts, best first
+        :param has_data: False if the audio was silent; transcripts of
+            absolute silence are discarded
+        :param invalid_first_transcriptions: known bad transcriptions that
+            should be of lower confidence
+        """
+        self._raw = candidates or []
+        self._has_data = has_data
+        self._invalid_first = invalid_first_transcriptions or []
+        self._candidates = None
+
+    @classmethod
+    def from_metadata(cls, metadata, has_data: bool = True,
+                      invalid_first_transcriptions: Optional[List[str]] =
+                      None):
+        return cls([Candidate(t) for t in metadata.transcripts], has_data,
+                   invalid_first_transcriptions)
+
+    @classmethod
+    def from_text(cls, text: str, has_data: bool = True,
+                  invalid_first_transcriptions: Optional[List[str]] = None):
+        return cls([Candidate(text=text)], has_data,
+                   invalid_first_transcriptions)
+
+    @classmethod
+    def from_dict(cls, result: dict):
+        """
+        Restore a result serialized with `as_dict`
+        """
+        if "candidates" not in result:
+            return cls.from_text(result["text"] or "")
+        return cls([Candidate(text=c["text"], confidence=c["confidence"],
+                              words=[Word(**w) for w in c["words"]]
+                              if "words" in c else None)
+                    for c in result["candidates"]])
+
+    def map_times(self, map_time: Callable[[float], float]) -> \
+            'TranscriptionResult':
+        """
+        Get a copy of this result with word times mapped, i.e. from audio
+        passed to the decoder to the input audio.
+        :param map_time: callable mapping a time in seconds
+        """
+        candidates = []
+        for candidate in self._raw:
+            words = []
+            for word in candidate.words:
+                start = map_time(word.start_time)
+                end = map_time(word.start_time + word.duration)
+                words.append(word._replace(start_time=start,
+                                           duration=end - start))
+            candidates.append(Candidate(text=candidate.text,
+                                        confidence=candidate.confidence,
+                                        words=words))
+        return TranscriptionResult(candidates, self._has_data,
+                                   self._invalid_first)
+
+    @property
+    def candidates(self) -> List[Candidate]:
+        if self._candidates is None:
+            self._candidates = self._order()
+        return self._candidates
+
+    @property
+    def text(self) -> Optional[str]:
+        candidates = self.candidates
+        return candidates[0].text if candidates else None
+
+    @property
+    def transcriptions(self) -> List[str]:
+        return [c.text for c in self.candidates]
+
+    def as_dict(self, detail: str = "nbest") -> dict:
+        """
+        Get a serializable representation of this result.
+        :param detail: `text`, `nbest`, or `words`
+        """
+        result = {"text": self.text}
+        if detail in ("nbest", "words"):
+            result["candidates"] = [c.as_dict(detail == "words")
+                                    for c in self.candidates]
+        return result
+
+    def _order(self) -> List[Candidate]:
+        candidates = list(self._raw)
+        if not candidates or not candidates[0].text:
+            return []
+        if not self._has_data:
+            # Model sometimes returns transcripts for absolute silence
+            return []
+        if len(candidates) > 1 and \
+                candidates[0].text in self._invalid_first:
+            candidates.append(candidates.pop(0))
+        return candidates
+
+
+EMPTY_RESULT = TranscriptionResult()
+
+
+class PartialResult(NamedTuple):
+    """
+    Intermediate hypothesis. `stable` is the leading words that have not
+    changed over recent hypotheses and are unlikely to be revised.
+    """
+    text: str
+    stable: str
+
+    @property
+    def unstable(self) -> str:
+        return self.text[len(self.stable):].strip()
+
+
+class PartialResultTracker:
+    """
+    Tracks changing intermediate hypotheses and their stable prefix
+    """
+
+    def __init__(self, stable_count: int = 2):
+        """
+        :param stable_count: number of consecutive hypotheses a word must
+            appear in, at the same position, to be considered stable
+        """
+        self._history = deque(maxlen=max(stable_count, 1))
+        self.last: Optional[PartialResult] = None
+
+    def update(self, hypothesis: str) -> Optional[PartialResult]:
+        """
+        Add an intermediate hypothesis.
+        :param hypothesis: decoded text
+        :returns: PartialResult if the hypothesis changed, else None
+        """
+        if self.last is not None and hypothesis == self.last.text:
+            return None
+        words = hypothesis.split()
+        self._history.append(words)
+        stable = 0
+        if len(self._history) == self._history.maxlen:
+            for position in zip(*self._history):
+                if any(word != position[0] for word in position):
+                    break
+                stable += 1
+        self.last = PartialResult(hypothesis, " ".join(words[:stable]))
+        return self.last
@@ -0,0 +1,204 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import numpy as np
+
+from threading import Condition
+from typing import Optional
+
+from ovos_utils.log import LOG
+
+
+class AudioRingBuffer:
+    """
+    Preallocated int16 ring buffer between `stream_data` and the decoder.
+    Byte chunks of any length (including odd lengths) are written with
+    `put` and read back as frames of `frame_samples` with `get`. This
+    implements the subset of the `queue.Queue` interface used by
+    `StreamThread`: `put(None)` marks the end of audio, after which `get`
+    returns any remaining partial frame and then None.
+
+    Frames returned by `get` may be views into the buffer; they remain valid
+    until the next call to `get` or `task_done`.
+    """
+
+    def __init__(self, capacity_samples: int = 16000 * 30,
+                 frame_samples: int = 1600):
+        """
+        :param capacity_samples: number of samples the buffer can hold
+        :param frame_samples: number of samples returned by each `get`
+        """
+        if frame_samples > capacity_samples:
+            raise ValueError("frame_samples must not exceed capacity_samples")
+        self.capacity = capacity_samples
+        self.frame_samples = frame_samples
+        self._buffer = np.zeros(capacity_samples, dtype=np.int16)
+        self._scratch = np.zeros(frame_samples, dtype=np.int16)
+        self._read_pos = 0
+        self._size = 0
+        self._held = 0
+        self._pending_byte = b''
+        self._eos = False
+        self._cond = Condition()
+        self.overruns = 0
+        self.dropped_samples = 0
+        self.high_water = 0
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory allocated for audio in bytes
+        """
+        return self._buffer.nbytes + self._scratch.nbytes
+
+    @property
+    def available(self) -> int:
+        """
+        Number of samples buffered and not yet returned by `get`
+        """
+        with self._cond:
+            return self._size - self._held
+
+    @property
+    def stats(self) -> dict:
+        with self._cond:
+            return {"capacity_samples": self.capacity,
+                    "nbytes": self.nbytes,
+                    "buffered_samples": self._size,
+                    "high_water_samples": self.high_water,
+                    "overruns": self.overruns,
+                    "dropped_samples": self.dropped_samples}
+
+    def put(self, data: Optional[bytes], block: bool = True,
+            timeout: Optional[float] = None):
+        """
+        Write audio to the buffer. If the buffer is full, the oldest audio
+        not yet returned by `get` is dropped.
+        :param data: bytes of 16-bit PCM audio, or None to mark the end
+        :param block: unused; accepted for `queue.Queue` compatibility
+        :param timeout: unused; accepted for `queue.Queue` compatibility
+        """
+        with self._cond:
+            if data is None:
+                self._eos = True
+                self._cond.notify_all()
+                return
+            if not data:
+                return
+            offset = 0
+            if self._pending_byte:
+                self._write(np.frombuffer(self._pending_byte + data[:1],
+                                          dtype=np.int16))
+                self._pending_byte = b''
+                offset = 1
+            count = (len(data) - offset) // 2
+            if count:
+                self._write(np.frombuffer(data, dtype=np.int16,
+                                          count=count, offset=offset))
+            if (len(data) - offset) % 2:
+                self._pending_byte = bytes(data[-1:])
+            self._cond.notify_all()
+
+    def get(self, block: bool = True,
+            timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Get the next frame of audio, waiting until a full frame is available
+        or the end of audio is reached.
+        :param block: unused; accepted for `queue.Queue` compatibility
+        :param timeout: unused; accepted for `queue.Queue` compatibility
+        :returns: int16 array of up to `frame_samples`, or None at the end
+        """
+        with self._cond:
+            self._release()
+            while self._size < self.frame_samples and not self._eos:
+                self._cond.wait()
+            count = min(self.frame_samples, self._size)
+            if not count:
+                return None
+            self._held = count
+            start = self._read_pos
+            if start + count <= self.capacity:
+                return self._buffer[start:start + count]
+            first = self.capacity - start
+            self._scratch[:first] = self._buffer[start:]
+            self._scratch[first:count] = self._buffer[:count - first]
+            return self._scratch[:count]
+
+    def task_done(self):
+        """
+        Release the frame returned by the last `get`
+        """
+        with self._cond:
+            self._release()
+
+    def _release(self):
+        self._read_pos = (self._read_pos + self._held) % self.capacity
+        self._size -= self._held
+        self._held = 0
+
+    def _write(self, samples: np.ndarray):
+        count = len(samples)
+        free = self.capacity - self._size
+        if count > free:
+            self.overruns += 1
+            # Drop the oldest audio that is not held by the reader
+            drop = min(count - free, self._size - self._held)
+            if drop and not self._held:
+                self._read_pos = (self._read_pos + drop) % self.capacity
+                self._size -= drop
+                self.dropped_samples += drop
+            elif drop:
+                start = (self._read_pos + self._held) % self.capacity
+                self._compact(start, drop)
+            free = self.capacity - self._size
+            if count > free:
+                # Not enough room even after dropping; keep the newest audio
+                self.dropped_samples += count - free
+                samples = samples[count - free:]
+                count = free
+            LOG.warning(f"Audio buffer overrun; dropped "
+                        f"{self.dropped_samples} samples total")
+        write_pos = (self._read_pos + self._size) % self.capacity
+        first = min(count, self.capacity - write_pos)
+        self._buffer[write_pos:write_pos + first] = samples[:first]
+        self._buffer[:count - first] = samples[first:]
+        self._size += count
+        self.high_water = max(self.high_water, self._size)
+
+    def _compact(self, start: int, drop: int):
+        """
+        Remove `drop` samples beginning at `start` (just after any held
+        frame) by moving the remaining unread audio back to `start`.
+        """
+        remaining = self._size - self._held - drop
+        if remaining:
+            src = (np.arange(remaining) + start + drop) % self.capacity
+            dst = (np.arange(remaining) + start) % self.capacity
+            self._buffer[dst] = self._buffer[src]
+        self._size -= drop
+        self.dropped_samples += drop
@@ -0,0 +1,336 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Local HTTP server sharing one plugin instance, and its loaded models, between
+client processes. Each client stream is a session:
+
+POST   /v1/sessions               JSON options -> {"session_id": int}
+POST   /v1/sessions/<id>/audio    16-bit PCM -> {"done": bool, "partial": ...}
+POST   /v1/sessions/<id>/finish   -> {"text", "transcriptions", "result"}
+DELETE /v1/sessions/<id>          discard a session
+GET    /v1/status                 -> languages, sessions, and model status
+"""
+
+import argparse
+import json
+import re
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Full
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional, Tuple
+
+from ovos_utils.log import LOG
+
+SESSION_OPTIONS = ("profile", "result_detail", "num_results")
+_SESSION_PATH = re.compile(r"^/v1/sessions/(\d+)(?:/(audio|finish))?$")
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _ServerSession:
+    def __init__(self, session, detail: str):
+        self.session = session
+        self.detail = detail
+        self.partial = None
+        self.last_used = time.monotonic()
+
+
+class STTServer:
+    """
+    Serves streaming sessions of a DeepSpeechLocalStreamingSTT over HTTP.
+    Sessions share the plugin's models and session workers; at most
+    `max_sessions` may be open at once, and sessions unused for
+    `idle_timeout` seconds are discarded.
+    """
+
+    def __init__(self, stt, host: str = "127.0.0.1", port: int = 8765,
+                 max_sessions: int = 32, feed_timeout: float = 5,
+                 result_timeout: float = 30, idle_timeout: float = 60):
+        """
+        :param stt: DeepSpeechLocalStreamingSTT to serve
+        :param host: address to listen on
+        :param port: port to listen on (0 for any free port)
+        :param max_sessions: maximum number of open sessions; more are
+            rejected with 503
+        :param feed_timeout: seconds to wait for space in a session's audio
+            queue before rejecting audio with 503
+        :param result_timeout: seconds to wait for a session's result
+        :param idle_timeout: seconds after which unused sessions are
+            discarded
+        """
+        self.stt = stt
+        self.max_sessions = max_sessions
+        self.feed_timeout = feed_timeout
+        self.result_timeout = result_timeout
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[int, _ServerSession] = dict()
+        self._lock = Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _RequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stt_server = self
+        self._thread: Optional[Thread] = None
+        self._stopped = Event()
+        self._reaper = Thread(target=self._reap_idle, daemon=True,
+                              name="DeepSpeechServerReaper")
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._httpd.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        host, port = self.address
+        return f"http://{host}:{port}"
+
+    @property
+    def active_sessions(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def serve_forever(self):
+        LOG.info(f"Serving DeepSpeech STT at {self.url}")
+        if not self._reaper.is_alive():
+            self._reaper.start()
+        self._httpd.serve_forever()
+
+    def start(self):
+        """
+        Serve requests on a background thread
+        """
+        self._thread = Thread(target=self.serve_forever, daemon=True,
+                              name="DeepSpeechServer")
+        self._thread.start()
+        return self
+
+    def shutdown(self):
+        self._stopped.set()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for entry in sessions:
+            entry.session.cancel()
+
+    def status(self) -> dict:
+        return {"languages": sorted(self.stt.available_languages),
+                "active_sessions": self.active_sessions,
+                "max_sessions": self.max_sessions,
+                "models": getattr(self.stt, "model_status", dict()),
+                "decode_stats": getattr(self.stt, "decode_stats", dict())}
+
+    def open_session(self, options: dict) -> int:
+        self._discard_idle()
+        unknown = set(options) - set(SESSION_OPTIONS) - {"lang"}
+        if unknown:
+            raise HTTPError(400, f"Unknown options: {sorted(unknown)}")
+        lang = options.get("lang") or self.stt.language
+        if lang.split('-')[0] not in self.stt.available_languages:
+            raise HTTPError(400, f'{lang} is not supported')
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise HTTPError(503, "Too many active sessions")
+            entry = _ServerSession(None, options.get("result_detail") or
+                                   "nbest")
+            decoder_options = {key: options[key] for key in SESSION_OPTIONS
+                               if options.get(key) is not None}
+            entry.session = self.stt.open_session(
+                lang, on_partial=lambda p: setattr(entry, "partial", p),
+                **decoder_options)
+            self._sessions[entry.session.session_id] = entry
+        return entry.session.session_id
+
+    def feed(self, session_id: int, audio: bytes) -> dict:
+        entry = self._get(session_id)
+        try:
+            entry.session.feed(audio, self.feed_timeout)
+        except Full:
+            raise HTTPError(503, "Session audio queue is full")
+        except RuntimeError as e:
+            raise HTTPError(409, str(e))
+        partial = entry.partial
+        return {"done": entry.session.done,
+                "partial": partial._asdict() if partial else None}
+
+    def finish(self, session_id: int) -> dict:
+        entry = self._get(session_id)
+        entry.session.finish()
+        try:
+            result = entry.session.detailed_result(self.result_timeout)
+        except TimeoutError as e:
+            raise HTTPError(504, str(e))
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        finally:
+            self._remove(session_id)
+        return {"text": result.text, "transcriptions": result.transcriptions,
+                "result": result.as_dict(entry.detail)}
+
+    def discard(self, session_id: int):
+        entry = self._get(session_id)
+        self._remove(session_id)
+        entry.session.cancel()
+
+    def _get(self, session_id: int) -> _ServerSession:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+        if entry is None:
+            raise HTTPError(404, f"Unknown session: {session_id}")
+        entry.last_used = time.monotonic()
+        return entry
+
+    def _remove(self, session_id: int):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _discard_idle(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [sid for sid, entry in self._sessions.items()
+                    if entry.last_used < cutoff]
+            entries = [self._sessions.pop(sid) for sid in idle]
+        for entry in entries:
+            LOG.info(f"Discarding idle session {entry.session.session_id}")
+            entry.session.cancel()
+
+    def _reap_idle(self):
+        """
+        Discard idle sessions periodically, so abandoned sessions release
+        their decoder streams without waiting for another request
+        """
+        interval = min(max(self.idle_timeout / 4, 0.05), 5)
+        while not self._stopped.wait(interval):
+            try:
+                self._discard_idle()
+            except Exception as e:
+                LOG.exception(e)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "NeonDeepSpeech"
+
+    def do_GET(self):
+        self._handle(self._route_get)
+
+    def do_POST(self):
+        self._handle(self._route_post)
+
+    def do_DELETE(self):
+        self._handle(self._route_delete)
+
+    def log_message(self, format, *args):
+        LOG.debug(f"{self.address_string()} {format % args}")
+
+    def _route_get(self, server: STTServer, body: bytes):
+        if self.path == "/v1/status":
+            return 200, server.status()
+        raise HTTPError(404, f"Not found: {self.path}")
+
+    def _route_post(self, server: STTServer, body: bytes):
+        if self.path == "/v1/sessions":
+            try:
+                options = json.loads(body or b'{}')
+            except ValueError:
+                raise HTTPError(400, "Invalid JSON")
+            return 201, {"session_id": server.open_session(options)}
+        match = _SESSION_PATH.match(self.path)
+        if match and match.group(2) == "audio":
+            return 200, server.feed(int(match.group(1)), body)
+        if match and match.group(2) == "finish":
+            return 200, server.finish(int(match.group(1)))
+        raise HTTPError(404, f"Not found: {self.path}")
+
+    def _route_delete(self, server: STTServer, body: bytes):
+        match = _SESSION_PATH.match(self.path)
+        if match and not match.group(2):
+            server.discard(int(match.group(1)))
+            return 204, None
+        raise HTTPError(404, f"Not found: {self.path}")
+
+    def _handle(self, route):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b''
+        try:
+            status, response = route(self.server.stt_server, body)
+        except HTTPError as e:
+            status, response = e.status, {"error": str(e)}
+        except Exception as e:
+            LOG.exception(e)
+            status, response = 500, {"error": str(e)}
+        payload = json.dumps(response).encode() if response is not None \
+            else b''
+        self.send_response(status)
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Serve DeepSpeech streaming STT to local clients")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765,
+                        help="port to listen on")
+    parser.add_argument("--config", help="path to a JSON plugin config")
+    parser.add_argument("--lang", help="default language")
+    parser.add_argument("--max-sessions", type=int, default=32,
+                        help="maximum number of concurrent sessions")
+    parsed = parser.parse_args(args)
+    config = dict()
+    if parsed.config:
+        with open(parsed.config) as f:
+            config = json.load(f)
+    if parsed.lang:
+        config["lang"] = parsed.lang
+    from neon_stt_plugin_deepspeech_stream_local import \
+        DeepSpeechLocalStreamingSTT
+    stt = DeepSpeechLocalStreamingSTT(config)
+    server = STTServer(stt, parsed.host, parsed.port, parsed.max_sessions)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        stt.shutdown()
+
+
+if __name__ == "__main__":
+    main()
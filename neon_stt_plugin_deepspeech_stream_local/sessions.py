@@ -0,0 +1,464 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from queue import Empty, Full, Queue
+from threading import Event, Lock
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, List, \
+    Optional
+
+from ovos_utils.log import LOG
+
+from neon_stt_plugin_deepspeech_stream_local.results import EMPTY_RESULT, \
+    PartialResult, TranscriptionResult
+
+if TYPE_CHECKING:
+    from neon_stt_plugin_deepspeech_stream_local.stream_decoder import \
+        StreamDecoder
+
+
+class StreamSession:
+    """
+    Handle for one audio stream processed by a `SessionEngine`. Audio is
+    queued with `feed`, and `finish` marks the end of the audio; `cancel`
+    abandons the session without a result.
+    """
+
+    def __init__(self, engine, session_id: int, lang: str,
+                 max_queued_chunks: int, options: Optional[dict] = None):
+        self.session_id = session_id
+        self.lang = lang
+        self.options = dict(options or dict())
+        self.transcription: TranscriptionResult = EMPTY_RESULT
+        self.error: Optional[Exception] = None
+        self._engine = engine
+        self._queue = Queue(maxsize=max_queued_chunks)
+        self._done = Event()
+        self._lock = Lock()
+        self._scheduled = False
+        self._finished = False
+        self._cancelled = False
+        self._decoder: Optional['StreamDecoder'] = None
+        self._space_waiter: Optional[Callable[[], None]] = None
+        # Called from a worker thread with each changed intermediate
+        # hypothesis, and once the session is complete
+        self.on_partial: Optional[Callable[[PartialResult], None]] = \
+            self.options.pop("on_partial", None)
+        self.on_complete: Optional[Callable[[], None]] = None
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def text(self) -> Optional[str]:
+        return self.transcription.text
+
+    @property
+    def transcriptions(self) -> List[str]:
+        return self.transcription.transcriptions
+
+    def feed(self, chunk: bytes, timeout: Optional[float] = None):
+        """
+        Queue a chunk of audio. Blocks while this session's queue is full.
+        :param chunk: bytes of 16-bit mono PCM audio
+        :param timeout: max seconds to wait for space in the queue
+        :raises queue.Full: if the queue is still full after `timeout`
+        """
+        if self._finished:
+            raise RuntimeError(f"Session {self.session_id} already finished")
+        if self._put(chunk, timeout):
+            self._engine.schedule(self)
+
+    def finish(self):
+        """
+        Mark the end of audio for this session
+        """
+        if self._finished:
+            return
+        self._finished = True
+        if self._put(None, None):
+            self._engine.schedule(self)
+
+    def cancel(self):
+        """
+        Abandon this session without waiting: queued audio is dropped, the
+        decoder stream is freed without a final decode, and the session
+        completes with an empty result.
+        """
+        with self._lock:
+            if self._cancelled or self.done:
+                return
+            self._cancelled = True
+            self._finished = True
+            # A worker processing the session discards it after its chunk
+            idle = not self._scheduled
+            self._scheduled = True
+        if idle:
+            self._engine.discard(self)
+
+    def result(self, timeout: Optional[float] = None) -> List[str]:
+        """
+        Wait for this session's transcriptions.
+        :param timeout: max seconds to wait
+        :returns: list of transcriptions, best first
+        """
+        return self.detailed_result(timeout).transcriptions
+
+    def detailed_result(self, timeout: Optional[float] = None) -> \
+            TranscriptionResult:
+        """
+        Wait for this session's result.
+        :param timeout: max seconds to wait
+        :returns: TranscriptionResult with candidates and word timings
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Session {self.session_id} not complete")
+        if self.error:
+            raise self.error
+        return self.transcription
+
+    def _put(self, item: Optional[bytes], timeout: Optional[float]) -> bool:
+        """
+        Queue an item, waiting for space unless the session completes. Audio
+        received after the decoder has stopped (i.e. timeout) is dropped.
+        :returns: True if the item was queued
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.done:
+            wait = 0.1 if deadline is None else \
+                min(0.1, max(deadline - time.monotonic(), 0))
+            try:
+                self._queue.put(item, timeout=wait)
+                return True
+            except Full:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+        return False
+
+    def _offer(self, item: Optional[bytes],
+               on_space: Callable[[], None]) -> bool:
+        """
+        Queue an item without blocking. If the queue is full, `on_space` is
+        called once a worker takes a chunk from it or the session completes.
+        :returns: True if the item was queued
+        """
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except Full:
+            pass
+        self._space_waiter = on_space
+        # A worker may have emptied the queue before the waiter was set
+        try:
+            self._queue.put_nowait(item)
+        except Full:
+            return False
+        self._space_waiter = None
+        return True
+
+    def _drain(self):
+        try:
+            while True:
+                self._queue.get_nowait()
+        except Empty:
+            pass
+        self._notify_space()
+
+    def _notify_space(self):
+        waiter = self._space_waiter
+        if waiter is not None:
+            self._space_waiter = None
+            waiter()
+
+    def _complete(self, result: TranscriptionResult = EMPTY_RESULT,
+                  error: Exception = None):
+        self.transcription = result
+        self.error = error
+        self._decoder = None
+        self._done.set()
+        self._engine.release(self)
+        self._notify_space()
+        if self.on_complete is not None:
+            self.on_complete()
+
+
+class AsyncStreamSession:
+    """
+    asyncio interface to a `StreamSession`. Audio is decoded on the
+    `SessionEngine` workers; waiting on a full queue or for results does not
+    hold a thread.
+
+    async with stt.open_async_session("en") as session:
+        async for chunk in audio:
+            await session.feed(chunk)
+    transcriptions = await session.result()
+
+    Iterating over the session yields a PartialResult each time the
+    intermediate hypothesis changes.
+    """
+
+    def __init__(self, session: StreamSession,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        :param session: StreamSession to wrap
+        :param loop: event loop the session is used from; defaults to the
+            running loop
+        """
+        self._session = session
+        self._loop = loop or asyncio.get_running_loop()
+        self._done = self._loop.create_future()
+        self._partials = asyncio.Queue()
+        session.on_partial = self._on_partial
+        session.on_complete = self._on_complete
+
+    @property
+    def session_id(self) -> int:
+        return self._session.session_id
+
+    @property
+    def done(self) -> bool:
+        return self._done.done()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.finish()
+
+    def __aiter__(self) -> AsyncIterator[PartialResult]:
+        return self.partials()
+
+    async def feed(self, chunk: bytes):
+        """
+        Queue a chunk of audio, waiting while this session's queue is full.
+        :param chunk: bytes of 16-bit mono PCM audio
+        """
+        if self._session._finished:
+            raise RuntimeError(f"Session {self.session_id} already finished")
+        await self._put(chunk)
+
+    async def finish(self):
+        """
+        Mark the end of audio for this session
+        """
+        if self._session._finished:
+            return
+        self._session._finished = True
+        await self._put(None)
+
+    async def partials(self) -> AsyncIterator[PartialResult]:
+        """
+        Iterate over intermediate hypotheses as they change, until the
+        session is complete
+        """
+        while True:
+            partial = await self._partials.get()
+            if partial is None:
+                return
+            yield partial
+
+    async def result(self) -> List[str]:
+        """
+        Wait for this session's transcriptions.
+        :returns: list of transcriptions, best first
+        """
+        return (await self.detailed_result()).transcriptions
+
+    async def detailed_result(self) -> TranscriptionResult:
+        """
+        Wait for this session's result.
+        :returns: TranscriptionResult with candidates and word timings
+        """
+        await asyncio.shield(self._done)
+        if self._session.error:
+            raise self._session.error
+        return self._session.transcription
+
+    async def _put(self, item: Optional[bytes]):
+        session = self._session
+        while not session.done:
+            space = asyncio.Event()
+            if session._offer(item, lambda: self._call_soon(space.set)):
+                session._engine.schedule(session)
+                return
+            await space.wait()
+
+    def _on_partial(self, partial: PartialResult):
+        self._call_soon(self._partials.put_nowait, partial)
+
+    def _on_complete(self):
+        self._call_soon(self._set_done)
+
+    def _set_done(self):
+        self._partials.put_nowait(None)
+        if not self._done.done():
+            self._done.set_result(None)
+
+    def _call_soon(self, callback, *args):
+        try:
+            self._loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            LOG.debug(f"Event loop closed before session {self.session_id} "
+                      f"completed")
+
+
+class SessionEngine:
+    """
+    Runs any number of concurrent `StreamSession`s on a bounded pool of
+    decoder worker threads sharing the plugin's loaded models. A worker only
+    processes a session while it has queued audio, so idle sessions do not
+    hold a thread.
+    """
+
+    def __init__(self, stt, max_workers: int = 4,
+                 max_queued_chunks: int = 64, chunks_per_turn: int = 32):
+        """
+        :param stt: DeepSpeechLocalStreamingSTT providing models and config
+        :param max_workers: number of decoder worker threads
+        :param max_queued_chunks: per-session audio queue size; `feed` blocks
+            when this is exceeded
+        :param chunks_per_turn: max chunks a worker processes for one session
+            before yielding to other sessions
+        """
+        self._stt = stt
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="DeepSpeechSession")
+        self.max_queued_chunks = max_queued_chunks
+        self.chunks_per_turn = chunks_per_turn
+        self._ids = count(1)
+        self._sessions: Dict[int, StreamSession] = dict()
+        self._lock = Lock()
+
+    @property
+    def active_sessions(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def open_session(self, lang: Optional[str] = None,
+                     **options) -> StreamSession:
+        """
+        Start a new stream session.
+        :param lang: language of the audio; defaults to the plugin language
+        :param options: StreamDecoder options for this session
+        :returns: StreamSession to feed audio to
+        """
+        session = StreamSession(self, next(self._ids),
+                                lang or self._stt.language,
+                                self.max_queued_chunks, options)
+        with self._lock:
+            self._sessions[session.session_id] = session
+        return session
+
+    def open_async_session(self, lang: Optional[str] = None,
+                           **options) -> AsyncStreamSession:
+        """
+        Start a new stream session for use from the running event loop.
+        :param lang: language of the audio; defaults to the plugin language
+        :param options: StreamDecoder options for this session
+        :returns: AsyncStreamSession to feed audio to
+        """
+        return AsyncStreamSession(self.open_session(lang, **options))
+
+    def schedule(self, session: StreamSession):
+        """
+        Ensure a worker will process queued audio for a session
+        """
+        with session._lock:
+            if session._scheduled or session.done:
+                return
+            session._scheduled = True
+        self._executor.submit(self._process, session)
+
+    def release(self, session: StreamSession):
+        with self._lock:
+            self._sessions.pop(session.session_id, None)
+
+    def discard(self, session: StreamSession):
+        """
+        Complete a cancelled session, freeing its decoder stream. Called by
+        the thread that owns the session.
+        """
+        session._drain()
+        decoder = session._decoder
+        if decoder is not None:
+            decoder.discard()
+        if not session.done:
+            session._complete()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def _process(self, session: StreamSession):
+        try:
+            for _ in range(self.chunks_per_turn):
+                if session._cancelled:
+                    break
+                try:
+                    chunk = session._queue.get_nowait()
+                except Empty:
+                    with session._lock:
+                        if session._queue.empty() and \
+                                not session._cancelled:
+                            session._scheduled = False
+                            return
+                    continue
+                session._notify_space()
+                if session.done:
+                    continue
+                if session._decoder is None:
+                    session._decoder = self._stt.create_decoder(
+                        session.lang, on_partial=session.on_partial,
+                        **session.options)
+                if chunk is None or not session._decoder.feed(chunk):
+                    self._finish(session)
+        except Exception as e:
+            LOG.exception(e)
+            session._complete(error=e)
+        with session._lock:
+            cancelled = session._cancelled
+            if not cancelled:
+                session._scheduled = False
+        if cancelled:
+            self.discard(session)
+        elif not session._queue.empty():
+            # Yield to other sessions, then continue with this one
+            self.schedule(session)
+
+    def _finish(self, session: StreamSession):
+        decoder = session._decoder
+        if decoder is None:
+            session._complete()
+            return
+        result = decoder.finish()
+        self._stt.report_utterance(decoder)
+        session._complete(result)
@@ -0,0 +1,183 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+
+from os.path import realpath
+from platform import machine
+from threading import Lock, RLock
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from ovos_utils.log import LOG
+
+from neon_stt_plugin_deepspeech_stream_local.decoder_settings import \
+    DecoderSettings
+from neon_stt_plugin_deepspeech_stream_local.model_store import ModelStore
+
+# Keyed by model path, scorer path and decoder settings identity
+_models: Dict[Tuple[str, Optional[str], str], Tuple[Any, int]] = dict()
+_lock = Lock()
+# Held by every plugin instance while configuring shared models or creating
+# streams from them
+shared_model_lock = RLock()
+
+
+class MappedMemory(NamedTuple):
+    """
+    Resident memory of a mapped file in the current process, in bytes.
+    `shared` pages are also mapped by another process; each would otherwise
+    be a private copy.
+    """
+    rss: int = 0
+    shared: int = 0
+    private: int = 0
+
+
+def use_tflite(config: Optional[dict] = None) -> bool:
+    """
+    Determine the model format to load. `.pbmm` models are memory-mapped and
+    shared between processes through the page cache, so they are preferred
+    unless `model_format` is `tflite` or only the TFLite runtime is available
+    (aarch64).
+    :param config: plugin configuration
+    :returns: True if the tflite model should be used
+    """
+    model_format = (config or dict()).get("model_format", "auto")
+    if model_format == "auto":
+        return machine() == 'aarch64'
+    return model_format == "tflite"
+
+
+def load_model(model_path: str, scorer_path: str = None) -> Tuple[Any, int]:
+    """
+    Load a model and optional scorer. The DeepSpeech runtime is only imported
+    here, when a model is first needed.
+    :param model_path: path to the model file
+    :param scorer_path: path to the scorer file
+    :returns: deepspeech.Model, approximate size in bytes
+    """
+    import deepspeech
+    if not model_path.endswith(".pbmm"):
+        LOG.info(f"{model_path} is not memory-mapped; model memory will not "
+                 f"be shared between processes")
+    client = deepspeech.Model(model_path)
+    size = os.path.getsize(model_path)
+    if scorer_path and os.path.isfile(scorer_path):
+        LOG.info(f"Enabling scorer {scorer_path}")
+        client.enableExternalScorer(scorer_path)
+        size += os.path.getsize(scorer_path)
+    return client, size
+
+
+def get_shared_model(model_path: str, scorer_path: str = None,
+                     settings: Optional[DecoderSettings] = None) -> \
+        Tuple[Any, int]:
+    """
+    Get a model from the process-wide registry, loading it on first use.
+    Models loaded before the process forks are inherited by its children.
+    Each combination of decoder settings gets its own model, so plugins
+    configured differently never share one.
+    :param model_path: path to the model file
+    :param scorer_path: path to the scorer file
+    :param settings: decoder settings applied when the model is loaded
+    :returns: deepspeech.Model, approximate size in bytes
+    """
+    key = (realpath(model_path), realpath(scorer_path) if scorer_path
+           else None, settings.identity if settings else '')
+    with _lock:
+        if key not in _models:
+            client, size = load_model(model_path, scorer_path)
+            if settings is not None:
+                loaded_scorer = scorer_path if scorer_path and \
+                    os.path.isfile(scorer_path) else None
+                with shared_model_lock:
+                    settings.apply(client, loaded_scorer)
+            _models[key] = client, size
+        return _models[key]
+
+
+def preload(langs: Iterable[str], config: Optional[dict] = None) -> \
+        Dict[str, Tuple[str, str]]:
+    """
+    Load models into the process-wide registry, i.e. in a prefork server
+    before workers are started, so plugins created with `shared_models`
+    enabled reuse them.
+    :param langs: languages to load
+    :param config: plugin configuration
+    :returns: dict of language to loaded model and scorer paths
+    """
+    config = config or dict()
+    store = ModelStore(config.get("model_cache_dir"),
+                       config.get("offline", False))
+    loaded = dict()
+    for lang in langs:
+        lang = lang.split('-')[0]
+        loaded[lang] = store.resolve(lang, use_tflite(config))
+        scorer = loaded[lang][1]
+        get_shared_model(*loaded[lang], DecoderSettings.from_config(
+            config, scorer if scorer and os.path.isfile(scorer) else None))
+    return loaded
+
+
+def shared_model_files() -> Tuple[str, ...]:
+    """
+    Get the model and scorer files of all models in the registry
+    """
+    with _lock:
+        return tuple(path for key in _models for path in key[:2] if path)
+
+
+def mapped_memory(paths: Iterable[str],
+                  smaps: str = "/proc/self/smaps") -> Dict[str, MappedMemory]:
+    """
+    Measure the resident memory of mapped files in this process.
+    :param paths: files to measure
+    :param smaps: smaps file to read
+    :returns: dict of path to MappedMemory; empty if smaps is not available
+    """
+    paths = {realpath(path): path for path in paths}
+    totals = {path: [0, 0, 0] for path in paths}
+    if not os.path.isfile(smaps):
+        return dict()
+    current = None
+    with open(smaps) as f:
+        for line in f:
+            fields = line.split()
+            if not fields[0].endswith(':'):
+                # Mapping header; the path is the last field, if any
+                current = totals.get(fields[-1]) if len(fields) > 5 else None
+            elif current is not None:
+                key = fields[0]
+                if key == "Rss:":
+                    current[0] += int(fields[1]) * 1024
+                elif key.startswith("Shared_"):
+                    current[1] += int(fields[1]) * 1024
+                elif key.startswith("Private_"):
+                    current[2] += int(fields[1]) * 1024
+    return {paths[path]: MappedMemory(*values)
+            for path, values in totals.items()}
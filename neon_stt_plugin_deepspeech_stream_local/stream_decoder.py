@@ -0,0 +1,392 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+import time
+import numpy as np
+
+from typing import Any, Callable, List, Optional, Union
+from ovos_utils.log import LOG
+
+from neon_stt_plugin_deepspeech_stream_local.audio import AudioFormat, \
+    SilenceGate, StreamConverter, analyze_frame
+from neon_stt_plugin_deepspeech_stream_local.decode_scheduler import \
+    DecodeScheduler
+from neon_stt_plugin_deepspeech_stream_local.endpointing import Endpointer
+from neon_stt_plugin_deepspeech_stream_local.metrics import UtteranceMetrics
+from neon_stt_plugin_deepspeech_stream_local.profiling import \
+    UtteranceProfiler
+from neon_stt_plugin_deepspeech_stream_local.result_cache import ResultCache
+from neon_stt_plugin_deepspeech_stream_local.results import DETAIL_LEVELS, \
+    EMPTY_RESULT, PartialResult, PartialResultTracker, TranscriptionResult
+
+
+class StreamDecoder:
+    """
+    Incremental decoding state for a single utterance. Audio is passed to
+    `feed` as it arrives and `finish` returns the final transcriptions.
+    """
+    threshold = 10
+    timeout_length = 5
+
+    def __init__(self, client, config: Optional[dict] = None,
+                 invalid_first_transcriptions: Optional[List[str]] = None,
+                 metrics: Optional[UtteranceMetrics] = None,
+                 stream_factory: Optional[Callable[[], Any]] = None,
+                 result_detail: Optional[str] = None,
+                 num_results: Optional[int] = None,
+                 on_partial: Optional[Callable[[PartialResult], None]] =
+                 None,
+                 cache: Optional[ResultCache] = None,
+                 cache_key: str = '',
+                 input_format: Optional[AudioFormat] = None,
+                 profiler: Optional[UtteranceProfiler] = None):
+        """
+        :param client: deepspeech.Model to create a stream from
+        :param config: plugin configuration
+        :param invalid_first_transcriptions: known bad transcriptions that
+            should be of lower confidence
+        :param metrics: UtteranceMetrics to record timing in, if enabled
+        :param stream_factory: callable returning a new stream for `client`;
+            defaults to `client.createStream`
+        :param result_detail: `text` for the best transcript only, `nbest`
+            for `num_results` candidates, or `words` for candidates with word
+            timings; defaults to the `result_detail` config (`nbest`)
+        :param num_results: number of candidates for `nbest` and `words`;
+            defaults to the `num_results` config (5)
+        :param on_partial: called with a PartialResult each time the
+            intermediate hypothesis changes
+        :param cache: ResultCache to look up the final result in
+        :param cache_key: identity of the language, model and scorer, used
+            with the audio fingerprint as the cache key
+        :param input_format: format of the audio passed to `feed`; defaults
+            to the `input_*` config (16-bit mono at the model sample rate)
+        :param profiler: UtteranceProfiler to record a per-chunk timeline in,
+            if enabled
+        """
+        self.client = client
+        self._create_stream = stream_factory or client.createStream
+        # DeepSpeech stream is created when the first audio passes the gate
+        self.stream = None
+        self.sample_rate = client.sampleRate()
+        config = config or dict()
+        input_format = input_format or AudioFormat.from_config(config)
+        if input_format.is_native(self.sample_rate):
+            self.converter = None
+        else:
+            self.converter = StreamConverter(input_format, self.sample_rate)
+        self.result_detail = result_detail or \
+            config.get("result_detail", "nbest")
+        if self.result_detail not in DETAIL_LEVELS:
+            raise ValueError(f"Invalid result detail: {self.result_detail}")
+        self.num_results = num_results or config.get("num_results", 5)
+        self.result = EMPTY_RESULT
+        self.cache = cache
+        self.cache_hit = False
+        if cache is None:
+            self._fingerprint = self._pending = None
+        else:
+            # Audio is decoded as it arrives and fingerprinted alongside, so
+            # a hit only skips the final decode. With `cache_max_seconds`,
+            # audio is held back up to that length so short utterances
+            # found in the cache are never decoded, at the cost of
+            # decoding the rest after the audio ends on a miss
+            self.cache_key = f"{cache_key}|{self.result_detail}|" \
+                             f"{self.num_results}"
+            self._fingerprint = hashlib.blake2b(digest_size=16)
+            self._fingerprint_started = False
+            self._max_pending = int(config.get("cache_max_seconds", 0) *
+                                    self.sample_rate)
+            self._pending = [] if self._max_pending > 0 else None
+            self._pending_samples = 0
+        if config.get("silence_gate", True):
+            self.gate = SilenceGate(self.sample_rate,
+                                    config.get("vad_threshold",
+                                               self.threshold),
+                                    config.get("preroll_ms", 300))
+        else:
+            self.gate = None
+        self.scheduler = DecodeScheduler.from_config(config, self.sample_rate)
+        # `vad` ends the utterance based on audio time; `timeout` uses the
+        # legacy wall-clock timeout after the transcript stops changing;
+        # `none` only ends it when the audio ends
+        endpointing = config.get("endpointing", "vad")
+        if endpointing == "vad":
+            self.endpointer = Endpointer.from_config(config, self.sample_rate)
+        else:
+            self.endpointer = None
+        self._timeout = endpointing != "none"
+        self.metrics = metrics
+        self.profiler = profiler
+        self.on_partial = on_partial
+        self.partials = PartialResultTracker(
+            config.get("partial_stable_count", 2))
+        self._last_speech_time = None
+        self.invalid_first_transcriptions = invalid_first_transcriptions \
+            or ["he"]
+        self.end_time = time.time() + self.timeout_length
+        self.intermediate_result = ''
+        self.has_data = False
+        self._speech_since_decode = False
+
+    def feed(self, data: Union[bytes, np.ndarray]) -> bool:
+        """
+        Feed a chunk of audio to the decoder.
+        :param data: bytes or int16 array of 16-bit mono PCM audio; with an
+            `input_format` to convert, bytes in that format or an array
+            holding them
+        :returns: False if the stream should be stopped
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            chunk_start = time.perf_counter()
+        end_of_audio = not len(data)
+        if self.converter is not None:
+            # At the end of audio, the converter returns what it held back
+            data16 = self.converter.process(data)
+            if not len(data16) and not end_of_audio:
+                # Not enough input for an output sample yet
+                return True
+        else:
+            data16 = data if isinstance(data, np.ndarray) else \
+                np.frombuffer(data, dtype=np.int16)
+        frame_stats = analyze_frame(data16)
+        if not frame_stats.silent:
+            self.has_data = True
+        if frame_stats.rms > self.threshold:
+            self._speech_since_decode = True
+        current_time = time.time()
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.audio_seconds += len(data16) / self.sample_rate
+            if frame_stats.rms > self.threshold:
+                self._last_speech_time = time.perf_counter()
+        if profiler is not None:
+            feed_start = time.perf_counter()
+            analysis_seconds = feed_start - chunk_start
+            decode_seconds = 0.0
+        fed = self._feed_gated(data16, frame_stats)
+        if profiler is not None:
+            feed_seconds = time.perf_counter() - feed_start
+        if fed and self.scheduler.should_decode(fed, frame_stats):
+            if metrics is None and profiler is None:
+                result = self.stream.intermediateDecode()
+            else:
+                start = time.perf_counter()
+                result = self.stream.intermediateDecode()
+                decode_seconds = time.perf_counter() - start
+                if metrics is not None:
+                    metrics.decode_seconds += decode_seconds
+                    metrics.decode_count += 1
+            self.scheduler.update(result)
+            if result != self.intermediate_result:
+                if self._speech_since_decode:
+                    self.end_time = current_time + self.timeout_length
+                if self.on_partial is not None:
+                    try:
+                        self.on_partial(self.partials.update(result))
+                    except Exception as e:
+                        LOG.exception(e)
+            self.intermediate_result = result
+            self._speech_since_decode = False
+        if profiler is None:
+            return self._check_end(data16, current_time, end_of_audio)
+        end_start = time.perf_counter()
+        running = self._check_end(data16, current_time, end_of_audio)
+        analysis_seconds += time.perf_counter() - end_start
+        profiler.record(chunk_start, len(data16) / self.sample_rate,
+                        analysis_seconds, feed_seconds, decode_seconds, data16)
+        return running
+
+    def _check_end(self, data16: np.ndarray, current_time: float,
+                   end_of_audio: bool) -> bool:
+        if end_of_audio:
+            LOG.info("Stream Stopped")
+            return False
+        if self.endpointer is not None:
+            if self.endpointer.process(data16):
+                LOG.info(f"Stream Stopped ({self.endpointer.reason})")
+                return False
+        elif self._timeout and current_time > self.end_time:
+            LOG.info("Stream Stopped")
+            return False
+        return True
+
+    def _feed_gated(self, data16: np.ndarray, frame_stats) -> int:
+        if self.gate is None:
+            return self._feed_stream(data16)
+        fed = 0
+        for chunk in self.gate.process(data16, frame_stats):
+            fed += self._feed_stream(chunk)
+        return fed
+
+    def _feed_stream(self, samples: np.ndarray) -> int:
+        if self._fingerprint is not None:
+            self._update_fingerprint(samples)
+            if self._pending is not None:
+                # Chunks may be views of a reused buffer
+                self._pending.append(samples.copy())
+                self._pending_samples += len(samples)
+                if self._pending_samples <= self._max_pending:
+                    return 0
+                return self._flush_pending()
+        return self._feed_decoder(samples)
+
+    def _feed_decoder(self, samples: np.ndarray) -> int:
+        if self.stream is None:
+            if self.metrics is None:
+                self.stream = self._create_stream()
+            else:
+                start = time.perf_counter()
+                self.stream = self._create_stream()
+                self.metrics.stream_create_seconds = \
+                    time.perf_counter() - start
+        if self.metrics is None:
+            self.stream.feedAudioContent(samples)
+        else:
+            start = time.perf_counter()
+            self.stream.feedAudioContent(samples)
+            self.metrics.feed_seconds += time.perf_counter() - start
+        return len(samples)
+
+    def _update_fingerprint(self, samples: np.ndarray):
+        if not self._fingerprint_started:
+            # Leading digital silence (i.e. padding) is not fingerprinted
+            nonzero = np.flatnonzero(samples)
+            if not len(nonzero):
+                return
+            samples = samples[nonzero[0]:]
+            self._fingerprint_started = True
+        self._fingerprint.update(samples.astype('<i2', copy=False))
+
+    def _flush_pending(self) -> int:
+        pending, self._pending = self._pending, None
+        fed = 0
+        for chunk in pending:
+            fed += self._feed_decoder(chunk)
+        return fed
+
+    @property
+    def text(self) -> Optional[str]:
+        return self.result.text
+
+    @property
+    def transcriptions(self) -> List[str]:
+        return self.result.transcriptions
+
+    def finish(self) -> TranscriptionResult:
+        """
+        Finish the stream and get the final result. Only the detail
+        requested by `result_detail` is requested from the decoder.
+        :returns: TranscriptionResult; empty if no speech
+        """
+        LOG.debug(f"Intermediate decodes performed="
+                  f"{self.scheduler.performed} "
+                  f"skipped={self.scheduler.skipped}")
+        if self.gate is not None:
+            LOG.debug(f"Silence gate skipped "
+                      f"{self.gate.skipped_samples} samples")
+        start = time.perf_counter()
+        if self.converter is not None:
+            # Audio held back by the resampler, unless already flushed by
+            # an empty chunk
+            tail = self.converter.process(b'')
+            if len(tail):
+                self._feed_gated(tail, analyze_frame(tail))
+        if self.stream is None and not self._pending:
+            LOG.info("No audio passed the silence gate")
+            self.result = EMPTY_RESULT
+            self._finish_profile(start)
+            return self.result
+        if self.cache is not None:
+            key = f"{self.cache_key}|{self._fingerprint.hexdigest()}"
+            try:
+                cached = self.cache.get(key)
+            except Exception as e:
+                LOG.warning(f"Result cache lookup failed: {e}")
+                cached = None
+            if cached is not None:
+                LOG.debug("Using cached result")
+                self.cache_hit = True
+                self.result = self._input_times(cached)
+                if self.stream is not None:
+                    self.stream.freeStream()
+                self._finish_profile(start)
+                return self.result
+            if self._pending is not None:
+                self._flush_pending()
+        if self.result_detail == "text":
+            self.result = TranscriptionResult.from_text(
+                self.stream.finishStream(), self.has_data,
+                self.invalid_first_transcriptions)
+        else:
+            self.result = TranscriptionResult.from_metadata(
+                self.stream.finishStreamWithMetadata(
+                    num_results=self.num_results),
+                self.has_data, self.invalid_first_transcriptions)
+        if self.cache is not None:
+            try:
+                self.cache.put(key, self.result)
+            except Exception as e:
+                LOG.warning(f"Failed to cache result: {e}")
+        self.result = self._input_times(self.result)
+        if self.metrics is not None:
+            end = time.perf_counter()
+            self.metrics.finalize_seconds = end - start
+            if self._last_speech_time is not None:
+                self.metrics.result_latency_seconds = \
+                    end - self._last_speech_time
+        self._finish_profile(start)
+        if not self.has_data:
+            LOG.warning("Audio was empty")
+        return self.result
+
+    def discard(self):
+        """
+        Free the stream without decoding, i.e. for an abandoned utterance
+        """
+        if self.stream is not None:
+            self.stream.freeStream()
+            self.stream = None
+        self._pending = None
+
+    def _input_times(self, result: TranscriptionResult) -> \
+            TranscriptionResult:
+        """
+        Map word times from the audio that passed the silence gate to the
+        input audio. Cached results keep decoder times, since the skipped
+        audio differs between otherwise identical utterances.
+        """
+        if self.result_detail != "words" or self.gate is None or \
+                not self.gate.skipped_samples:
+            return result
+        return result.map_times(self.gate.input_time)
+
+    def _finish_profile(self, start: float):
+        if self.profiler is not None:
+            self.profiler.finish(time.perf_counter() - start)
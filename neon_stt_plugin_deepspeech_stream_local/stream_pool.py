@@ -0,0 +1,177 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from ovos_utils.log import LOG
+
+
+class _LanguageStreams:
+    def __init__(self, client):
+        self.client = client
+        self.streams = deque()
+        self.refilling = False
+
+
+class StreamPool:
+    """
+    Per-language pool of pre-created DeepSpeech streams. Streams taken with
+    `acquire` are replaced on a background thread so new utterances do not
+    wait on stream creation.
+    """
+
+    def __init__(self, size: int = 2,
+                 create_stream: Optional[Callable[[Any], Any]] = None):
+        """
+        :param size: number of idle streams to keep per language
+        :param create_stream: callable creating a stream for a model;
+            defaults to `client.createStream()`
+        """
+        self.size = size
+        self._create_stream = create_stream or (lambda c: c.createStream())
+        self._languages: Dict[str, _LanguageStreams] = dict()
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="DeepSpeechStreamPool")
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        with self._lock:
+            total = self.hits + self.misses
+            return self.hits / total if total else 0.0
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            pooled = {lang: len(entry.streams)
+                      for lang, entry in self._languages.items()}
+            hits, misses = self.hits, self.misses
+        return {"pooled": pooled, "hits": hits, "misses": misses,
+                "hit_rate": self.hit_rate}
+
+    def acquire(self, lang: str, client):
+        """
+        Get a new stream for a language, from the pool if available.
+        :param lang: language of the stream
+        :param client: deepspeech.Model the stream must belong to
+        :returns: deepspeech Stream
+        """
+        stream = None
+        with self._lock:
+            entry = self._entry(lang, client)
+            if entry.streams:
+                stream = entry.streams.popleft()
+                self.hits += 1
+            else:
+                self.misses += 1
+        if stream is None:
+            stream = self._create_stream(client)
+        self.prefill(lang, client)
+        return stream
+
+    def prefill(self, lang: str, client):
+        """
+        Fill the pool for a language in the background.
+        :param lang: language to create streams for
+        :param client: deepspeech.Model to create streams with
+        """
+        if self.size <= 0:
+            return
+        with self._lock:
+            entry = self._entry(lang, client)
+            if entry.refilling or len(entry.streams) >= self.size:
+                return
+            entry.refilling = True
+        try:
+            self._executor.submit(self._refill, lang, entry)
+        except RuntimeError:
+            # Executor is shut down
+            entry.refilling = False
+
+    def release_language(self, lang: str, *_):
+        """
+        Free pooled streams for a language, i.e. when its model is unloaded.
+        Accepts (and ignores) extra arguments to be usable as a
+        `ModelPool.on_evict` callback.
+        :param lang: language to release streams for
+        """
+        with self._lock:
+            entry = self._languages.pop(lang, None)
+        if entry:
+            self._free(entry.streams)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+        with self._lock:
+            languages = list(self._languages)
+        for lang in languages:
+            self.release_language(lang)
+
+    def _entry(self, lang: str, client) -> _LanguageStreams:
+        entry = self._languages.get(lang)
+        if entry is None or entry.client is not client:
+            if entry:
+                # Model was replaced; streams belong to the old model
+                self._free(entry.streams)
+            entry = _LanguageStreams(client)
+            self._languages[lang] = entry
+        return entry
+
+    def _refill(self, lang: str, entry: _LanguageStreams):
+        try:
+            while True:
+                with self._lock:
+                    if self._languages.get(lang) is not entry or \
+                            len(entry.streams) >= self.size:
+                        return
+                stream = self._create_stream(entry.client)
+                with self._lock:
+                    if self._languages.get(lang) is entry:
+                        entry.streams.append(stream)
+                        continue
+                # Language was released while creating the stream
+                self._free([stream])
+                return
+        except Exception as e:
+            LOG.exception(e)
+        finally:
+            entry.refilling = False
+
+    @staticmethod
+    def _free(streams):
+        for stream in list(streams):
+            try:
+                stream.freeStream()
+            except Exception as e:
+                LOG.error(f"Failed to free stream: {e}")
+        streams.clear()
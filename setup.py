@@ -50,6 +50,9 @@ def get_requirements(requirements_filename: str):
 
 PLUGIN_ENTRY_POINT = 'deepspeech_stream_local = neon_stt_plugin_deepspeech_stream_local:DeepSpeechLocalStreamingSTT'
 CONFIG_ENTRY_POINT = 'deepspeech_stream_local.config = neon_stt_plugin_deepspeech_stream_local.languages:stt_config'
+REMOTE_PLUGIN_ENTRY_POINT = 'deepspeech_stream_remote = neon_stt_plugin_deepspeech_stream_local.client:DeepSpeechRemoteStreamingSTT'
+SERVER_ENTRY_POINT = 'neon-deepspeech-server = neon_stt_plugin_deepspeech_stream_local.server:main'
+BATCH_ENTRY_POINT = 'neon-deepspeech-batch = neon_stt_plugin_deepspeech_stream_local.batch:main'
 
 with open("README.md", "r") as f:
     long_description = f.read()
@@ -81,6 +84,9 @@ setup(
         'Programming Language :: Python :: 3.6',
     ],
     keywords='mycroft plugin stt',
-    entry_points={'mycroft.plugin.stt': PLUGIN_ENTRY_POINT,
-                  'mycroft.plugin.stt.config': CONFIG_ENTRY_POINT}
+    entry_points={'mycroft.plugin.stt': [PLUGIN_ENTRY_POINT,
+                                         REMOTE_PLUGIN_ENTRY_POINT],
+                  'mycroft.plugin.stt.config': CONFIG_ENTRY_POINT,
+                  'console_scripts': [BATCH_ENTRY_POINT,
+                                      SERVER_ENTRY_POINT]}
 )
@@ -0,0 +1,84 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Mock DeepSpeech model for tests of StreamDecoder and its users. Every stream
+transcribes its audio as the model's `text`, revealed one character per 0.1s
+fed by intermediate decodes.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+
+class MockStream:
+    def __init__(self, text):
+        self.text = text
+        self.fed = 0
+        self.onset = None
+        self.freed = False
+
+    def freeStream(self):
+        self.freed = True
+
+    def feedAudioContent(self, data):
+        nonzero = np.flatnonzero(data)
+        if self.onset is None and len(nonzero):
+            self.onset = (self.fed + nonzero[0]) / 16000
+        self.fed += len(data)
+
+    def intermediateDecode(self):
+        return self.text[:self.fed // 1600]
+
+    def finishStreamWithMetadata(self, num_results=1):
+        candidates = [self.text] + [f"{self.text} {i}"
+                                    for i in range(1, num_results)]
+        # Tokens start at the first sound, 20ms apart
+        return SimpleNamespace(transcripts=[SimpleNamespace(
+            tokens=[SimpleNamespace(text=c,
+                                    start_time=(self.onset or 0) + i * 0.02)
+                    for i, c in enumerate(text)], confidence=-1.0)
+            for text in candidates])
+
+
+class MockModel:
+    def __init__(self, text="hello"):
+        self.text = text
+        self.streams = []
+
+    def sampleRate(self):
+        return 16000
+
+    def createStream(self):
+        self.streams.append(MockStream(self.text))
+        return self.streams[-1]
+
+
+SPEECH = (np.sin(np.arange(1600) / 5) * 5000).astype(np.int16)
+SILENCE = np.zeros(1600, dtype=np.int16)
@@ -0,0 +1,92 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Mock model and plugin for tests of sessions and the server. Transcripts are
+the fed samples joined with spaces.
+"""
+
+from threading import Event
+from types import SimpleNamespace
+
+import numpy as np
+
+from neon_stt_plugin_deepspeech_stream_local.stream_decoder import \
+    StreamDecoder
+
+
+class MockStream:
+    def __init__(self, gate: Event):
+        self.samples = []
+        self._gate = gate
+        self.freed = False
+
+    def freeStream(self):
+        self.freed = True
+
+    def feedAudioContent(self, data):
+        self._gate.wait()
+        self.samples.extend(int(s) for s in data)
+
+    def intermediateDecode(self):
+        return " ".join(str(s) for s in self.samples)
+
+    def finishStreamWithMetadata(self, num_results=1):
+        text = " ".join(str(s) for s in self.samples)
+        tokens = [SimpleNamespace(text=c, start_time=0.0) for c in text]
+        return SimpleNamespace(transcripts=[
+            SimpleNamespace(tokens=tokens, confidence=-1.0)] * num_results)
+
+
+class MockSTT:
+    language = "en-us"
+    available_languages = {"en"}
+    config = {"decode_policy": "always", "silence_gate": False}
+
+    def __init__(self):
+        # Clear to block feeding audio to streams
+        self.gate = Event()
+        self.gate.set()
+        self.reported = 0
+        self.streams = []
+        self.model = SimpleNamespace(createStream=self._create_stream,
+                                     sampleRate=lambda: 16000)
+
+    def _create_stream(self):
+        self.streams.append(MockStream(self.gate))
+        return self.streams[-1]
+
+    def create_decoder(self, lang, **kwargs):
+        return StreamDecoder(self.model, self.config, **kwargs)
+
+    def report_utterance(self, decoder):
+        self.reported += 1
+
+
+def pcm(*samples) -> bytes:
+    return np.array(samples, dtype=np.int16).tobytes()
@@ -0,0 +1,241 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+
+class TestFrameAnalysis(unittest.TestCase):
+    def test_analyze_frame_matches_legacy_rms(self):
+        from neon_stt_plugin_deepspeech_stream_local.audio import analyze_frame
+        frame = np.random.default_rng(1).integers(-20000, 20000, 512,
+                                                  dtype=np.int16)
+        sum_squares = sum((int(s) / 32768.0) ** 2 for s in frame)
+        legacy_rms = (sum_squares / (len(frame) / 2)) ** 0.5 * 1000
+        stats = analyze_frame(frame)
+        self.assertAlmostEqual(stats.rms, legacy_rms, places=6)
+        self.assertEqual(stats.peak, int(np.abs(frame.astype(int)).max()))
+        self.assertAlmostEqual(stats.dc_offset, frame.mean())
+        self.assertFalse(stats.silent)
+
+    def test_analyze_frame_silence(self):
+        from neon_stt_plugin_deepspeech_stream_local.audio import analyze_frame
+        stats = analyze_frame(np.full(512, 7, dtype=np.int16))
+        self.assertTrue(stats.silent)
+        self.assertEqual(stats.peak, 7)
+        self.assertEqual(stats.dc_offset, 7.0)
+
+        empty = analyze_frame(np.frombuffer(b'', dtype=np.int16))
+        self.assertTrue(empty.silent)
+        self.assertEqual(empty.rms, 0.0)
+
+    def test_analyze_frame_extremes(self):
+        from neon_stt_plugin_deepspeech_stream_local.audio import analyze_frame
+        frame = np.array([-32768, 32767] * 256, dtype=np.int16)
+        stats = analyze_frame(frame)
+        self.assertEqual(stats.peak, 32768)
+        self.assertGreater(stats.rms, 0)
+
+
+    def test_resample(self):
+        from neon_stt_plugin_deepspeech_stream_local.audio import resample
+        tone = (np.sin(np.arange(44100) * 2 * np.pi * 440 / 44100) *
+                10000).astype(np.int16)
+        resampled = resample(tone, 44100, 16000)
+        self.assertEqual(resampled.dtype, np.int16)
+        self.assertEqual(len(resampled), 16000)
+        expected = np.sin(np.arange(16000) * 2 * np.pi * 440 / 16000) * 10000
+        self.assertLess(np.abs(resampled - expected).max(), 200)
+        self.assertIs(resample(tone, 16000, 16000), tone)
+        # Content above 8kHz is filtered, not aliased into the speech band
+        tone = (np.sin(np.arange(44100) * 2 * np.pi * 12000 / 44100) *
+                10000).astype(np.int16)
+        resampled = resample(tone, 44100, 16000)[100:-100].astype(float)
+        self.assertLess(np.sqrt(np.mean(resampled ** 2)), 10)
+
+    def test_stream_converter_resample(self):
+        from neon_stt_plugin_deepspeech_stream_local.audio import \
+            AudioFormat, StreamConverter, resample
+
+        def _convert(converter, chunks):
+            return np.concatenate([converter.process(chunk)
+                                   for chunk in chunks] +
+                                  [converter.process(b'')])
+
+        tone = (np.sin(np.arange(48000) * 2 * np.pi * 440 / 48000) *
+                10000).astype(np.int16)
+        expected = np.sin(np.arange(16000) * 2 * np.pi * 440 / 16000) * 10000
+        data = tone.tobytes()
+        whole = _convert(StreamConverter(AudioFormat(48000), 16000), [data])
+        self.assertEqual(whole.dtype, np.int16)
+        self.assertEqual(len(whole), 16000)
+        # Away from the zero padding at the edges, the tone is unchanged
+        self.assertLess(np.abs(whole - expected)[100:-100].max(), 50)
+        for chunk_bytes in (960, 1001, 4096):
+            converter = StreamConverter(AudioFormat(48000), 16000)
+            converted = _convert(converter,
+                                 [data[i:i + chunk_bytes]
+                                  for i in range(0, len(data), chunk_bytes)])
+            self.assertEqual(len(converted), 16000)
+            self.assertLessEqual(np.abs(converted.astype(int) -
+                                        whole).max(), 1)
+
+        tone = (np.sin(np.arange(44100) * 2 * np.pi * 440 / 44100) *
+                10000).astype(np.int16)
+        whole = _convert(StreamConverter(AudioFormat(44100), 16000), [tone])
+        converted = _convert(StreamConverter(AudioFormat(44100), 16000),
+                             np.array_split(tone, 37))
+        self.assertEqual(len(converted), 16000)
+        self.assertLessEqual(np.abs(converted.astype(int) - whole).max(), 1)
+        self.assertLess(np.abs(whole - expected)[100:-100].max(), 50)
+        # Streaming and one-shot resampling share the filter
+        self.assertLessEqual(np.abs(converted.astype(int) -
+                                    resample(tone, 44100, 16000)).max(), 1)
+
+    def test_stream_converter_anti_alias(self):
+        from neon_stt_plugin_deepspeech_stream_local.audio import \
+            AudioFormat, StreamConverter
+        # 12kHz can not be represented at 16kHz and must not alias to 4kHz
+        tone = (np.sin(np.arange(48000) * 2 * np.pi * 12000 / 48000) *
+                10000).astype(np.int16)
+        converter = StreamConverter(AudioFormat(48000), 16000)
+        converted = np.concatenate([converter.process(tone.tobytes()),
+                                    converter.process(b'')])
+        rms = np.sqrt(np.mean(converted[100:-100].astype(float) ** 2))
+        self.assertLess(rms, 10)
+        # Speech band audio passes at full level
+        tone = (np.sin(np.arange(48000) * 2 * np.pi * 3000 / 48000) *
+                10000).astype(np.int16)
+        converted = np.concatenate([converter.process(tone.tobytes()),
+                                    converter.process(b'')])
+        rms = np.sqrt(np.mean(converted[100:-100].astype(float) ** 2))
+        self.assertAlmostEqual(rms, 10000 / np.sqrt(2), delta=100)
+
+        # Upsampling does not add images above the input band
+        tone = (np.sin(np.arange(8000) * 2 * np.pi * 1000 / 8000) *
+                10000).astype(np.int16)
+        converter = StreamConverter(AudioFormat(8000), 16000)
+        converted = np.concatenate([converter.process(tone.tobytes()),
+                                    converter.process(b'')])
+        self.assertEqual(len(converted), 16000)
+        expected = np.sin(np.arange(16000) * 2 * np.pi * 1000 / 16000) * 10000
+        self.assertLess(np.abs(converted - expected)[100:-100].max(), 50)
+
+    def test_stream_converter_formats(self):
+        from neon_stt_plugin_deepspeech_stream_local.audio import \
+            AudioFormat, StreamConverter
+        mono = np.array([1000, -2000, 32767, -32768], dtype=np.int16)
+        stereo = np.stack((mono, np.zeros(4, dtype=np.int16)), axis=1)
+        converter = StreamConverter(AudioFormat(16000, 2), 16000)
+        data = stereo.tobytes()
+        converted = np.concatenate([converter.process(data[:5]),
+                                    converter.process(data[5:])])
+        np.testing.assert_array_equal(converted, [500, -1000, 16384, -16384])
+
+        floats = mono.astype(np.float32) / 32768
+        converter = StreamConverter(AudioFormat(None, 1, "float32"), 16000)
+        np.testing.assert_array_equal(converter.process(floats.tobytes()),
+                                      mono)
+        converter = StreamConverter(AudioFormat(None, 1, "int32"), 16000)
+        np.testing.assert_array_equal(
+            converter.process((mono.astype(np.int32) << 16).tobytes()), mono)
+
+        self.assertTrue(AudioFormat().is_native(16000))
+        self.assertTrue(AudioFormat(16000).is_native(16000))
+        self.assertFalse(AudioFormat(48000).is_native(16000))
+        with self.assertRaises(ValueError):
+            StreamConverter(AudioFormat(sample_format="uint8"), 16000)
+
+
+    def test_silence_gate(self):
+        from neon_stt_plugin_deepspeech_stream_local.audio import SilenceGate
+        gate = SilenceGate(16000, threshold=10, preroll_ms=200,
+                           max_constant_ms=100)
+        quiet = np.full(1600, 3, dtype=np.int16)
+        quiet[::2] = -3
+        loud = (np.sin(np.arange(1600) / 5) * 5000).astype(np.int16)
+        zeros = np.zeros(1600, dtype=np.int16)
+
+        for _ in range(10):
+            self.assertEqual(gate.process(quiet), [])
+        self.assertFalse(gate.open)
+        # 200ms of pre-roll is released with the first speech
+        chunks = gate.process(loud)
+        self.assertTrue(gate.open)
+        self.assertEqual(sum(len(c) for c in chunks), 4800)
+        self.assertIs(chunks[-1], loud)
+        self.assertEqual(gate.skipped_samples, 8 * 1600)
+
+        # Quiet audio after onset is passed; only long digital silence is not
+        self.assertEqual(len(gate.process(quiet)), 1)
+        self.assertEqual(len(gate.process(zeros)), 1)
+        self.assertEqual(gate.process(zeros), [])
+        self.assertEqual(len(gate.process(loud)), 1)
+        self.assertEqual(len(gate.process(zeros)), 1)
+
+    def test_silence_gate_no_preroll(self):
+        from neon_stt_plugin_deepspeech_stream_local.audio import SilenceGate
+        gate = SilenceGate(16000, threshold=10, preroll_ms=0)
+        zeros = np.zeros(1600, dtype=np.int16)
+        loud = (np.sin(np.arange(1600) / 5) * 5000).astype(np.int16)
+        for _ in range(3):
+            self.assertEqual(gate.process(zeros), [])
+        self.assertEqual(gate.skipped_samples, 3 * 1600)
+        chunks = gate.process(loud)
+        self.assertEqual(len(chunks), 1)
+        self.assertIs(chunks[0], loud)
+
+    def test_silence_gate_input_time(self):
+        from neon_stt_plugin_deepspeech_stream_local.audio import SilenceGate
+        gate = SilenceGate(16000, threshold=10, preroll_ms=100,
+                           max_constant_ms=100)
+        zeros = np.zeros(1600, dtype=np.int16)
+        loud = (np.sin(np.arange(1600) / 5) * 5000).astype(np.int16)
+        self.assertEqual(gate.input_time(0.5), 0.5)
+        for _ in range(20):
+            gate.process(zeros)
+        # 1.9s skipped; 0.1s pre-roll passed with speech at 2.0s
+        gate.process(loud)
+        self.assertAlmostEqual(gate.input_time(0.0), 1.9)
+        self.assertAlmostEqual(gate.input_time(0.1), 2.0)
+        # 0.1s of silence passed, then 0.2s skipped
+        for _ in range(3):
+            gate.process(zeros)
+        gate.process(loud)
+        self.assertAlmostEqual(gate.input_time(0.25), 2.15)
+        self.assertAlmostEqual(gate.input_time(0.3), 2.4)
+        self.assertAlmostEqual(gate.input_time(0.35), 2.45)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(
+    os.path.realpath(__file__))), "benchmarks"))
+from run_benchmarks import compare, scenario_key, _peak_rss_mb, \
+    _reset_peak_rss
+
+
+def _result(**measurements):
+    result = {"decode_policy": "always", "chunk_size": 1024,
+              "concurrency": 1, "rtf_mean": 0.5, "latency_p50": 0.1,
+              "peak_rss_mb": 100.0, "peak_rss_scope": "scenario"}
+    result.update(measurements)
+    return result
+
+
+class TestCompare(unittest.TestCase):
+    def test_scenario_key(self):
+        self.assertEqual(scenario_key(_result()),
+                         "always/chunk=1024/concurrency=1")
+
+    def test_no_regression(self):
+        baseline = [_result()]
+        self.assertEqual(compare([_result()], baseline, 0.2), [])
+        self.assertEqual(compare([_result(rtf_mean=0.59)], baseline, 0.2),
+                         [])
+        # Improvements are not regressions
+        self.assertEqual(compare([_result(rtf_mean=0.1)], baseline, 0.2), [])
+
+    def test_regression(self):
+        regressions = compare([_result(rtf_mean=0.7, latency_p50=0.2)],
+                              [_result()], 0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith(
+            "always/chunk=1024/concurrency=1 rtf_mean: 0.5000 -> 0.7000"))
+        self.assertIn("latency_p50", regressions[1])
+
+    def test_unmatched_scenarios(self):
+        baseline = [_result()]
+        self.assertEqual(compare([_result(concurrency=4, rtf_mean=9.0)],
+                                 baseline, 0.2), [])
+        # Missing or zero measurements are skipped
+        self.assertEqual(compare([_result(latency_p50=None)], baseline, 0.2),
+                         [])
+        self.assertEqual(compare([_result(rtf_mean=1.0)],
+                                 [_result(rtf_mean=0.0)], 0.2), [])
+
+    def test_rss_scope(self):
+        baseline = [_result(peak_rss_scope="process", peak_rss_mb=50.0)]
+        self.assertEqual(compare([_result()], baseline, 0.2), [])
+        baseline = [_result(peak_rss_mb=50.0)]
+        self.assertEqual(len(compare([_result()], baseline, 0.2)), 1)
+
+
+class TestPeakRSS(unittest.TestCase):
+    def test_peak_rss(self):
+        reset = _reset_peak_rss()
+        self.assertEqual(reset, os.path.isfile("/proc/self/clear_refs"))
+        self.assertGreater(_peak_rss_mb(reset), 0)
+        self.assertGreater(_peak_rss_mb(False), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
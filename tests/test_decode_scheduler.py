@@ -0,0 +1,102 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.audio import FrameStats
+from neon_stt_plugin_deepspeech_stream_local.decode_scheduler import \
+    DecodeScheduler
+
+LOUD = FrameStats(rms=100.0, peak=10000, dc_offset=0.0, silent=False)
+QUIET = FrameStats(rms=1.0, peak=10, dc_offset=0.0, silent=False)
+
+
+class TestDecodeScheduler(unittest.TestCase):
+    def test_always(self):
+        scheduler = DecodeScheduler("always")
+        self.assertTrue(all(scheduler.should_decode(512, QUIET)
+                            for _ in range(10)))
+        self.assertEqual(scheduler.performed, 10)
+        self.assertEqual(scheduler.skipped, 0)
+
+    def test_interval(self):
+        scheduler = DecodeScheduler("interval", sample_rate=16000,
+                                    interval_ms=100)
+        # 1600 samples per decode; 512 sample chunks
+        decisions = [scheduler.should_decode(512, LOUD) for _ in range(8)]
+        self.assertEqual(decisions, [False, False, False, True,
+                                     False, False, False, True])
+        self.assertEqual(scheduler.performed, 2)
+        self.assertEqual(scheduler.skipped, 6)
+
+    def test_energy(self):
+        scheduler = DecodeScheduler("energy", sample_rate=16000,
+                                    interval_ms=100)
+        self.assertFalse(any(scheduler.should_decode(512, QUIET)
+                             for _ in range(10)))
+        self.assertTrue(scheduler.should_decode(512, LOUD))
+        self.assertFalse(scheduler.should_decode(512, QUIET))
+
+    def test_adaptive(self):
+        scheduler = DecodeScheduler("adaptive", sample_rate=1000,
+                                    interval_ms=10, max_interval_ms=40)
+
+        def samples_to_decode():
+            count = 0
+            while not scheduler.should_decode(1, LOUD):
+                count += 1
+            return count + 1
+
+        self.assertEqual(samples_to_decode(), 10)
+        scheduler.update("hello")
+        self.assertEqual(samples_to_decode(), 10)
+        scheduler.update("hello")
+        self.assertEqual(samples_to_decode(), 20)
+        scheduler.update("hello")
+        self.assertEqual(samples_to_decode(), 40)
+        scheduler.update("hello")
+        self.assertEqual(samples_to_decode(), 40)
+        scheduler.update("hello world")
+        self.assertEqual(samples_to_decode(), 10)
+
+    def test_from_config(self):
+        scheduler = DecodeScheduler.from_config({"decode_policy": "energy",
+                                                 "decode_interval_ms": 50},
+                                                8000)
+        self.assertEqual(scheduler.policy, "energy")
+        self.assertEqual(scheduler.sample_rate, 8000)
+        self.assertEqual(DecodeScheduler.from_config(None).policy, "interval")
+        with self.assertRaises(ValueError):
+            DecodeScheduler("sometimes")
+
+
+if __name__ == '__main__':
+    unittest.main()
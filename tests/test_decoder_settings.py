@@ -0,0 +1,122 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.decoder_settings import \
+    DecoderSettings
+
+
+class MockModel:
+    def __init__(self, scorer=None):
+        self.scorer = scorer
+        self.alpha_beta = None
+        self.beam_width = 500
+        self.hot_words = dict()
+
+    def enableExternalScorer(self, path):
+        self.scorer = path
+
+    def disableExternalScorer(self):
+        self.scorer = None
+
+    def setScorerAlphaBeta(self, alpha, beta):
+        self.alpha_beta = (alpha, beta)
+
+    def setBeamWidth(self, width):
+        self.beam_width = width
+
+    def addHotWord(self, word, boost):
+        if word in self.hot_words:
+            raise RuntimeError("Failed to insert hot word")
+        self.hot_words[word] = boost
+
+    def eraseHotWord(self, word):
+        del self.hot_words[word]
+
+    def clearHotWords(self):
+        self.hot_words.clear()
+
+
+class TestDecoderSettings(unittest.TestCase):
+    def test_from_config(self):
+        settings = DecoderSettings.from_config(
+            {"scorer_alpha": 0.9, "scorer_beta": 1.2, "beam_width": 100,
+             "hot_words": {"neon": 5.0}}, "en.scorer")
+        model = MockModel("en.scorer")
+        settings.apply(model, "en.scorer")
+        self.assertEqual(model.alpha_beta, (0.9, 1.2))
+        self.assertEqual(model.beam_width, 100)
+        self.assertEqual(model.hot_words, {"neon": 5.0})
+        # Reapplying to a model that already has the hot words
+        settings.apply(model, "en.scorer")
+        self.assertEqual(model.hot_words, {"neon": 5.0})
+
+        default = DecoderSettings.from_config({}, "en.scorer")
+        model = MockModel("en.scorer")
+        default.apply(model, "en.scorer")
+        self.assertIsNone(model.alpha_beta)
+        self.assertEqual(model.beam_width, 500)
+        self.assertNotEqual(default.identity, settings.identity)
+
+    def test_scorer(self):
+        settings = DecoderSettings(scorer_path="en.scorer")
+        model = MockModel("en.scorer")
+        settings.set_alpha_beta(model, 0.5, 1.0)
+        settings.set_scorer(model, "domain.scorer")
+        self.assertEqual(model.scorer, "domain.scorer")
+        self.assertEqual(model.alpha_beta, (0.5, 1.0))
+        settings.set_scorer(model, None)
+        self.assertIsNone(model.scorer)
+        # Reloaded models get the replaced scorer
+        reloaded = MockModel("en.scorer")
+        settings.apply(reloaded, "en.scorer")
+        self.assertIsNone(reloaded.scorer)
+
+    def test_hot_words(self):
+        settings = DecoderSettings()
+        model = MockModel()
+        identity = settings.identity
+        settings.add_hot_word(model, "neon", 2.0)
+        settings.add_hot_word(model, "neon", 4.0)
+        settings.add_hot_word(model, "gecko", 1.0)
+        self.assertEqual(model.hot_words, {"neon": 4.0, "gecko": 1.0})
+        self.assertNotEqual(settings.identity, identity)
+        settings.erase_hot_word(model, "gecko")
+        settings.erase_hot_word(model, "missing")
+        self.assertEqual(model.hot_words, {"neon": 4.0})
+        settings.clear_hot_words(model)
+        self.assertEqual(model.hot_words, {})
+        self.assertEqual(settings.identity, identity)
+
+
+if __name__ == '__main__':
+    unittest.main()
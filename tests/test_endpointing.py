@@ -0,0 +1,99 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.endpointing import Endpointer
+
+RATE = 16000
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (np.sin(2 * np.pi * 300 * t) * 8000).astype(np.int16)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(RATE * seconds), dtype=np.int16)
+
+
+def _run(endpointer: Endpointer, audio: np.ndarray, chunk: int) -> bool:
+    for idx in range(0, len(audio), chunk):
+        if endpointer.process(audio[idx:idx + chunk]):
+            return True
+    return False
+
+
+class TestEndpointer(unittest.TestCase):
+    def test_trailing_silence(self):
+        audio = np.concatenate((_silence(0.5), _tone(1.0), _silence(3.0)))
+        endpoints = set()
+        for chunk in (160, 512, 1023, 4096):
+            endpointer = Endpointer(RATE, trailing_silence_ms=600)
+            self.assertTrue(_run(endpointer, audio, chunk))
+            self.assertEqual(endpointer.reason, "trailing_silence")
+            endpoints.add(endpointer.endpoint_sample)
+        # Endpoint is independent of chunking and ~600ms after speech ends
+        self.assertEqual(len(endpoints), 1)
+        self.assertAlmostEqual(endpoints.pop() / RATE, 2.1, delta=0.05)
+
+    def test_short_pause_continues(self):
+        audio = np.concatenate((_tone(0.5), _silence(0.3), _tone(0.5)))
+        endpointer = Endpointer(RATE, trailing_silence_ms=600)
+        self.assertFalse(_run(endpointer, audio, 1024))
+        self.assertTrue(endpointer.speech_started)
+
+    def test_no_speech(self):
+        endpointer = Endpointer(RATE, leading_silence_ms=1000)
+        self.assertTrue(_run(endpointer, _silence(2.0), 1024))
+        self.assertEqual(endpointer.reason, "no_speech")
+        self.assertAlmostEqual(endpointer.audio_seconds, 1.0, delta=0.05)
+        # Further audio is ignored
+        self.assertTrue(endpointer.process(_tone(0.1)))
+
+    def test_max_utterance(self):
+        endpointer = Endpointer(RATE, max_utterance_ms=2000)
+        self.assertTrue(_run(endpointer, _tone(5.0), 1024))
+        self.assertEqual(endpointer.reason, "max_utterance")
+        self.assertAlmostEqual(endpointer.audio_seconds, 2.0, delta=0.05)
+
+    def test_from_config(self):
+        endpointer = Endpointer.from_config({"trailing_silence_ms": 300,
+                                             "vad_threshold": 50}, 8000)
+        self.assertEqual(endpointer.sample_rate, 8000)
+        self.assertEqual(endpointer.vad.threshold, 50)
+        self.assertEqual(endpointer._trailing, 2400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+HEAVY_MODULES = ("deepspeech", "numpy", "huggingface_hub")
+
+# Plugin managers import ovos_plugin_manager before scanning plugins, so only
+# the time spent importing this package is measured
+IMPORT_SCRIPT = f"""
+import json, sys, time
+sys.path.insert(0, {ROOT_DIR!r})
+import ovos_plugin_manager.templates.stt
+start = time.perf_counter()
+import neon_stt_plugin_deepspeech_stream_local
+from neon_stt_plugin_deepspeech_stream_local.languages import stt_config
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "languages": len(stt_config),
+                  "modules": [m for m in {HEAVY_MODULES!r}
+                              if m in sys.modules]}}))
+"""
+
+
+class TestImports(unittest.TestCase):
+    def test_import_is_lightweight(self):
+        output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT],
+                                stdout=subprocess.PIPE, check=True,
+                                universal_newlines=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        self.assertGreater(result["languages"], 0)
+        self.assertEqual(result["modules"], [])
+        self.assertLess(result["seconds"], 0.5,
+                        f"Plugin import took {result['seconds']:.3f}s")
+
+
+if __name__ == '__main__':
+    unittest.main()
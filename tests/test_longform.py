@@ -0,0 +1,164 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.longform import \
+    LongFormTranscriber
+from neon_stt_plugin_deepspeech_stream_local.results import Candidate, \
+    TranscriptionResult, Word
+
+RATE = 16000
+BLOCK = 160
+
+
+def _word(idx, ms=200):
+    """Tone whose amplitude identifies the word"""
+    return (np.sin(np.arange(RATE * ms // 1000) / 3) *
+            1000 * (idx + 1)).astype(np.int16)
+
+
+def _silence(ms):
+    return np.zeros(RATE * ms // 1000, dtype=np.int16)
+
+
+class MockDecoder:
+    """Recognizes each tone in its audio as a word `w<idx>`"""
+    def __init__(self):
+        self.samples = []
+
+    def feed(self, data):
+        self.samples.append(np.array(data))
+        return True
+
+    def finish(self):
+        audio = np.concatenate(self.samples) if self.samples else \
+            np.zeros(0, dtype=np.int16)
+        words = []
+        start = None
+        peak = 0
+        for idx in range(0, len(audio) - BLOCK + 1, BLOCK):
+            block_peak = int(np.abs(audio[idx:idx + BLOCK]).max())
+            if block_peak and start is None:
+                start, peak = idx, 0
+            if block_peak:
+                peak = max(peak, block_peak)
+            elif start is not None:
+                words.append(Word(f"w{round(peak / 1000) - 1}",
+                                  start / RATE, (idx - start) / RATE, -1.0))
+                start = None
+        if start is not None:
+            words.append(Word(f"w{round(peak / 1000) - 1}", start / RATE,
+                              (len(audio) - start) / RATE, -1.0))
+        if not words:
+            return TranscriptionResult()
+        return TranscriptionResult([Candidate(
+            text=" ".join(w.text for w in words), confidence=-1.0,
+            words=words)])
+
+
+class TestLongForm(unittest.TestCase):
+    def _transcriber(self, **kwargs):
+        self.decoders = []
+
+        def _create():
+            self.decoders.append(MockDecoder())
+            return self.decoders[-1]
+
+        return LongFormTranscriber(_create, RATE, **kwargs)
+
+    @staticmethod
+    def _chunks(audio, size=1600):
+        return [audio[i:i + size] for i in range(0, len(audio), size)]
+
+    def test_split_at_silence(self):
+        audio = np.concatenate((_silence(1000), _word(0), _silence(100),
+                                _word(1), _silence(1500), _word(2),
+                                _silence(300)))
+        transcriber = self._transcriber(min_silence_ms=600)
+        segments = list(transcriber.transcribe(
+            c.tobytes() for c in self._chunks(audio)))
+        self.assertEqual([s.text for s in segments], ["w0 w1", "w2"])
+        self.assertAlmostEqual(segments[0].words[0].start_time, 1.0,
+                               delta=0.02)
+        self.assertAlmostEqual(segments[0].end, 1.5, delta=0.03)
+        self.assertAlmostEqual(segments[1].words[0].start_time, 3.0,
+                               delta=0.02)
+        self.assertEqual(len(self.decoders), 2)
+
+    def test_long_speech(self):
+        parts = []
+        for idx in range(60):
+            parts += [_word(idx % 9, 170), _silence(80)]
+        audio = np.concatenate(parts)
+        transcriber = self._transcriber(max_segment_ms=2000, overlap_ms=480)
+        segments = list(transcriber.transcribe(self._chunks(audio, 1000)))
+        self.assertGreater(len(segments), 5)
+        words = [w for s in segments for w in s.words]
+        self.assertEqual([w.text for w in words],
+                         [f"w{idx % 9}" for idx in range(60)])
+        for idx, word in enumerate(words):
+            self.assertAlmostEqual(word.start_time, idx * 0.25, delta=0.02)
+        for previous, segment in zip(segments, segments[1:]):
+            self.assertAlmostEqual(previous.end, segment.start)
+        # Each decoder only holds one segment and its overlap
+        for decoder in self.decoders:
+            self.assertLessEqual(sum(len(s) for s in decoder.samples),
+                                 RATE * 2.5)
+
+    def test_no_speech(self):
+        transcriber = self._transcriber()
+        self.assertEqual(list(transcriber.transcribe([_silence(5000)])), [])
+        self.assertEqual(self.decoders, [])
+
+    def test_finish_remainder(self):
+        # Chunks do not divide into frames, so audio is left over at the end
+        audio = np.concatenate((_silence(500), _word(0, 230)))
+        transcriber = self._transcriber()
+        segments = list(transcriber.transcribe(self._chunks(audio, 1000)))
+        self.assertEqual([s.text for s in segments], ["w0"])
+        fed = sum(len(s) for s in self.decoders[0].samples)
+        self.assertEqual(round(segments[0].start * RATE) + fed, len(audio))
+        self.assertAlmostEqual(segments[0].words[0].duration, 0.23,
+                               delta=0.01)
+
+    def test_from_config_sample_rate(self):
+        transcriber = LongFormTranscriber.from_config(
+            {"longform_silence_ms": 300}, MockDecoder, 8000)
+        self.assertEqual(transcriber.sample_rate, 8000)
+        self.assertEqual(transcriber.frame_length, 240)
+        self.assertEqual(transcriber._min_silence, 2400)
+
+
+if __name__ == '__main__':
+    unittest.main()
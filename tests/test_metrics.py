@@ -0,0 +1,95 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.metrics import Histogram, \
+    InMemoryMetricsSink, MetricsSink, UtteranceMetrics
+
+
+class TestMetrics(unittest.TestCase):
+    def test_utterance_metrics(self):
+        metrics = UtteranceMetrics(lang="en", audio_seconds=2.0,
+                                   feed_seconds=0.1, decode_seconds=0.3,
+                                   finalize_seconds=0.1)
+        self.assertAlmostEqual(metrics.processing_seconds, 0.5)
+        self.assertAlmostEqual(metrics.real_time_factor, 0.25)
+        self.assertIsNone(UtteranceMetrics().real_time_factor)
+        self.assertEqual(metrics.as_dict()["lang"], "en")
+
+    def test_histogram(self):
+        hist = Histogram([1, 2, 5, 10])
+        self.assertIsNone(hist.percentile(50))
+        for value in (0.5, 1.5, 1.5, 4, 20):
+            hist.add(value)
+        self.assertEqual(hist.count, 5)
+        self.assertEqual(hist.percentile(50), 2)
+        self.assertEqual(hist.percentile(99), 20)
+        summary = hist.summary()
+        self.assertEqual(summary["min"], 0.5)
+        self.assertEqual(summary["max"], 20)
+        self.assertAlmostEqual(summary["mean"], 5.5)
+
+    def test_in_memory_sink(self):
+        sink = InMemoryMetricsSink()
+        for rtf in (0.1, 0.2, 0.3):
+            sink.record(UtteranceMetrics(audio_seconds=1.0,
+                                         decode_seconds=rtf))
+        summary = sink.summary()
+        self.assertEqual(summary["real_time_factor"]["count"], 3)
+        self.assertAlmostEqual(summary["decode_seconds"]["max"], 0.3)
+        # Unset measurements are not recorded
+        self.assertNotIn("result_latency_seconds", summary)
+        self.assertAlmostEqual(sink.last.decode_seconds, 0.3)
+        sink.reset()
+        self.assertEqual(sink.summary(), {})
+
+    def test_sink_interface(self):
+        class IncompleteSink(MetricsSink):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteSink()
+
+        class ListSink(MetricsSink):
+            def __init__(self):
+                self.records = []
+
+            def record(self, metrics):
+                self.records.append(metrics)
+
+        sink = ListSink()
+        sink.record(UtteranceMetrics(lang="en"))
+        self.assertEqual(len(sink.records), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.model_pool import ModelPool
+
+
+class TestModelPool(unittest.TestCase):
+    def test_lru_count_limit(self):
+        evicted = []
+        pool = ModelPool(max_models=2,
+                         on_evict=lambda lang, model: evicted.append(lang))
+        pool.put("en", "en_model")
+        pool.put("es", "es_model")
+        self.assertEqual(pool.get("en"), "en_model")
+        pool.put("de", "de_model")
+        self.assertEqual(evicted, ["es"])
+        self.assertNotIn("es", pool)
+        self.assertIsNone(pool.get("es"))
+        self.assertEqual(list(pool.resident), ["en", "de"])
+        stats = pool.stats
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["evictions"], 1)
+
+    def test_byte_limit(self):
+        pool = ModelPool(max_bytes=100)
+        pool.put("en", "en_model", 60)
+        pool.put("es", "es_model", 30)
+        self.assertEqual(pool.total_bytes, 90)
+        pool.put("de", "de_model", 50)
+        self.assertEqual(set(pool.resident), {"es", "de"})
+        self.assertEqual(pool.total_bytes, 80)
+
+    def test_pinned(self):
+        pool = ModelPool(max_models=1)
+        pool.put("en", "en_model", pinned=True)
+        pool.put("es", "es_model")
+        # Newest model is kept even though the pool is over its limit
+        self.assertEqual(len(pool), 2)
+        pool.put("de", "de_model")
+        self.assertEqual(set(pool.resident), {"en", "de"})
+        self.assertEqual(pool.stats["pinned"], ["en"])
+
+        pool.unpin("en")
+        self.assertEqual(set(pool.resident), {"de"})
+        self.assertTrue(pool.evict("de"))
+        self.assertFalse(pool.evict("de"))
+        self.assertEqual(len(pool), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import time
+import unittest
+
+from os.path import isfile, join
+from tempfile import TemporaryDirectory
+from threading import Lock, Thread
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.model_store import ModelStore
+
+
+class FakeHub:
+    """
+    Local stand-in for `hf_hub_download` serving files from a directory
+    """
+    def __init__(self, root):
+        self.root = root
+        self.calls = []
+
+    def add_repo(self, repo_id):
+        repo_dir = join(self.root, repo_id)
+        os.makedirs(repo_dir, exist_ok=True)
+        for name in ("output_graph.pbmm", "output_graph.tflite",
+                     "model.tflite", "kenlm.scorer"):
+            with open(join(repo_dir, name), 'w') as f:
+                f.write(f"{repo_id}/{name}")
+
+    def __call__(self, repo_id, filename):
+        self.calls.append((repo_id, filename))
+        path = join(self.root, repo_id, filename)
+        if not isfile(path):
+            raise FileNotFoundError(path)
+        return path
+
+
+class TestModelStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = TemporaryDirectory()
+        self.hub = FakeHub(join(self._tmp.name, "hub"))
+        self.hub.add_repo("NeonBohdan/stt-polyglot-en")
+        self.cache_dir = join(self._tmp.name, "cache")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_resolve_and_fast_path(self):
+        store = ModelStore(self.cache_dir, downloader=self.hub)
+        model, scorer = store.resolve("en-us")
+        self.assertTrue(model.endswith(".pbmm"))
+        self.assertTrue(isfile(model))
+        self.assertTrue(isfile(scorer))
+        self.assertEqual(len(self.hub.calls), 2)
+        self.assertTrue(store.verify("en"))
+
+        # Files resolved with a new store instance never touch the hub
+        store = ModelStore(self.cache_dir, downloader=self.hub)
+        self.assertEqual(store.resolve("en"), (model, scorer))
+        self.assertEqual(len(self.hub.calls), 2)
+
+        tf_model, tf_scorer = store.resolve("en", tflite=True)
+        self.assertTrue(tf_model.endswith(".tflite"))
+        self.assertEqual(scorer, tf_scorer)
+        self.assertIn("pbmm", store.manifest["en"])
+        self.assertIn("tflite", store.manifest["en"])
+
+    def test_parallel_resolve(self):
+        langs = ("en", "es", "de")
+        for lang in langs[1:]:
+            self.hub.add_repo(f"NeonBohdan/stt-polyglot-{lang}")
+        lock = Lock()
+        active = []
+        peak = []
+
+        def _download(repo_id, filename):
+            with lock:
+                active.append(repo_id)
+                peak.append(len(active))
+            time.sleep(0.2)
+            with lock:
+                active.remove(repo_id)
+            return self.hub(repo_id, filename)
+
+        store = ModelStore(self.cache_dir, downloader=_download)
+        threads = [Thread(target=store.resolve, args=(lang,))
+                   for lang in langs * 2]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Languages download concurrently; each language only once
+        self.assertEqual(max(peak), 3)
+        self.assertEqual(len(self.hub.calls), 6)
+        self.assertEqual(set(store.manifest), set(langs))
+        for lang in langs:
+            self.assertTrue(store.verify(lang))
+
+    def test_files_are_linked(self):
+        store = ModelStore(self.cache_dir, downloader=self.hub)
+        model, _ = store.resolve("en")
+        src = self.hub("NeonBohdan/stt-polyglot-en", "output_graph.pbmm")
+        self.assertTrue(os.path.samefile(model, src))
+
+    def test_offline(self):
+        store = ModelStore(self.cache_dir, offline=True, downloader=self.hub)
+        with self.assertRaises(FileNotFoundError):
+            store.resolve("en")
+        self.assertEqual(self.hub.calls, [])
+
+        ModelStore(self.cache_dir, downloader=self.hub).resolve("en")
+        self.hub.calls.clear()
+        store = ModelStore(self.cache_dir, offline=True, downloader=self.hub)
+        model, scorer = store.resolve("en")
+        self.assertTrue(isfile(model))
+        self.assertEqual(self.hub.calls, [])
+
+    def test_missing_file_refetched(self):
+        store = ModelStore(self.cache_dir, downloader=self.hub)
+        model, _ = store.resolve("en")
+        os.remove(model)
+        self.assertFalse(store.verify("en"))
+        model, _ = store.resolve("en")
+        self.assertTrue(isfile(model))
+        self.assertEqual(len(self.hub.calls), 4)
+
+        store.invalidate("en")
+        self.assertNotIn("en", store.manifest)
+        store.resolve("en")
+        self.assertEqual(len(self.hub.calls), 6)
+
+    def test_unsupported_language(self):
+        store = ModelStore(self.cache_dir, downloader=self.hub)
+        with self.assertRaises(Exception):
+            store.resolve("xx")
+
+
+if __name__ == '__main__':
+    unittest.main()
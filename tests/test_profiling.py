@@ -0,0 +1,125 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import sys
+import time
+import unittest
+
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.batch import read_audio
+from neon_stt_plugin_deepspeech_stream_local.profiling import \
+    ProfileDumper, UtteranceProfiler
+from neon_stt_plugin_deepspeech_stream_local.stream_decoder import \
+    StreamDecoder
+from decoder_mocks import MockModel, SPEECH
+
+
+class TestUtteranceProfiler(unittest.TestCase):
+    def test_timeline(self):
+        profiler = UtteranceProfiler(max_chunks=3, record_audio=True)
+        decoder = StreamDecoder(MockModel(), {"decode_policy": "always",
+                                              "silence_gate": False},
+                                profiler=profiler)
+        for _ in range(5):
+            profiler.queue_wait += 0.01
+            self.assertTrue(decoder.feed(SPEECH))
+        self.assertIsNone(profiler.latency_seconds)
+        decoder.finish()
+        self.assertEqual(profiler.recorded_chunks, 5)
+        self.assertEqual(profiler.dropped_chunks, 2)
+        self.assertEqual(len(profiler.timeline), 3)
+        self.assertEqual(len(profiler.audio), 3)
+        self.assertAlmostEqual(profiler.audio_seconds, 0.5)
+        chunk = profiler.timeline[-1]
+        self.assertEqual(chunk.audio_seconds, 0.1)
+        self.assertEqual(chunk.queue_wait, 0.01)
+        self.assertGreater(chunk.decode, 0)
+        self.assertGreater(chunk.offset, profiler.timeline[0].offset)
+        # Audio was fed faster than real time
+        self.assertLess(profiler.latency_seconds, 0)
+
+
+class TestProfileDumper(unittest.TestCase):
+    def _profile(self, dumper, lag):
+        profiler = dumper.create_profiler("en")
+        start = time.perf_counter() - lag
+        profiler.record(start, 0.1, 0.001, 0.002, 0.003, SPEECH)
+        profiler.finish(0.01)
+        return profiler
+
+    def test_dump_slow_utterances(self):
+        with TemporaryDirectory() as directory:
+            dumper = ProfileDumper.from_config(
+                {"profiling": True, "profiling_dir": directory,
+                 "profiling_threshold_ms": 500, "profiling_audio": True,
+                 "profiling_max_dumps": 2})
+            self.assertIsNone(dumper.check(self._profile(dumper, 0), 16000))
+            self.assertEqual(os.listdir(directory), [])
+
+            path = dumper.check(self._profile(dumper, 1), 16000,
+                                "hello").result(5)
+            with open(path) as f:
+                profile = json.load(f)
+            self.assertEqual(profile["text"], "hello")
+            self.assertEqual(profile["lang"], "en")
+            self.assertGreaterEqual(profile["latency_seconds"], 0.5)
+            self.assertEqual(profile["timeline"][0]["decode"], 0.003)
+            audio = read_audio(os.path.join(directory,
+                                            profile["audio_file"]), 16000)
+            np.testing.assert_array_equal(audio, SPEECH)
+
+            for _ in range(2):
+                dumper.check(self._profile(dumper, 1), 16000).result(5)
+            files = os.listdir(directory)
+            self.assertEqual(len([f for f in files if f.endswith(".json")]),
+                             2)
+            self.assertEqual(len([f for f in files if f.endswith(".wav")]),
+                             2)
+            dumper.shutdown()
+
+    def test_write_failure(self):
+        with TemporaryDirectory() as directory:
+            blocked = os.path.join(directory, "file")
+            open(blocked, 'w').close()
+            dumper = ProfileDumper(blocked, threshold_seconds=0.5)
+            future = dumper.check(self._profile(dumper, 1), 16000)
+            self.assertIsNone(future.result(5))
+            dumper.shutdown()
+
+    def test_disabled(self):
+        self.assertIsNone(ProfileDumper.from_config({}))
+
+
+if __name__ == '__main__':
+    unittest.main()
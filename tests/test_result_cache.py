@@ -0,0 +1,122 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local import result_cache
+from neon_stt_plugin_deepspeech_stream_local.result_cache import ResultCache
+from neon_stt_plugin_deepspeech_stream_local.results import Candidate, \
+    TranscriptionResult, Word
+
+
+def _result(text):
+    return TranscriptionResult(
+        [Candidate(text=text, confidence=-1.0,
+                   words=[Word(text, 0.1, 0.2, -1.0)])])
+
+
+class TestResultCache(unittest.TestCase):
+    def test_lru(self):
+        cache = ResultCache(max_entries=2)
+        cache.put("a", _result("a"))
+        cache.put("b", _result("b"))
+        self.assertEqual(cache.get("a").text, "a")
+        cache.put("c", _result("c"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c").text, "c")
+        self.assertEqual(cache.stats, {"hits": 2, "misses": 1,
+                                       "hit_rate": 2 / 3, "entries": 2})
+
+    def test_ttl(self):
+        cache = ResultCache(ttl_seconds=10)
+        with patch.object(result_cache.time, "time", return_value=100):
+            cache.put("a", _result("a"))
+        with patch.object(result_cache.time, "time", return_value=105):
+            self.assertIsNotNone(cache.get("a"))
+        with patch.object(result_cache.time, "time", return_value=111):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats["entries"], 0)
+
+    def test_disk(self):
+        with TemporaryDirectory() as tmp:
+            ResultCache(cache_dir=tmp).put("a", _result("yes"))
+            cache = ResultCache(cache_dir=tmp)
+            result = cache.get("a")
+            self.assertEqual(result.text, "yes")
+            self.assertEqual(result.candidates[0].confidence, -1.0)
+            self.assertEqual(result.candidates[0].words,
+                             [Word("yes", 0.1, 0.2, -1.0)])
+            self.assertIsNone(cache.get("b"))
+            cache.clear()
+            self.assertIsNone(ResultCache(cache_dir=tmp).get("a"))
+
+    def test_disk_prune_concurrent_removal(self):
+        with TemporaryDirectory() as tmp:
+            cache = ResultCache(cache_dir=tmp, max_disk_entries=1)
+            for key in "abc":
+                cache.put(key, _result(key))
+            real_remove = os.remove
+
+            def _remove(path):
+                # Another process removed the entry first
+                real_remove(path)
+                raise FileNotFoundError(path)
+
+            with patch.object(result_cache.os, "remove", _remove):
+                cache._prune()
+                cache.clear()
+            self.assertEqual(os.listdir(tmp), [])
+
+    def test_model_identity(self):
+        with TemporaryDirectory() as tmp:
+            model = os.path.join(tmp, "model.pbmm")
+            with open(model, 'wb') as f:
+                f.write(b'model')
+            identity = result_cache.model_identity(model, None)
+            self.assertEqual(identity,
+                             result_cache.model_identity(model, None))
+            with open(model, 'ab') as f:
+                f.write(b'v2')
+            self.assertNotEqual(identity,
+                                result_cache.model_identity(model, None))
+
+    def test_from_config(self):
+        self.assertIsNone(ResultCache.from_config({}))
+        cache = ResultCache.from_config({"result_cache": True,
+                                         "result_cache_size": 8})
+        self.assertEqual(cache.max_entries, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
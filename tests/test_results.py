@@ -0,0 +1,124 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+from collections import namedtuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.results import Candidate, \
+    PartialResultTracker, TranscriptionResult
+
+Token = namedtuple("Token", ("text", "start_time"))
+Transcript = namedtuple("Transcript", ("tokens", "confidence"))
+Metadata = namedtuple("Metadata", ("transcripts",))
+
+
+def _transcript(text, confidence=-1.0):
+    return Transcript([Token(c, i * 0.1) for i, c in enumerate(text)],
+                      confidence)
+
+
+class ResultsTests(unittest.TestCase):
+    def test_candidate_words(self):
+        candidate = Candidate(_transcript("hi you", -2.5))
+        self.assertEqual(candidate.text, "hi you")
+        self.assertEqual(candidate.confidence, -2.5)
+        words = candidate.words
+        self.assertEqual([w.text for w in words], ["hi", "you"])
+        self.assertAlmostEqual(words[0].start_time, 0.0)
+        self.assertAlmostEqual(words[0].duration, 0.12)
+        self.assertAlmostEqual(words[1].start_time, 0.3)
+        self.assertAlmostEqual(words[1].duration, 0.22)
+
+    def test_text_only(self):
+        result = TranscriptionResult.from_text("hello")
+        self.assertEqual(result.text, "hello")
+        self.assertEqual(result.transcriptions, ["hello"])
+        self.assertIsNone(result.candidates[0].confidence)
+        self.assertEqual(result.candidates[0].words, [])
+        self.assertEqual(result.as_dict("text"), {"text": "hello"})
+
+    def test_invalid_first_transcription(self):
+        metadata = Metadata([_transcript("he"), _transcript("yes"),
+                             _transcript("hey")])
+        result = TranscriptionResult.from_metadata(metadata, True, ["he"])
+        self.assertEqual(result.transcriptions, ["yes", "hey", "he"])
+        self.assertEqual(result.text, "yes")
+
+    def test_empty(self):
+        metadata = Metadata([_transcript(""), _transcript("he")])
+        self.assertEqual(TranscriptionResult.from_metadata(metadata)
+                         .transcriptions, [])
+        metadata = Metadata([_transcript("hello")])
+        result = TranscriptionResult.from_metadata(metadata, has_data=False)
+        self.assertEqual(result.transcriptions, [])
+        self.assertIsNone(result.text)
+
+    def test_as_dict(self):
+        metadata = Metadata([_transcript("hello", -1.5),
+                             _transcript("yellow", -3.0)])
+        result = TranscriptionResult.from_metadata(metadata)
+        nbest = result.as_dict("nbest")
+        self.assertEqual(nbest["text"], "hello")
+        self.assertEqual(nbest["candidates"][1],
+                         {"text": "yellow", "confidence": -3.0})
+        words = result.as_dict("words")
+        self.assertEqual(words["candidates"][0]["words"][0]["text"], "hello")
+
+    def test_metadata_freed(self):
+        # DeepSpeech frees tokens with the Metadata object
+        metadata = Metadata([_transcript("hi you", -2.5)])
+        result = TranscriptionResult.from_metadata(metadata)
+        for transcript in metadata.transcripts:
+            transcript.tokens.clear()
+        del metadata
+        self.assertEqual(result.text, "hi you")
+        self.assertEqual([w.text for w in result.candidates[0].words],
+                         ["hi", "you"])
+        self.assertEqual(result.candidates[0].confidence, -2.5)
+
+    def test_partial_results(self):
+        tracker = PartialResultTracker(2)
+        partial = tracker.update("hel")
+        self.assertEqual(partial.stable, "")
+        self.assertEqual(partial.unstable, "hel")
+        self.assertIsNone(tracker.update("hel"))
+        self.assertEqual(tracker.update("hello wor").stable, "")
+        partial = tracker.update("hello world")
+        self.assertEqual(partial.stable, "hello")
+        self.assertEqual(partial.unstable, "world")
+        partial = tracker.update("hello world how")
+        self.assertEqual(partial.stable, "hello world")
+        self.assertEqual(tracker.update("yellow world how").stable, "")
+
+
+if __name__ == '__main__':
+    unittest.main()
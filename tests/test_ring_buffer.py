@@ -0,0 +1,113 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+from threading import Thread
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.ring_buffer import \
+    AudioRingBuffer
+
+
+def _drain(buffer: AudioRingBuffer) -> list:
+    frames = []
+    while True:
+        frame = buffer.get()
+        if frame is None:
+            return frames
+        frames.append(frame.copy())
+        buffer.task_done()
+
+
+class TestAudioRingBuffer(unittest.TestCase):
+    def test_odd_chunks_coalesced(self):
+        samples = np.arange(-500, 500, dtype=np.int16)
+        data = samples.tobytes()
+        buffer = AudioRingBuffer(capacity_samples=1024, frame_samples=100)
+        result = []
+
+        reader = Thread(target=lambda: result.extend(_drain(buffer)))
+        reader.start()
+        idx = 0
+        sizes = (1, 7, 2, 33, 150, 3, 1)
+        while idx < len(data):
+            size = sizes[idx % len(sizes)]
+            buffer.put(data[idx:idx + size])
+            idx += size
+        buffer.put(None)
+        reader.join(5)
+
+        self.assertEqual([len(f) for f in result], [100] * 10)
+        np.testing.assert_array_equal(np.concatenate(result), samples)
+        self.assertEqual(buffer.overruns, 0)
+        self.assertLessEqual(buffer.high_water, 1024)
+
+    def test_partial_final_frame(self):
+        buffer = AudioRingBuffer(capacity_samples=64, frame_samples=16)
+        buffer.put(np.arange(40, dtype=np.int16).tobytes())
+        buffer.put(None)
+        frames = _drain(buffer)
+        self.assertEqual([len(f) for f in frames], [16, 16, 8])
+        self.assertIsNone(buffer.get())
+
+    def test_wraparound(self):
+        buffer = AudioRingBuffer(capacity_samples=10, frame_samples=4)
+        buffer.put(np.arange(8, dtype=np.int16).tobytes())
+        np.testing.assert_array_equal(buffer.get(), [0, 1, 2, 3])
+        buffer.task_done()
+        buffer.put(np.arange(8, 14, dtype=np.int16).tobytes())
+        buffer.put(None)
+        frames = _drain(buffer)
+        np.testing.assert_array_equal(np.concatenate(frames),
+                                      np.arange(4, 14))
+
+    def test_overrun(self):
+        buffer = AudioRingBuffer(capacity_samples=10, frame_samples=4)
+        buffer.put(np.arange(8, dtype=np.int16).tobytes())
+        held = buffer.get()
+        np.testing.assert_array_equal(held, [0, 1, 2, 3])
+        # Held frame is preserved; oldest unread audio is dropped
+        buffer.put(np.arange(8, 14, dtype=np.int16).tobytes())
+        np.testing.assert_array_equal(held, [0, 1, 2, 3])
+        self.assertEqual(buffer.overruns, 1)
+        self.assertEqual(buffer.dropped_samples, 4)
+        buffer.put(None)
+        frames = _drain(buffer)
+        np.testing.assert_array_equal(np.concatenate(frames),
+                                      [8, 9, 10, 11, 12, 13])
+        self.assertEqual(buffer.stats["overruns"], 1)
+        self.assertEqual(buffer.nbytes, 28)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import time
+import unittest
+
+from threading import Timer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.client import \
+    DeepSpeechRemoteStreamingSTT, RemoteSession
+from neon_stt_plugin_deepspeech_stream_local.languages import languages
+from neon_stt_plugin_deepspeech_stream_local.server import STTServer
+from neon_stt_plugin_deepspeech_stream_local.sessions import SessionEngine
+from session_mocks import MockSTT, pcm
+
+
+class MockServerSTT(MockSTT):
+    config = {**MockSTT.config, "endpointing": "none"}
+
+    def __init__(self):
+        super().__init__()
+        self.sessions = SessionEngine(self, max_workers=2,
+                                      max_queued_chunks=2)
+
+    def open_session(self, lang=None, **options):
+        return self.sessions.open_session(lang, **options)
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self.stt = MockServerSTT()
+        self.server = STTServer(self.stt, port=0, max_sessions=2,
+                                feed_timeout=0.2).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.stt.sessions.shutdown()
+
+    def test_session(self):
+        session = RemoteSession(self.server.url, "en-us", num_results=2)
+        for i in range(1, 4):
+            self.assertTrue(session.feed(pcm(i, -i)))
+        # Partials lag behind audio still queued on the server
+        self.assertTrue("1 -1 2 -2 3 -3".startswith(session.partial.text))
+        result = session.finish()
+        self.assertEqual(result["text"], "1 -1 2 -2 3 -3")
+        self.assertEqual(len(result["transcriptions"]), 2)
+        self.assertEqual(result["result"]["candidates"][0]["confidence"],
+                         -1.0)
+        self.assertEqual(self.server.active_sessions, 0)
+
+    def test_admission_control(self):
+        sessions = [RemoteSession(self.server.url) for _ in range(2)]
+        with self.assertRaises(RuntimeError) as e:
+            RemoteSession(self.server.url)
+        self.assertIn("503", str(e.exception))
+        sessions[0].finish()
+        RemoteSession(self.server.url).finish()
+        sessions[1].finish()
+
+    def test_errors(self):
+        with self.assertRaises(RuntimeError) as e:
+            RemoteSession(self.server.url, "xx")
+        self.assertIn("400", str(e.exception))
+        session = RemoteSession(self.server.url)
+        session.finish()
+        with self.assertRaises(RuntimeError) as e:
+            RemoteSession.feed(session, pcm(1))
+        self.assertIn("404", str(e.exception))
+
+    def test_backpressure(self):
+        self.stt.gate.clear()
+        session = RemoteSession(self.server.url, max_retries=0)
+        with self.assertRaises(RuntimeError) as e:
+            for i in range(5):
+                session.feed(pcm(i))
+        self.assertIn("503", str(e.exception))
+        self.stt.gate.set()
+        session.finish()
+
+    def test_busy_retry(self):
+        self.stt.gate.clear()
+        Timer(0.3, self.stt.gate.set).start()
+        session = RemoteSession(self.server.url)
+        for i in range(1, 6):
+            self.assertTrue(session.feed(pcm(i, -i)))
+        self.assertEqual(session.finish()["text"],
+                         "1 -1 2 -2 3 -3 4 -4 5 -5")
+
+    def test_close(self):
+        session = RemoteSession(self.server.url)
+        session.feed(pcm(1))
+        self.assertEqual(self.server.active_sessions, 1)
+        session.close()
+        self.assertEqual(self.server.active_sessions, 0)
+        # Discarded sessions are not decoded or reported
+        deadline = time.monotonic() + 5
+        while self.stt.sessions.active_sessions and \
+                time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertTrue(self.stt.streams[0].freed)
+        self.assertEqual(self.stt.reported, 0)
+        # Closing a finished session does not contact the server
+        session = RemoteSession(self.server.url)
+        session.finish()
+        session.close()
+
+    def test_idle_sessions(self):
+        server = STTServer(self.stt, port=0, idle_timeout=0.2).start()
+        session = RemoteSession(server.url)
+        session.feed(pcm(1, -1))
+        self.assertEqual(server.active_sessions, 1)
+        deadline = time.monotonic() + 5
+        while server.active_sessions and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(server.active_sessions, 0)
+        self.assertEqual(self.stt.sessions.active_sessions, 0)
+        self.assertTrue(self.stt.streams[0].freed)
+        server.shutdown()
+
+    def test_streaming_client(self):
+        partials = []
+        client = DeepSpeechRemoteStreamingSTT(
+            {"lang": "en-us", "server_url": self.server.url},
+            on_partial=partials.append)
+        self.assertEqual(client.available_languages, {"en"})
+        client.stream_start()
+        for i in range(1, 4):
+            client.stream_data(pcm(i, -i))
+        self.assertEqual(client.stream_stop(), "1 -1 2 -2 3 -3")
+        self.assertTrue(partials)
+        for partial in partials:
+            self.assertTrue("1 -1 2 -2 3 -3".startswith(partial.text))
+
+
+class TestRemoteClient(unittest.TestCase):
+    def test_languages_unreachable(self):
+        client = DeepSpeechRemoteStreamingSTT(
+            {"lang": "en-us", "server_url": "http://127.0.0.1:9",
+             "timeout": 1})
+        self.assertEqual(client.available_languages, set(languages.keys()))
+
+
+if __name__ == '__main__':
+    unittest.main()
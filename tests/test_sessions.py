@@ -0,0 +1,183 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+from queue import Full
+from threading import Thread
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.sessions import SessionEngine
+from session_mocks import MockSTT, pcm
+
+
+class TestSessionEngine(unittest.TestCase):
+    def test_concurrent_sessions(self):
+        stt = MockSTT()
+        engine = SessionEngine(stt, max_workers=2, chunks_per_turn=2)
+        sessions = [engine.open_session() for _ in range(8)]
+        self.assertEqual(engine.active_sessions, 8)
+
+        def _feed(session, offset):
+            for i in range(10):
+                session.feed(pcm(offset + i, -offset - i))
+            session.finish()
+
+        threads = [Thread(target=_feed, args=(s, idx * 100))
+                   for idx, s in enumerate(sessions)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for idx, session in enumerate(sessions):
+            expected = " ".join(f"{idx * 100 + i} {-idx * 100 - i}"
+                                for i in range(10))
+            self.assertEqual(session.result(5), [expected] * 5)
+            self.assertEqual(session.text, expected)
+        self.assertEqual(stt.reported, 8)
+        self.assertEqual(engine.active_sessions, 0)
+        engine.shutdown()
+
+    def test_backpressure(self):
+        stt = MockSTT()
+        stt.gate.clear()
+        engine = SessionEngine(stt, max_workers=1, max_queued_chunks=2,
+                               chunks_per_turn=1)
+        session = engine.open_session()
+        session.feed(pcm(1, -1))  # Taken by the blocked worker
+        session.feed(pcm(2, -2))
+        session.feed(pcm(3, -3))
+        with self.assertRaises(Full):
+            session.feed(pcm(4, -4), timeout=0.2)
+        stt.gate.set()
+        session.feed(pcm(4, -4), timeout=5)
+        session.finish()
+        self.assertEqual(session.result(5)[0], "1 -1 2 -2 3 -3 4 -4")
+        with self.assertRaises(RuntimeError):
+            session.feed(pcm(5, -5))
+        engine.shutdown()
+
+    def test_empty_session(self):
+        engine = SessionEngine(MockSTT())
+        session = engine.open_session()
+        session.finish()
+        self.assertEqual(session.result(5), [])
+        self.assertIsNone(session.text)
+        engine.shutdown()
+
+    def test_cancel_idle(self):
+        stt = MockSTT()
+        engine = SessionEngine(stt, max_workers=1)
+        session = engine.open_session()
+        session.feed(pcm(1, -1))
+        while not stt.streams or not stt.streams[0].samples or \
+                session._scheduled:
+            time.sleep(0.01)
+        session.cancel()
+        self.assertTrue(session.done)
+        self.assertEqual(session.result(), [])
+        self.assertTrue(stt.streams[0].freed)
+        self.assertEqual(stt.reported, 0)
+        self.assertEqual(engine.active_sessions, 0)
+        session.cancel()
+        session.finish()
+        engine.shutdown()
+
+    def test_cancel_processing(self):
+        stt = MockSTT()
+        stt.gate.clear()
+        engine = SessionEngine(stt, max_workers=1, max_queued_chunks=2,
+                               chunks_per_turn=1)
+        session = engine.open_session()
+        session.feed(pcm(1, -1))  # Taken by the blocked worker
+        session.feed(pcm(2, -2))
+        session.feed(pcm(3, -3))
+        # Does not wait for the worker or for space in the queue
+        session.cancel()
+        self.assertFalse(session.done)
+        stt.gate.set()
+        self.assertEqual(session.result(5), [])
+        # Queued audio was dropped and no final decode was made
+        self.assertEqual(stt.streams[0].samples, [1, -1])
+        self.assertTrue(stt.streams[0].freed)
+        self.assertEqual(stt.reported, 0)
+        self.assertEqual(engine.active_sessions, 0)
+        engine.shutdown()
+
+
+class TestAsyncSessions(unittest.TestCase):
+    def test_async_session(self):
+        stt = MockSTT()
+        engine = SessionEngine(stt, max_workers=1, max_queued_chunks=2)
+
+        async def _run():
+            async with engine.open_async_session() as session:
+                hypotheses = asyncio.ensure_future(_collect(session))
+                for i in range(1, 4):
+                    await session.feed(pcm(i, -i))
+            return await session.result(), await hypotheses
+
+        async def _collect(iterator):
+            return [p.text async for p in iterator]
+
+        transcriptions, hypotheses = asyncio.run(_run())
+        self.assertEqual(transcriptions[0], "1 -1 2 -2 3 -3")
+        self.assertEqual(hypotheses[-1], "1 -1 2 -2 3 -3")
+        self.assertEqual(hypotheses, sorted(set(hypotheses), key=len))
+        self.assertEqual(stt.reported, 1)
+        engine.shutdown()
+
+    def test_async_backpressure(self):
+        stt = MockSTT()
+        stt.gate.clear()
+        engine = SessionEngine(stt, max_workers=1, max_queued_chunks=1,
+                               chunks_per_turn=1)
+
+        async def _run():
+            session = engine.open_async_session()
+            await session.feed(pcm(1, -1))
+            await asyncio.sleep(0.1)  # Taken by the blocked worker
+            await session.feed(pcm(2, -2))
+            blocked = asyncio.ensure_future(session.feed(pcm(3, -3)))
+            await asyncio.sleep(0.2)
+            self.assertFalse(blocked.done())
+            stt.gate.set()
+            await asyncio.wait_for(blocked, 5)
+            await session.finish()
+            return await asyncio.wait_for(session.result(), 5)
+
+        self.assertEqual(asyncio.run(_run())[0], "1 -1 2 -2 3 -3")
+        engine.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import mmap
+import os
+import sys
+import unittest
+
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local import shared_models
+from neon_stt_plugin_deepspeech_stream_local.decoder_settings import \
+    DecoderSettings
+
+
+class TestSharedModels(unittest.TestCase):
+    def test_use_tflite(self):
+        self.assertFalse(shared_models.use_tflite({"model_format": "pbmm"}))
+        self.assertTrue(shared_models.use_tflite({"model_format": "tflite"}))
+        with patch.object(shared_models, "machine", return_value="x86_64"):
+            self.assertFalse(shared_models.use_tflite())
+        with patch.object(shared_models, "machine", return_value="aarch64"):
+            self.assertTrue(shared_models.use_tflite({}))
+
+    def test_get_shared_model(self):
+        loaded = []
+
+        def _load(model, scorer):
+            loaded.append(model)
+            return object(), 10
+
+        with TemporaryDirectory() as tmp, \
+                patch.object(shared_models, "load_model", _load), \
+                patch.dict(shared_models._models, clear=True):
+            model = os.path.join(tmp, "model.pbmm")
+            link = os.path.join(tmp, "link.pbmm")
+            open(model, 'wb').close()
+            os.symlink(model, link)
+            first = shared_models.get_shared_model(model, None)
+            self.assertIs(shared_models.get_shared_model(link, None), first)
+            self.assertEqual(loaded, [model])
+            self.assertEqual(shared_models.shared_model_files(),
+                             (os.path.realpath(model),))
+
+    def test_shared_model_settings(self):
+        with TemporaryDirectory() as tmp, \
+                patch.object(shared_models, "load_model",
+                             lambda m, s: (MagicMock(), 10)), \
+                patch.dict(shared_models._models, clear=True):
+            model = os.path.join(tmp, "model.pbmm")
+            open(model, 'wb').close()
+            default, _ = shared_models.get_shared_model(model, None,
+                                                        DecoderSettings())
+            wide, _ = shared_models.get_shared_model(
+                model, None, DecoderSettings(beam_width=500))
+            self.assertIsNot(default, wide)
+            default.setBeamWidth.assert_not_called()
+            wide.setBeamWidth.assert_called_once_with(500)
+            self.assertIs(shared_models.get_shared_model(
+                model, None, DecoderSettings(beam_width=500))[0], wide)
+            self.assertEqual(shared_models.shared_model_files(),
+                             (os.path.realpath(model),) * 2)
+
+    def test_mapped_memory_smaps(self):
+        smaps = """\
+7f0000000000-7f0000100000 r--s 00000000 08:01 1234   /models/model.pbmm
+Rss:                 800 kB
+Shared_Clean:        600 kB
+Shared_Dirty:          0 kB
+Private_Clean:       200 kB
+Private_Dirty:         0 kB
+VmFlags: rd sh mr mw me ms sd
+7f0000100000-7f0000200000 rw-p 00000000 00:00 0
+Rss:                 100 kB
+Private_Dirty:       100 kB
+7f0000200000-7f0000300000 r--s 00100000 08:01 1234   /models/model.pbmm
+Rss:                 100 kB
+Shared_Clean:        100 kB
+"""
+        with NamedTemporaryFile("w", suffix=".smaps") as f:
+            f.write(smaps)
+            f.flush()
+            usage = shared_models.mapped_memory(
+                ["/models/model.pbmm", "/models/other.scorer"], f.name)
+        self.assertEqual(usage["/models/model.pbmm"],
+                         (900 * 1024, 700 * 1024, 200 * 1024))
+        self.assertEqual(usage["/models/other.scorer"], (0, 0, 0))
+
+    @unittest.skipUnless(os.path.isfile("/proc/self/smaps"), "Linux only")
+    def test_mapped_memory(self):
+        with NamedTemporaryFile() as f:
+            f.write(b'\x01' * mmap.PAGESIZE * 4)
+            f.flush()
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.assertEqual(sum(mapped[::mmap.PAGESIZE]), 4)
+            usage = shared_models.mapped_memory([f.name])[f.name]
+            mapped.close()
+        self.assertGreaterEqual(usage.rss, mmap.PAGESIZE * 4)
+        self.assertEqual(usage.rss, usage.shared + usage.private)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+from unittest.mock import Mock
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.result_cache import ResultCache
+from neon_stt_plugin_deepspeech_stream_local.stream_decoder import \
+    StreamDecoder
+from decoder_mocks import MockModel, SILENCE, SPEECH
+
+
+class TestStreamDecoder(unittest.TestCase):
+    def test_speech(self):
+        model = MockModel()
+        decoder = StreamDecoder(model, {"decode_policy": "always"})
+        for chunk in (SILENCE, SPEECH, SPEECH, SILENCE):
+            self.assertTrue(decoder.feed(chunk.tobytes()))
+        self.assertEqual(decoder.finish().transcriptions[0], "hello")
+        self.assertEqual(decoder.text, "hello")
+        self.assertEqual(len(decoder.transcriptions), 5)
+        self.assertEqual(len(model.streams), 1)
+
+    def test_silence_does_not_create_stream(self):
+        model = MockModel()
+        decoder = StreamDecoder(model, {"leading_silence_ms": 1000})
+        fed = 0
+        while decoder.feed(SILENCE):
+            fed += 1
+        self.assertEqual(fed, 10)
+        self.assertEqual(decoder.endpointer.reason, "no_speech")
+        self.assertEqual(decoder.finish().transcriptions, [])
+        self.assertIsNone(decoder.text)
+        self.assertEqual(model.streams, [])
+
+    def test_empty_chunk_stops(self):
+        decoder = StreamDecoder(MockModel(), {})
+        self.assertTrue(decoder.feed(SPEECH))
+        self.assertFalse(decoder.feed(b''))
+
+    def test_input_conversion(self):
+        model = MockModel()
+        decoder = StreamDecoder(model, {"silence_gate": False,
+                                        "input_sample_rate": 48000,
+                                        "input_channels": 2})
+        self.assertIsNotNone(decoder.converter)
+        stereo = np.repeat(np.tile(SPEECH, 3), 2).tobytes()
+        for idx in range(0, len(stereo), 1000):
+            self.assertTrue(decoder.feed(stereo[idx:idx + 1000]))
+        # The end of audio flushes audio held back by the resampler
+        self.assertLess(model.streams[0].fed, 1600)
+        self.assertFalse(decoder.feed(b''))
+        self.assertEqual(model.streams[0].fed, 1600)
+        decoder.finish()
+        self.assertEqual(model.streams[0].fed, 1600)
+        decoder = StreamDecoder(model, {"silence_gate": False,
+                                        "input_sample_rate": 48000})
+        decoder.feed(np.tile(SPEECH, 3))
+        decoder.finish()
+        self.assertEqual(model.streams[1].fed, 1600)
+        self.assertIsNone(StreamDecoder(model, {"input_sample_rate": 16000})
+                          .converter)
+
+    def test_partial_callback_error(self):
+        on_partial = Mock(side_effect=ValueError("consumer bug"))
+        decoder = StreamDecoder(MockModel(), {"decode_policy": "always"},
+                                on_partial=on_partial)
+        for chunk in (SPEECH, SPEECH, SPEECH):
+            self.assertTrue(decoder.feed(chunk))
+        self.assertEqual(on_partial.call_count, 3)
+        self.assertEqual(decoder.finish().text, "hello")
+
+    def test_word_times(self):
+        # Word times refer to the input, not the audio passed by the gate
+        audio = [SILENCE] * 20 + [SPEECH] * 3
+        for config in ({}, {"silence_gate": False}):
+            decoder = StreamDecoder(MockModel(), config,
+                                    result_detail="words")
+            for chunk in audio:
+                decoder.feed(chunk)
+            word = decoder.finish().candidates[0].words[0]
+            self.assertEqual(word.text, "hello")
+            self.assertAlmostEqual(word.start_time, 2.0, places=3)
+            self.assertAlmostEqual(word.duration, 0.1)
+
+        # Cached results are mapped for each utterance
+        cache = ResultCache(max_entries=4)
+        for leading in (20, 10):
+            decoder = StreamDecoder(MockModel(), {}, result_detail="words",
+                                    cache=cache)
+            for chunk in [SILENCE] * leading + [SPEECH] * 3:
+                decoder.feed(chunk)
+            result = decoder.finish()
+            self.assertEqual(decoder.cache_hit, leading == 10)
+            self.assertAlmostEqual(result.candidates[0].words[0].start_time,
+                                   leading / 10, places=3)
+
+    def test_result_cache(self):
+        cache = ResultCache()
+        model = MockModel()
+        config = {"decode_policy": "always", "cache_max_seconds": 0.35}
+        for chunks in ((SPEECH, SPEECH), (SPEECH, SPEECH),
+                       (SILENCE, SPEECH, SPEECH)):
+            decoder = StreamDecoder(model, config, cache=cache,
+                                    cache_key="en|model")
+            for chunk in chunks:
+                decoder.feed(chunk)
+            self.assertEqual(decoder.finish().text, "hello")
+        # Repeated audio, with or without leading silence, is not decoded
+        self.assertEqual(len(model.streams), 1)
+        self.assertTrue(decoder.cache_hit)
+        self.assertEqual(cache.stats["hits"], 2)
+
+        # Utterances longer than `cache_max_seconds` are decoded as they
+        # arrive and the stream is discarded on a cache hit
+        for _ in range(2):
+            decoder = StreamDecoder(model, config, cache=cache,
+                                    cache_key="en|model")
+            for _ in range(4):
+                decoder.feed(SPEECH)
+            self.assertEqual(decoder.intermediate_result, "hell")
+            self.assertEqual(decoder.finish().text, "hello")
+        self.assertEqual(len(model.streams), 3)
+        self.assertTrue(model.streams[-1].freed)
+
+        decoder = StreamDecoder(model, config, cache=cache,
+                                cache_key="en|other")
+        decoder.feed(SPEECH)
+        decoder.feed(SPEECH)
+        decoder.finish()
+        self.assertFalse(decoder.cache_hit)
+        self.assertEqual(len(model.streams), 4)
+
+    def test_result_cache_decodes_by_default(self):
+        # Without `cache_max_seconds`, audio is decoded as it arrives
+        cache = ResultCache()
+        model = MockModel()
+        for _ in range(2):
+            decoder = StreamDecoder(model, {"decode_policy": "always"},
+                                    cache=cache, cache_key="en|model")
+            decoder.feed(SPEECH)
+            decoder.feed(SPEECH)
+            self.assertEqual(decoder.intermediate_result, "he")
+            self.assertEqual(decoder.finish().text, "hello")
+        self.assertTrue(decoder.cache_hit)
+        self.assertEqual(len(model.streams), 2)
+        self.assertTrue(model.streams[-1].freed)
+
+    def test_result_cache_errors(self):
+        cache = ResultCache()
+        cache.get = cache.put = Mock(side_effect=OSError("disk failure"))
+        decoder = StreamDecoder(MockModel(), {"cache_max_seconds": 0.35},
+                                cache=cache, cache_key="en|model")
+        decoder.feed(SPEECH)
+        self.assertEqual(decoder.finish().text, "hello")
+        self.assertFalse(decoder.cache_hit)
+
+
+if __name__ == '__main__':
+    unittest.main()
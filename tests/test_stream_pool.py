@@ -0,0 +1,117 @@
+# NEON AI (TM) SOFTWARE, Software Development Kit & Application Framework
+# All trademark and other rights reserved by their respective owners
+# Copyright 2008-2022 Neongecko.com Inc.
+# Contributors: Daniel McKnight, Guy Daniels, Elon Gasper, Richard Leeds,
+# Regina Bloomstine, Casimiro Ferreira, Andrii Pernatii, Kirill Hrymailo
+# BSD-3 License
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from this
+#    software without specific prior written permission.
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+# CONTRIBUTORS  BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA,
+# OR PROFITS;  OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE,  EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import sys
+import unittest
+
+from time import sleep
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from neon_stt_plugin_deepspeech_stream_local.model_pool import ModelPool
+from neon_stt_plugin_deepspeech_stream_local.stream_pool import StreamPool
+
+
+class MockStream:
+    def __init__(self):
+        self.freed = False
+
+    def freeStream(self):
+        self.freed = True
+
+
+class MockModel:
+    def __init__(self):
+        self.created = []
+
+    def createStream(self):
+        self.created.append(MockStream())
+        return self.created[-1]
+
+
+def _wait_for(condition, timeout=5):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return True
+        sleep(0.01)
+    return False
+
+
+class TestStreamPool(unittest.TestCase):
+    def test_acquire_and_refill(self):
+        pool = StreamPool(size=2)
+        model = MockModel()
+        pool.prefill("en", model)
+        self.assertTrue(_wait_for(lambda: pool.stats["pooled"]["en"] == 2))
+
+        stream = pool.acquire("en", model)
+        self.assertIs(stream, model.created[0])
+        self.assertEqual(pool.hits, 1)
+        self.assertTrue(_wait_for(lambda: len(model.created) == 3))
+        self.assertTrue(_wait_for(lambda: pool.stats["pooled"]["en"] == 2))
+
+        pool.acquire("en", model)
+        pool.acquire("en", model)
+        self.assertGreater(pool.hit_rate, 0)
+        pool.shutdown()
+
+    def test_miss_creates_stream(self):
+        pool = StreamPool(size=0)
+        model = MockModel()
+        stream = pool.acquire("en", model)
+        self.assertIs(stream, model.created[0])
+        self.assertEqual(pool.stats["misses"], 1)
+        self.assertEqual(pool.hit_rate, 0.0)
+        self.assertEqual(pool.stats["pooled"]["en"], 0)
+        pool.shutdown()
+
+    def test_release_on_model_eviction(self):
+        pool = StreamPool(size=2)
+        models = ModelPool(max_models=1, on_evict=pool.release_language)
+        en, es = MockModel(), MockModel()
+        models.put("en", en)
+        pool.prefill("en", en)
+        self.assertTrue(_wait_for(lambda: pool.stats["pooled"].get("en")
+                                  == 2))
+        models.put("es", es)
+        self.assertNotIn("en", pool.stats["pooled"])
+        self.assertTrue(all(s.freed for s in en.created))
+
+    def test_replaced_model(self):
+        pool = StreamPool(size=1)
+        old, new = MockModel(), MockModel()
+        pool.prefill("en", old)
+        self.assertTrue(_wait_for(lambda: pool.stats["pooled"]["en"] == 1))
+        stream = pool.acquire("en", new)
+        self.assertIs(stream, new.created[0])
+        self.assertTrue(old.created[0].freed)
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,7 +31,7 @@ import sys
 import unittest
 from os.path import isfile
 
-from threading import Event
+from threading import Event, Thread
 from neon_utils.file_utils import get_audio_file_stream
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
@@ -99,12 +99,123 @@ class TestGetSTT(unittest.TestCase):
             self.assertIn(transcription, result)
             self.assertNotEqual(result[0], 'he')
 
+    def test_parallel_sessions(self):
+        stt = DeepSpeechLocalStreamingSTT({"session_workers": 2})
+        sessions = dict()
+
+        def _stream_file(file):
+            stream = get_audio_file_stream(os.path.join(TEST_PATH, file))
+            session = stt.open_session()
+            sessions[file] = session
+            try:
+                while True:
+                    session.feed(stream.read(1024))
+            except EOFError:
+                pass
+            session.finish()
+
+        threads = [Thread(target=_stream_file, args=(file,))
+                   for file in os.listdir(TEST_PATH)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for file, session in sessions.items():
+            transcription = os.path.splitext(os.path.basename(file))[0].lower()
+            result = session.result(60)
+            self.assertIn(transcription, result, f"Error processing: {file}")
+            self.assertEqual(session.text, result[0])
+        self.assertEqual(stt.sessions.active_sessions, 0)
+        stt.shutdown()
+
+    def test_batch_transcription(self):
+        from neon_stt_plugin_deepspeech_stream_local.batch import \
+            transcribe_batch
+        files = [os.path.join(TEST_PATH, f) for f in os.listdir(TEST_PATH)]
+        with open(files[0], 'rb') as f:
+            buffer = f.read()
+        results = list(transcribe_batch(files + [buffer], max_workers=2,
+                                        num_results=5))
+        self.assertEqual(len(results), len(files) + 1)
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertGreater(result.audio_seconds, 0)
+            self.assertGreater(result.decode_seconds, 0)
+            source = files[0] if result.source == len(files) \
+                else result.source
+            transcription = os.path.splitext(
+                os.path.basename(source))[0].lower()
+            self.assertIn(transcription, result.transcriptions)
+
     def test_available_languages(self):
         stt = DeepSpeechLocalStreamingSTT(None)
         self.assertIsInstance(stt.available_languages, set)
         self.assertIn("en", stt.available_languages)
         self.assertIn("es", stt.available_languages)
 
+    def test_prewarm(self):
+        stt = DeepSpeechLocalStreamingSTT({"lang": "en-us",
+                                           "preload_langs": ["es"]})
+        self.assertIn(stt.model_status.get("es"), ("loading", "ready"))
+        futures = stt.prewarm(["es", "de-de"])
+        self.assertEqual(set(futures.keys()), {"es", "de"})
+        for lang, future in futures.items():
+            self.assertIsNotNone(future.result())
+            self.assertEqual(stt.model_status[lang], "ready")
+            self.assertIsInstance(stt.model_load_times[lang], float)
+        self.assertEqual(stt.init_language_model("de"),
+                         futures["de"].result())
+        stt.shutdown()
+
+    def test_shared_models(self):
+        config = {"lang": "en-us", "shared_models": True}
+        first = DeepSpeechLocalStreamingSTT(config)
+        second = DeepSpeechLocalStreamingSTT(config)
+        self.assertIs(first.init_language_model("en"),
+                      second.init_language_model("en"))
+        self.assertIs(first._model_lock, second._model_lock)
+        with self.assertRaises(RuntimeError):
+            first.set_beam_width("en", 50)
+        other = DeepSpeechLocalStreamingSTT({**config, "beam_width": 50})
+        self.assertIsNot(other.init_language_model("en"),
+                         first.init_language_model("en"))
+        self.assertNotEqual(first.init_language_model("en").beamWidth(), 50)
+        other.shutdown()
+        memory = first.model_memory
+        self.assertEqual(len(memory), 2)
+        for usage in memory.values():
+            self.assertEqual(usage.rss, usage.shared + usage.private)
+        first.shutdown()
+        second.shutdown()
+
+    def test_decoder_settings(self):
+        stt = DeepSpeechLocalStreamingSTT(
+            {"lang": "en-us",
+             "decoder_profiles": {"fast": {"beam_width": 50}}})
+        client = stt.init_language_model("en")
+        default_width = client.beamWidth()
+        stt.set_beam_width("en", 200)
+        stt.set_scorer_alpha_beta("en", 0.9, 1.2)
+        stt.add_hot_word("en", "neon", 5.0)
+        settings = stt.decoder_settings("en")
+        self.assertEqual(settings.beam_width, 200)
+        self.assertEqual(settings.hot_words, {"neon": 5.0})
+        self.assertEqual(client.beamWidth(), 200)
+        scorer = settings.scorer_path
+        stt.set_scorer("en", None)
+        self.assertIsNone(stt.decoder_settings("en").scorer_path)
+        stt.set_scorer("en", scorer)
+        stt.clear_hot_words("en")
+
+        decoder = stt.create_decoder("en", profile="fast")
+        decoder.feed(bytes(range(256)) * 25)
+        self.assertEqual(client.beamWidth(), 200)
+        decoder.finish()
+        with self.assertRaises(ValueError):
+            stt.create_decoder("en", profile="missing")
+        stt.set_beam_width("en", default_width)
+        stt.shutdown()
+
     def test_download_model(self):
         stt = DeepSpeechLocalStreamingSTT(None)
         for lang in stt.available_languages: